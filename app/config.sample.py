@@ -7,6 +7,7 @@ DATABASE = {
     "autocommit": False,
     "autoflush": False,
     "port": 5432,
+    "create_all": False,
 }
 
 DATABASE_TEST = {
@@ -26,6 +27,23 @@ JWT = {
     "access_token_expire_minutes": 30
 }
 
+PASSWORD = {
+    "rounds": 12,
+    "workers": 4,
+    "processes": None,
+    "import_rounds": {
+        "bulk_upsert": 12,
+        "import": 12,
+    },
+}
+
+CACHE = {
+    "dashboard": {
+        "ttl": 60,
+        "maxsize": 32,
+    },
+}
+
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
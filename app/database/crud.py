@@ -1,24 +1,125 @@
 import logging
-from sqlalchemy import select
+import time
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    any_,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import joinedload, noload, raiseload, selectinload
 from app.database.database import Base
+from app.models import mappers
+from app.utils import cache
+from app.utils.cursor import decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 1000
+BULK_MAX_SIZE = 5000
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+# estratégias de carga dos relacionamentos aceitas por ``CRUD.load``
+LOADERS = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "noload": noload,
+    "raise": raiseload,
+}
+
 
 class CRUD:
     """Cria um crud para o banco de dados."""
 
+    # colunas aceitas na ordenação das listagens ("-" antes do nome inverte)
+    SORTS = ("id",)
+
     def __init__(self, db):
         """Inicia a classe com as configurações do banco de dados."""
         self.db = db
 
+    def _column_values(self, model: Base, data: dict) -> dict:
+        """Converte os dados em valores de colunas, aplicando os setters do modelo."""
+        mapper = inspect(model)
+        if not isinstance(data, dict):
+            data = {
+                key: value
+                for key, value in vars(data).items()
+                if not key.startswith("_") and key not in mapper.relationships
+            }
+        columns = {attr.key for attr in mapper.column_attrs}
+        if columns.issuperset(data):
+            return dict(data)
+        instance = model(**data)
+        return {key: value for key, value in vars(instance).items() if key in columns}
+
+    def _invalidate_cache(self, model: Base, cascade: bool = False) -> None:
+        """Descarta os dados em cache que dependem das tabelas do modelo.
+
+        Com ``cascade`` inclui as tabelas que referenciam o modelo, alteradas
+        pelo banco em exclusões (ON DELETE CASCADE/SET NULL).
+        """
+        tables = set(inspect(model).tables)
+        while cascade:
+            dependents = {
+                table
+                for table in Base.metadata.sorted_tables
+                if table not in tables
+                and any(fk.column.table in tables for fk in table.foreign_keys)
+            }
+            tables |= dependents
+            cascade = bool(dependents)
+        cache.invalidate(table.name for table in tables)
+
+    def load(self, model: Base, path: str, strategy: str = "selectin"):
+        """Monta a opção de carga de um relacionamento para as consultas do CRUD.
+
+        Os relacionamentos não são carregados por padrão: cada serviço passa
+        em ``options`` os que a resposta usa. ``path`` segue relacionamentos
+        separados por ponto (``"fazenda.safra"`` carrega as fazendas do
+        produtor e as safras de cada uma) e ``strategy`` é uma das chaves de
+        ``LOADERS``, aplicada a todo o caminho: ``selectin`` faz uma consulta
+        por nível, ``joined`` traz tudo na consulta principal.
+        """
+        if strategy not in LOADERS:
+            raise ValueError(f"Estratégia de carga inválida: {strategy}")
+        option = None
+        for name in path.split("."):
+            relationships = inspect(model).relationships
+            if name not in relationships:
+                raise ValueError(f"Relacionamento inválido: {name}")
+            attribute = getattr(model, name)
+            if option is None:
+                option = LOADERS[strategy](attribute)
+            else:
+                option = getattr(option, LOADERS[strategy].__name__)(attribute)
+            model = relationships[name].mapper.class_
+        return option
+
+    def _new_row_options(self, model: Base) -> list:
+        """Opções de carga para um dado recém-inserido, que ainda não tem filhos."""
+        return [
+            noload(getattr(model, relationship.key))
+            for relationship in inspect(model).relationships
+            if relationship.uselist
+        ]
+
     async def create(self, model: Base, data: dict) -> object:
-        """Insere um novo dado no banco de dados."""
-        new_data = model(**data)
+        """Insere um novo dado no banco de dados e o retorna (INSERT ... RETURNING)."""
+        query = insert(model).returning(model).options(*self._new_row_options(model))
         try:
-            self.db.add(new_data)
+            result = await self.db.execute(query, [self._column_values(model, data)])
+            new_data = result.scalars().one()
             await self.db.commit()
-            await self.db.refresh(new_data)
+            self._invalidate_cache(model)
             logger.info(f"Dados inseridos em {model.__tablename__}")
         except Exception as e:
             await self.db.rollback()
@@ -26,39 +127,322 @@ class CRUD:
             raise e
         return new_data
 
-    async def get_by_id(self, model: Base, id: int) -> object:
-        """Retorna um dado do banco de dados pelo id."""
+    async def bulk_create(self, model: Base, data: list) -> list:
+        """Insere vários dados em uma única transação e retorna os ids na ordem recebida."""
+        if not data:
+            return []
+        query = insert(model).returning(model.id, sort_by_parameter_order=True)
+        start = time.perf_counter()
         try:
-            result = await self.db.execute(select(model).where(model.id == id))
+            result = await self.db.execute(
+                query, [self._column_values(model, item) for item in data]
+            )
+            ids = result.scalars().all()
+            await self.db.commit()
+            self._invalidate_cache(model)
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao inserir dados em {model.__tablename__}: {e}")
+            raise e
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"{len(ids)} dados inseridos em {model.__tablename__} "
+            f"em {elapsed:.3f}s ({len(ids) / elapsed:.0f} linhas/s)"
+        )
+        return ids
+
+    async def get_by_id(
+        self, model: Base, id: int, fields: list = None, options: tuple = ()
+    ) -> object:
+        """Retorna um dado do banco de dados pelo id.
+
+        Com ``fields`` retorna um dicionário só com os campos pedidos; senão
+        o objeto, com os relacionamentos carregados por ``options``
+        (``CRUD.load``).
+        """
+        if fields is not None:
+            return await self._get_fields(model, fields, model.id == id)
+        try:
+            result = await self.db.execute(
+                select(model).where(model.id == id).options(*options)
+            )
             logger.info(f"Dados buscados em {model.__tablename__}")
         except Exception as e:
             logger.error(f"Dados buscados em {model.__tablename__}: {e}")
             raise e
-        return result.scalars().first()
+        return result.unique().scalars().first()
 
-    async def get_all(self, model: Base) -> list:
+    async def get_all(self, model: Base, options: tuple = ()) -> list:
         """Retorna todos os dados do banco de dados."""
         try:
-            result = await self.db.execute(select(model))
+            result = await self.db.execute(select(model).options(*options))
             logger.info(f"Dados buscados em {model.__tablename__}")
         except Exception as e:
             logger.error(f"Dados buscados em {model.__tablename__}: {e}")
             raise e
-        return result.scalars().all()
-
-    async def update(self, model: Base, id: int, data: dict) -> object:
-        """Atualiza um dado do banco de dados."""
-        result = await self.db.execute(select(model).where(model.id == id))
-        db_data = result.scalars().first()
-        if not db_data:
-            raise Exception("Dado nao encontrado")
-        data = data.__dict__ if not isinstance(data, dict) else data
-        for key, value in data.items():
-            setattr(db_data, key, value)
+        return result.unique().scalars().all()
+
+    def _filter_criteria(self, model: Base, filters: dict) -> list:
+        """Converte os filtros da listagem em condições de igualdade nas colunas.
+
+        Filtros sem valor são ignorados; subclasses tratam os filtros que não
+        correspondem a uma coluna do modelo.
+        """
+        return [
+            getattr(model, name) == value
+            for name, value in filters.items()
+            if value is not None
+        ]
+
+    def _sort_keys(self, model: Base, sort: str) -> tuple:
+        """Retorna as colunas da chave de paginação e se a ordem é decrescente.
+
+        O id completa a chave das demais ordenações, para que ela seja única.
+        """
+        name = sort.removeprefix("-")
+        if name not in self.SORTS:
+            raise ValueError(
+                f"Ordenação inválida: {sort}. Use uma de: {', '.join(self.SORTS)}"
+            )
+        keys = [model.id] if name == "id" else [getattr(model, name), model.id]
+        return keys, sort.startswith("-")
+
+    def _fields(self, model: Base, fields: list = None) -> tuple:
+        """Separa os campos pedidos (``?fields=``) em colunas e coleções da resposta.
+
+        Sem ``fields``, ou com a lista vazia, são todos os campos da resposta do
+        modelo.
+        """
+        mapping = mappers.mapping_for(model)
+        if not fields:
+            return mapping.columns, tuple(mapping.collections)
+        invalid = [
+            field
+            for field in fields
+            if field not in mapping.columns and field not in mapping.collections
+        ]
+        if invalid:
+            raise ValueError(f"Campos inválidos: {', '.join(invalid)}")
+        return (
+            tuple(key for key in mapping.columns if key in fields),
+            tuple(name for name in mapping.collections if name in fields),
+        )
 
+    def _select_fields(self, model: Base, columns: tuple, *required: str) -> tuple:
+        """Monta a consulta das colunas pedidas, com o id e as colunas de ordenação.
+
+        Retorna as colunas consultadas, na ordem da resposta, e a consulta.
+        """
+        needed = {"id", *required, *columns}
+        keys = tuple(key for key in mappers.mapping_for(model).columns if key in needed)
+        return keys, select(*(getattr(model, key) for key in keys))
+
+    async def _load_collections(self, model: Base, items: list, names: tuple) -> None:
+        """Preenche as coleções pedidas dos itens, com uma consulta de colunas por coleção.
+
+        Os ids vão em um único parâmetro (``= ANY(array)``), sem o limite de
+        parâmetros por instrução de um ``IN`` em páginas grandes.
+        """
+        if not items or not names:
+            return
+        collections = mappers.mapping_for(model).collections
+        by_id = {item["id"]: item for item in items}
+        for name in names:
+            relationship, child_mapping = collections[name]
+            child = inspect(model).relationships[relationship].mapper.class_
+            (parent_key,) = mappers.parent_keys(model, relationship)
+            parent = getattr(child, parent_key)
+            query = (
+                select(parent, *(getattr(child, key) for key in child_mapping.columns))
+                .where(parent == any_(literal(list(by_id), ARRAY(Integer))))
+                .order_by(child.id)
+            )
+            for item in items:
+                item[name] = []
+            for parent_id, *values in await self.db.execute(query):
+                by_id[parent_id][name].append(dict(zip(child_mapping.columns, values)))
+
+    async def _items(
+        self, model: Base, rows: list, keys: tuple, columns: tuple, collections: tuple
+    ) -> list:
+        """Converte as linhas em dicionários com os campos pedidos e as coleções."""
+        items = [dict(zip(keys, row)) for row in rows]
+        await self._load_collections(model, items, collections)
+        extra = [key for key in keys if key not in columns]
+        if extra:
+            for item in items:
+                for key in extra:
+                    del item[key]
+        return items
+
+    async def _get_fields(self, model: Base, fields: list, *criteria) -> dict:
+        """Retorna o primeiro dado que atende aos critérios, só com os campos pedidos."""
+        columns, collections = self._fields(model, fields)
+        keys, query = self._select_fields(model, columns)
         try:
+            rows = (await self.db.execute(query.where(*criteria).limit(1))).all()
+            items = await self._items(model, rows, keys, columns, collections)
+            logger.info(f"Dados buscados em {model.__tablename__}")
+        except Exception as e:
+            logger.error(f"Dados buscados em {model.__tablename__}: {e}")
+            raise e
+        return items[0] if items else None
+
+    async def get_page(
+        self,
+        model: Base,
+        limit: int = PAGE_SIZE,
+        after: str = None,
+        filters: dict = None,
+        sort: str = "id",
+        fields: list = None,
+    ) -> dict:
+        """Retorna uma página de dados filtrada e ordenada (paginação por cursor).
+
+        A consulta projeta só as colunas da resposta (``app/models/mappers.py``),
+        ou as pedidas em ``fields``, e devolve dicionários, sem criar objetos do
+        ORM; as coleções pedidas são carregadas em seguida, uma consulta por
+        coleção. O cursor guarda a chave de ordenação do último item da página,
+        que é comparada como uma tupla: ``(coluna, id) > (valor, último id)``.
+        """
+        keys, descending = self._sort_keys(model, sort)
+        columns, collections = self._fields(model, fields)
+        # o cursor de outras ordenações leva o nome delas, para não ser reaproveitado
+        prefix = [] if len(keys) == 1 else [sort]
+        selected, query = self._select_fields(model, columns, *(key.key for key in keys))
+        query = (
+            query.where(*self._filter_criteria(model, filters or {}))
+            .order_by(*(key.desc() if descending else key for key in keys))
+            .limit(limit + 1)
+        )
+        if after is not None:
+            values = decode_cursor(after, len(prefix) + len(keys))
+            if values[: len(prefix)] != prefix:
+                raise ValueError("Cursor inválido")
+            position, last = tuple_(*keys), tuple_(*values[len(prefix):])
+            query = query.where(position < last if descending else position > last)
+        try:
+            rows = (await self.db.execute(query)).all()
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(
+                    prefix + [getattr(rows[-1], key.key) for key in keys]
+                )
+            items = await self._items(model, rows, selected, columns, collections)
+            logger.info(f"Dados buscados em {model.__tablename__}")
+        except Exception as e:
+            logger.error(f"Dados buscados em {model.__tablename__}: {e}")
+            raise e
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _search_query(
+        self, model: Base, term: str, limit: int = SEARCH_LIMIT, query=None
+    ):
+        """Monta a busca pelo nome aproximado, do mais ao menos semelhante.
+
+        ``term <% nome`` (pg_trgm) encontra o termo como parte do nome, mesmo
+        com erros de digitação, e é atendido pelo índice GIN de trigramas.
+        ``query`` troca a consulta dos objetos por uma projeção de colunas.
+        """
+        score = func.word_similarity(term, model.nome)
+        return (
+            (select(model) if query is None else query)
+            .where(literal(term).op("<%", is_comparison=True)(model.nome))
+            .order_by(score.desc(), model.id)
+            .limit(limit)
+        )
+
+    async def search(
+        self,
+        model: Base,
+        term: str,
+        limit: int = SEARCH_LIMIT,
+        fields: list = None,
+        options: tuple = (),
+    ) -> list:
+        """Busca dados pelo nome aproximado, do mais ao menos semelhante.
+
+        Com ``fields`` retorna dicionários só com os campos pedidos.
+        """
+        if fields is not None:
+            columns, collections = self._fields(model, fields)
+            keys, projection = self._select_fields(model, columns)
+            query = self._search_query(model, term, limit, projection)
+        else:
+            query = self._search_query(model, term, limit).options(*options)
+        try:
+            result = await self.db.execute(query)
+            if fields is not None:
+                result = await self._items(model, result.all(), keys, columns, collections)
+            else:
+                result = result.unique().scalars().all()
+            logger.info(f"Dados buscados em {model.__tablename__}")
+        except Exception as e:
+            logger.error(f"Dados buscados em {model.__tablename__}: {e}")
+            raise e
+        return result
+
+    async def stream_all(
+        self, model: Base, batch_size: int = STREAM_BATCH_SIZE, options: tuple = ()
+    ):
+        """Percorre todos os dados com um cursor no servidor, em lotes."""
+        try:
+            result = await self.db.stream(
+                select(model)
+                .options(*options)
+                .order_by(model.id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for batch in result.scalars().partitions():
+                yield batch
+            logger.info(f"Dados exportados de {model.__tablename__}")
+        except Exception as e:
+            logger.error(f"Erro ao exportar dados de {model.__tablename__}: {e}")
+            raise e
+
+    def _write_target(self, model: Base) -> tuple:
+        """Retorna a classe alvo de UPDATE/DELETE e o critério que a restringe ao modelo.
+
+        Em herança por tabelas (Produtor herda de Usuario) as colunas ficam na
+        tabela base; a linha da subclasse acompanha a base pelo ON DELETE CASCADE.
+        """
+        base = inspect(model).base_mapper.class_
+        if base is model:
+            return model, []
+        return base, [base.id.in_(select(model.__table__.c.id))]
+
+    async def update(
+        self, model: Base, id: int, data: dict, options: tuple = ()
+    ) -> object:
+        """Atualiza um dado do banco de dados (UPDATE ... RETURNING).
+
+        Sem ``options`` retorna só as colunas, sem consultar os filhos.
+        """
+        target, criteria = self._write_target(model)
+        query = (
+            update(target)
+            .where(target.id == id, *criteria)
+            .values(self._column_values(model, data))
+        )
+        try:
+            if target is model:
+                result = await self.db.execute(
+                    query.returning(model).options(*options),
+                    execution_options={"populate_existing": True},
+                )
+                db_data = result.scalars().first()
+            else:
+                result = await self.db.execute(query.returning(target.id))
+                db_data = (
+                    await self.get_by_id(model, id, options=options)
+                    if result.first()
+                    else None
+                )
+            if db_data is None:
+                raise Exception("Dado nao encontrado")
             await self.db.commit()
-            await self.db.refresh(db_data)
+            self._invalidate_cache(model)
             logger.info(f"Dados atualizados em {model.__tablename__}")
         except Exception as e:
             await self.db.rollback()
@@ -67,16 +451,20 @@ class CRUD:
         return db_data
 
     async def soft_delete(self, model: Base, id: int) -> None:
-        """Inativa um dado do banco de dados."""
-        result = await self.db.execute(select(model).where(model.id == id))
-        db_data = result.scalars().first()
-        if not db_data:
-            raise Exception("Dado nao encontrado")
-        db_data.ativo = False
-
+        """Inativa um dado do banco de dados (UPDATE ... RETURNING)."""
+        target, criteria = self._write_target(model)
+        query = (
+            update(target)
+            .where(target.id == id, *criteria)
+            .values(ativo=False)
+            .returning(target.id)
+        )
         try:
+            result = await self.db.execute(query)
+            if result.first() is None:
+                raise Exception("Dado nao encontrado")
             await self.db.commit()
-            await self.db.refresh(db_data)
+            self._invalidate_cache(model)
             logger.info(f"Dados atualizados em {model.__tablename__}")
         except Exception as e:
             await self.db.rollback()
@@ -85,15 +473,21 @@ class CRUD:
         return True
 
     async def delete(self, model: Base, id: int) -> None:
-        """Exclui um dado do banco de dados."""
-        result = await self.db.execute(select(model).where(model.id == id))
-        db_data = result.scalars().first()
-        if not db_data:
-            raise Exception("Dado nao encontrado")
+        """Exclui um dado do banco de dados (DELETE ... RETURNING).
 
+        Os dependentes são tratados pelo banco: safras são excluídas com a
+        fazenda e fazendas ficam sem produtor (ON DELETE CASCADE/SET NULL).
+        """
+        target, criteria = self._write_target(model)
+        query = (
+            delete(target).where(target.id == id, *criteria).returning(target.id)
+        )
         try:
-            await self.db.delete(db_data)
+            result = await self.db.execute(query)
+            if result.first() is None:
+                raise Exception("Dado nao encontrado")
             await self.db.commit()
+            self._invalidate_cache(model, cascade=True)
             logger.info(f"Dados excluidos em {model.__tablename__}")
         except Exception as e:
             await self.db.rollback()
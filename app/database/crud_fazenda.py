@@ -1,73 +1,127 @@
 import logging
-from sqlalchemy import func, select
+from sqlalchemy import BigInteger, cast, func, literal, null, select, union_all
+from app.config import CACHE
 from app.database.crud import CRUD
+from app.models import mappers
+from app.utils.cache import TTLCache
 
 
 logger = logging.getLogger(__name__)
 
+dashboard_cache = TTLCache("dashboard", **CACHE["dashboard"])
+
 
 class CRUD_Fazenda(CRUD):
     """CRUD para o modelo Fazenda."""
 
+    SORTS = ("id", "nome", "area_total")
+
     def __init__(self, db):
         """Inicia a classe com as configurações do banco de dados."""
         super().__init__(db)
 
-    async def get_total_farms(self, model):
-        """Retorna o total de fazendas cadastradas."""
-        result = await self.db.execute(select(func.count()).select_from(model))
-        logger.info(f"Dados buscados em {model.__tablename__}")
-        return result.scalars().all()[0]
-
-    async def get_total_area(self, model):
-        """Retorna o total de hectares registrados."""
-        result = await self.db.execute(select(func.sum(model.area_total)))
-        logger.info(f"Dados buscados em {model.__tablename__}")
-        return result.scalars().all()[0]
-
-    async def get_farms_by_state(self, model):
-        """Retorna o total de fazendas por estado."""
-        result = await self.db.execute(
-            select(model.estado, func.count()).group_by(model.estado)
+    def _filter_criteria(self, model, filters: dict) -> list:
+        """Filtra as fazendas pelas colunas e, com ``tipo_cultura``, pelas safras."""
+        filters = dict(filters)
+        tipo_cultura = filters.pop("tipo_cultura", None)
+        criteria = super()._filter_criteria(model, filters)
+        if tipo_cultura is not None:
+            criteria.append(model.safra.any(tipo_cultura=tipo_cultura))
+        return criteria
+
+    async def get_dashboard(
+        self, farm_model, crop_model, counter_model, soil_use_bucket: int = None
+    ) -> dict:
+        """Retorna todos os dados do dashboard, guardados em cache até a próxima escrita."""
+        return await dashboard_cache.get_or_set(
+            ("dashboard", soil_use_bucket),
+            lambda: self._load_dashboard(counter_model, soil_use_bucket),
+            (farm_model.__tablename__, crop_model.__tablename__),
         )
-        logger.info(f"Dados buscados em {model.__tablename__}")
-        return [{"state": state, "total_farms": count} for state, count in result.all()]
-
-    async def get_farms_by_culture(self, farm_model, crop_model):
-        """Retorna o total de fazendas por cultura plantada."""
-        result = await self.db.execute(
-            select(
-                crop_model.tipo_cultura, func.count(farm_model.id).label("total_farms")
+
+    def _dashboard_query(self, counter_model, soil_use_bucket: int = None):
+        """Monta a leitura dos contadores do dashboard.
+
+        Cada contador de uso do solo agrupa fazendas com as mesmas áreas, que
+        são recuperadas dividindo as somas pela quantidade de fazendas. Com
+        ``soil_use_bucket`` as áreas são agrupadas em faixas dessa largura,
+        identificadas pelo limite inferior, e o resultado deixa de crescer com
+        a quantidade de fazendas.
+        """
+        is_soil_use = counter_model.dimensao == "uso_solo"
+        counters = select(
+            counter_model.dimensao,
+            counter_model.chave,
+            counter_model.total_fazendas,
+            counter_model.area_total,
+            counter_model.area_agricultavel,
+            counter_model.area_vegetacao,
+        ).where(~is_soil_use)
+        farms = counter_model.total_fazendas
+        agricultural = counter_model.area_agricultavel // farms
+        vegetation = counter_model.area_vegetacao // farms
+        if soil_use_bucket is None:
+            soil_uses = select(
+                counter_model.dimensao, null(), farms, null(), agricultural, vegetation
+            ).where(is_soil_use)
+        else:
+            agricultural = agricultural // soil_use_bucket * soil_use_bucket
+            vegetation = vegetation // soil_use_bucket * soil_use_bucket
+            soil_uses = (
+                select(
+                    literal("uso_solo"),
+                    null(),
+                    cast(func.sum(farms), BigInteger),
+                    null(),
+                    agricultural,
+                    vegetation,
+                )
+                .where(is_soil_use)
+                .group_by(agricultural, vegetation)
             )
-            .join(crop_model, crop_model.fazenda_id == farm_model.id)
-            .group_by(crop_model.tipo_cultura)
-        )
-        data_list = []
-        for tipo_cultura, total_farms in result.fetchall():
-            data_list.append({"tipo_cultura": tipo_cultura, "total_farms": total_farms})
-        logger.info(f"Dados buscados em {farm_model.__tablename__}")
-        return data_list
-
-    async def get_farms_by_soil_use(self, model):
-        """Retorna o total de fazendas por uso do solo (área agricultável e vegetação)."""
-        result = await self.db.execute(
-            select(
-                model.area_agricultavel,
-                model.area_vegetacao,
-                func.count().label("total_farms"),
-            ).group_by(model.area_agricultavel, model.area_vegetacao)
-        )
-        data_list = []
-        for area_agricultavel, area_vegetacao, total_farms in result.fetchall():
-            data_list.append(
+        return union_all(counters, soil_uses)
+
+    async def _load_dashboard(self, counter_model, soil_use_bucket: int = None) -> dict:
+        """Lê os dados do dashboard da tabela de contadores.
+
+        Os contadores são mantidos por gatilhos a cada escrita em fazendas e
+        safras; a leitura não depende da quantidade de fazendas.
+        """
+        result = await self.db.execute(self._dashboard_query(counter_model, soil_use_bucket))
+        total = (0, None, None, None)
+        states, cultures, soil_uses = [], [], []
+        for dimension, key, farms, area, agricultural, vegetation in result.all():
+            if dimension == "uso_solo":
+                soil_uses.append((agricultural, vegetation, farms))
+            elif dimension == "estado":
+                states.append((key, farms))
+            elif dimension == "cultura":
+                cultures.append((key, farms))
+            elif farms:
+                total = (farms, area, agricultural, vegetation)
+        logger.info(f"Dados buscados em {counter_model.__tablename__}")
+        return {
+            "total_farms": total[0],
+            "total_area": total[1],
+            "total_area_agricultavel": total[2],
+            "total_area_vegetacao": total[3],
+            "farms_by_state": [
+                {"state": state, "total_farms": farms} for state, farms in sorted(states)
+            ],
+            "farms_by_culture": [
+                {"tipo_cultura": culture, "total_farms": farms}
+                for culture, farms in sorted(cultures)
+            ],
+            "soil_use_bucket": soil_use_bucket,
+            "farms_by_soil_use": [
                 {
-                    "area_agricultavel": area_agricultavel,
-                    "area_vegetacao": area_vegetacao,
-                    "total_farms": total_farms,
+                    "area_agricultavel": agricultural,
+                    "area_vegetacao": vegetation,
+                    "total_farms": farms,
                 }
-            )
-        logger.info(f"Dados buscados em {model.__tablename__}")
-        return data_list
+                for agricultural, vegetation, farms in sorted(soil_uses)
+            ],
+        }
 
     async def handle_crop_in_farm(
         self,
@@ -78,9 +132,13 @@ class CRUD_Fazenda(CRUD):
         is_add: bool = True,
     ) -> dict:
         """Adiciona uma fazenda a um produtor."""
-        result_farm = await self.db.execute(
-            select(farm_model).where(farm_model.id == farm_id)
+        query = (
+            select(farm_model)
+            .where(farm_model.id == farm_id)
+            .options(self.load(farm_model, "safra"))
+            .execution_options(populate_existing=True)
         )
+        result_farm = await self.db.execute(query)
         farm = result_farm.scalars().first()
         if not farm:
             raise ValueError(f"Fazenda com ID {farm_id} não encontrada.")
@@ -94,31 +152,12 @@ class CRUD_Fazenda(CRUD):
 
         farm.safra.append(crop) if is_add else farm.safra.remove(crop)
         await self.db.commit()
-        await self.db.refresh(farm)
+        self._invalidate_cache(crop_model)
+        # recarrega a fazenda com as safras (refresh não carrega as coleções)
+        await self.db.execute(query)
         logger.info(f"Dados atualizados em {farm_model.__tablename__}")
         return self.farm_mapping(farm)
 
     def farm_mapping(self, data: object) -> dict:
         """Mapeia os dados da fazenda."""
-        return {
-            "id": data.id,
-            "nome": data.nome,
-            "cidade": data.cidade,
-            "estado": data.estado,
-            "area_total": data.area_total,
-            "area_agricultavel": data.area_agricultavel,
-            "area_vegetacao": data.area_vegetacao,
-            "ativo": data.ativo,
-            "safras": [
-                {
-                    "id": crop.id,
-                    "nome": crop.nome,
-                    "variedade": crop.variedade,
-                    "tipo_cultura": crop.tipo_cultura,
-                    "ano_colheita": crop.ano_colheita,
-                    "produtividade_tonelada": crop.produtividade_tonelada,
-                    "ativo": crop.ativo,
-                }
-                for crop in data.safra
-            ],
-        }
+        return mappers.fazenda(data)
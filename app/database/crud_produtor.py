@@ -1,6 +1,9 @@
 import logging
-from sqlalchemy import select
+import time
+from sqlalchemy import inspect, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from app.database.crud_usuario import CRUD_Usuario
+from app.models import mappers
 
 
 logger = logging.getLogger(__name__)
@@ -13,6 +16,71 @@ class CRUD_Produtor(CRUD_Usuario):
         """Inicia a classe com as configurações do banco de dados."""
         super().__init__(db)
 
+    async def upsert(self, model: object, data: list) -> list:
+        """Insere ou atualiza produtores pelo cpf_cnpj em uma única transação.
+
+        Usa ``INSERT ... ON CONFLICT (cpf_cnpj) DO UPDATE`` na tabela de
+        usuários e cria a linha de produtores dos usuários inseridos. Usuários
+        que não são produtores não são alterados e ficam fora do retorno; os
+        atualizados mantêm o ``senha_hash`` gravado.
+        """
+        if not data:
+            return []
+        base = inspect(model).base_mapper.class_
+        table = base.__table__
+        values = [
+            {
+                key: value
+                for key, value in self._column_values(model, item).items()
+                if key in table.c and key != "id"
+            }
+            for item in data
+        ]
+        columns = [key for key in values[0] if key not in ("cpf_cnpj", "senha_hash")]
+        query = insert(table)
+        query = query.on_conflict_do_update(
+            index_elements=[table.c.cpf_cnpj],
+            set_={key: query.excluded[key] for key in columns},
+            where=table.c.id.in_(select(model.__table__.c.id)),
+        ).returning(
+            table.c.id,
+            table.c.cpf_cnpj,
+            literal_column("xmax = 0").label("created"),
+        )
+        start = time.perf_counter()
+        try:
+            result = await self.db.execute(query, values)
+            rows = [dict(row._mapping) for row in result]
+            created = [{"id": row["id"]} for row in rows if row["created"]]
+            if created:
+                await self.db.execute(
+                    insert(model.__table__).on_conflict_do_nothing(), created
+                )
+            await self.db.commit()
+            self._invalidate_cache(model)
+            await self._refresh_loaded(model, [row["id"] for row in rows])
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Erro ao inserir dados em {model.__tablename__}: {e}")
+            raise e
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"{len(rows)} dados inseridos ou atualizados em {model.__tablename__} "
+            f"em {elapsed:.3f}s ({len(rows) / elapsed:.0f} linhas/s)"
+        )
+        return rows
+
+    async def _refresh_loaded(self, model: object, ids: list) -> None:
+        """Recarrega os produtores alterados que já estão carregados na sessão."""
+        base = inspect(model).base_mapper.class_
+        ids = set(ids)
+        if any(key[0] is base and key[1][0] in ids for key in self.db.identity_map):
+            await self.db.execute(
+                select(model)
+                .where(model.id.in_(ids))
+                .execution_options(populate_existing=True)
+            )
+
     async def handle_farm_in_producer(
         self,
         producer_model: object,
@@ -22,9 +90,13 @@ class CRUD_Produtor(CRUD_Usuario):
         is_add: bool = True,
     ) -> dict:
         """Adiciona uma fazenda a um produtor."""
-        result_producer = await self.db.execute(
-            select(producer_model).where(producer_model.id == producer_id)
+        query = (
+            select(producer_model)
+            .where(producer_model.id == producer_id)
+            .options(self.load(producer_model, "fazenda"))
+            .execution_options(populate_existing=True)
         )
+        result_producer = await self.db.execute(query)
         producer = result_producer.scalars().first()
         if not producer:
             raise ValueError(f"Produtor com ID {producer_id} não encontrado.")
@@ -39,7 +111,9 @@ class CRUD_Produtor(CRUD_Usuario):
         producer.fazenda.append(farm) if is_add else producer.fazenda.remove(farm)
         try:
             await self.db.commit()
-            await self.db.refresh(producer)
+            self._invalidate_cache(farm_model)
+            # recarrega o produtor com as fazendas (refresh não carrega as coleções)
+            await self.db.execute(query)
             logger.info(f"Dados atualizados em {producer_model.__tablename__}")
         except Exception as e:
             logger.error(f"Dados atualizados em {producer_model.__tablename__}: {e}")
@@ -49,24 +123,4 @@ class CRUD_Produtor(CRUD_Usuario):
 
     def producer_mapping(self, data: object) -> dict:
         """Mapeia os dados do produtor."""
-        return {
-            "id": data.id,
-            "nome": data.nome,
-            "telefone": data.telefone,
-            "cpf_cnpj": data.cpf_cnpj,
-            "email": data.email,
-            "ativo": data.ativo,
-            "fazendas": [
-                {
-                    "id": farm.id,
-                    "nome": farm.nome,
-                    "cidade": farm.cidade,
-                    "estado": farm.estado,
-                    "area_total": farm.area_total,
-                    "area_agricultavel": farm.area_agricultavel,
-                    "area_vegetacao": farm.area_vegetacao,
-                    "ativo": farm.ativo,
-                }
-                for farm in data.fazenda
-            ],
-        }
+        return mappers.produtor(data)
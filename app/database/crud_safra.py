@@ -1,9 +1,28 @@
 from app.database.crud import CRUD
+from app.models import mappers
 
 
 class CRUD_Safra(CRUD):
     """CRUD para o modelo Safra."""
 
+    SORTS = ("id", "ano_colheita", "produtividade_tonelada")
+
     def __init__(self, db):
         """Inicia a classe com as configurações do banco de dados."""
         super().__init__(db)
+
+    def _filter_criteria(self, model, filters: dict) -> list:
+        """Filtra as safras pelas colunas e pelo intervalo de ``ano_colheita``."""
+        filters = dict(filters)
+        first_year = filters.pop("ano_colheita_min", None)
+        last_year = filters.pop("ano_colheita_max", None)
+        criteria = super()._filter_criteria(model, filters)
+        if first_year is not None:
+            criteria.append(model.ano_colheita >= first_year)
+        if last_year is not None:
+            criteria.append(model.ano_colheita <= last_year)
+        return criteria
+
+    def crop_mapping(self, data: object) -> dict:
+        """Mapeia os dados da safra."""
+        return mappers.safra(data)
@@ -1,5 +1,5 @@
 import logging
-from sqlalchemy import select
+from sqlalchemy import ARRAY, String, any_, inspect, literal, or_, select
 from app.database.crud import CRUD
 
 
@@ -9,28 +9,84 @@ logger = logging.getLogger(__name__)
 class CRUD_Usuario(CRUD):
     """CRUD para o modelo Usuario."""
 
+    # colunas únicas além do cpf_cnpj, com o nome usado nas mensagens de erro
+    UNIQUE_FIELDS = {"email": "E-mail", "telefone": "Telefone"}
+
     def __init__(self, db):
         """Inicia a classe com as configurações do banco de dados."""
         super().__init__(db)
 
-    async def get_by_cpf_cnpj(self, model, cpf_cnpj: str):
-        """Retorna um usuário pelo cpf_cnpj."""
+    async def get_by_cpf_cnpj(
+        self, model, cpf_cnpj: str, fields: list = None, options: tuple = ()
+    ):
+        """Retorna um usuário pelo cpf_cnpj; com ``fields``, só os campos pedidos."""
+        if fields is not None:
+            return await self._get_fields(model, fields, model.cpf_cnpj == cpf_cnpj)
         try:
             result = await self.db.execute(
-                select(model).where(model.cpf_cnpj == cpf_cnpj)
+                select(model).where(model.cpf_cnpj == cpf_cnpj).options(*options)
             )
             logger.info(f"Dados buscados em {model.__tablename__}")
         except Exception as e:
             logger.error(f"Dados buscados em {model.__tablename__}: {e}")
             raise e
-        return result.scalars().first()
+        return result.unique().scalars().first()
 
-    async def get_by_email(self, model, email: int):
+    async def get_by_email(self, model, email: int, options: tuple = ()):
         """Retorna um usuário pelo email."""
         try:
-            result = await self.db.execute(select(model).where(model.email == email))
+            result = await self.db.execute(
+                select(model).where(model.email == email).options(*options)
+            )
             logger.info(f"Dados buscados em {model.__tablename__}")
         except Exception as e:
             logger.error(f"Dados buscados em {model.__tablename__}: {e}")
             raise e
-        return result.scalars().first()
+        return result.unique().scalars().first()
+
+    async def check_upsert(self, model, data: list) -> tuple:
+        """Confere um lote de upsert com os usuários gravados em uma só consulta.
+
+        Retorna os usuários já cadastrados (cpf_cnpj -> senha_hash gravado) e,
+        por cpf_cnpj, os itens com email ou telefone de outro usuário,
+        comparando com os usuários gravados e com os itens anteriores do lote.
+        O upsert só trata conflitos de cpf_cnpj (``ON CONFLICT``); um conflito
+        nessas colunas desfaria o lote inteiro.
+        """
+        if not data:
+            return {}, {}
+        base = inspect(model).base_mapper.class_
+        fields = ("cpf_cnpj", *self.UNIQUE_FIELDS)
+        query = select(
+            base.senha_hash, *(getattr(base, field) for field in fields)
+        ).where(
+            or_(
+                *(
+                    getattr(base, field)
+                    == any_(literal([item[field] for item in data], ARRAY(String)))
+                    for field in fields
+                )
+            )
+        )
+        batch = {item["cpf_cnpj"] for item in data}
+        existing, owners = {}, {field: {} for field in self.UNIQUE_FIELDS}
+        for senha_hash, cpf_cnpj, *values in await self.db.execute(query):
+            if cpf_cnpj in batch:
+                existing[cpf_cnpj] = senha_hash
+            for field, value in zip(self.UNIQUE_FIELDS, values):
+                owners[field][value] = cpf_cnpj
+        conflicts = {}
+        for item in data:
+            cpf_cnpj = item["cpf_cnpj"]
+            taken = [
+                f"{label} já pertence a outro usuário"
+                for field, label in self.UNIQUE_FIELDS.items()
+                if owners[field].get(item[field], cpf_cnpj) != cpf_cnpj
+            ]
+            if taken:
+                conflicts[cpf_cnpj] = "; ".join(taken)
+                continue
+            for field in self.UNIQUE_FIELDS:
+                owners[field][item[field]] = cpf_cnpj
+        logger.info(f"Dados buscados em {base.__tablename__}")
+        return existing, conflicts
@@ -0,0 +1,193 @@
+"""Contadores do dashboard mantidos por gatilhos no banco de dados.
+
+A tabela ``dashboard_counters`` guarda, por dimensão e chave, a quantidade de
+fazendas e as somas das áreas:
+
+- ``total``: uma única linha, de chave vazia, com os totais gerais;
+- ``estado``: uma linha por UF;
+- ``uso_solo``: uma linha por par ``area_agricultavel:area_vegetacao``;
+- ``cultura``: uma linha por ``tipo_cultura``, contando as safras associadas a
+  uma fazenda.
+
+Gatilhos por instrução em ``fazendas`` e ``safras`` leem as tabelas de
+transição, agregam a diferença provocada pela instrução e a aplicam na mesma
+transação; cargas em lote (COPY, ``INSERT ... SELECT``) custam uma atualização
+por chave alterada, e não por linha. Chaves que chegam a zero são removidas.
+
+As instruções são usadas tanto pelo ``create_all`` (``app/models/models.py``)
+quanto pela migração ``0004``; ``REBUILD`` recalcula a tabela a partir das
+fazendas e safras, para corrigir divergências.
+"""
+
+TABLE = "dashboard_counters"
+
+OPERATIONS = ("insert", "update", "delete")
+
+DELTA_COLUMNS = {
+    "fazendas": "estado, area_total, area_agricultavel, area_vegetacao",
+    "safras": "tipo_cultura, fazenda_id",
+}
+
+CHANGES = {
+    "fazendas": """
+        SELECT 'total' AS dimensao, '' AS chave, sum(sinal) AS total_fazendas,
+            sum(sinal * area_total) AS area_total,
+            sum(sinal * area_agricultavel) AS area_agricultavel,
+            sum(sinal * area_vegetacao) AS area_vegetacao
+        FROM delta
+        UNION ALL
+        SELECT 'estado', estado, sum(sinal), sum(sinal * area_total),
+            sum(sinal * area_agricultavel), sum(sinal * area_vegetacao)
+        FROM delta GROUP BY estado
+        UNION ALL
+        SELECT 'uso_solo', area_agricultavel || ':' || area_vegetacao, sum(sinal),
+            sum(sinal * area_total), sum(sinal * area_agricultavel),
+            sum(sinal * area_vegetacao)
+        FROM delta GROUP BY area_agricultavel, area_vegetacao""",
+    "safras": """
+        SELECT 'cultura' AS dimensao, tipo_cultura AS chave, sum(sinal) AS total_fazendas,
+            0 AS area_total, 0 AS area_agricultavel, 0 AS area_vegetacao
+        FROM delta WHERE fazenda_id IS NOT NULL GROUP BY tipo_cultura""",
+}
+
+# A linha ``total`` é bloqueada primeiro: escritas concorrentes em fazendas
+# aguardam nela antes de bloquear qualquer outra chave, evitando deadlocks.
+FUNCTION = """
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    dimensoes text[];
+    chaves text[];
+BEGIN
+    WITH delta AS ({delta}),
+    alteracoes AS ({changes}
+    ),
+    gravados AS (
+        INSERT INTO dashboard_counters AS c
+            (dimensao, chave, total_fazendas, area_total, area_agricultavel, area_vegetacao)
+        SELECT * FROM alteracoes
+        WHERE (total_fazendas, area_total, area_agricultavel, area_vegetacao)
+            <> (0, 0, 0, 0)
+        ORDER BY dimensao <> 'total', dimensao, chave
+        ON CONFLICT (dimensao, chave) DO UPDATE SET
+            total_fazendas = c.total_fazendas + excluded.total_fazendas,
+            area_total = c.area_total + excluded.area_total,
+            area_agricultavel = c.area_agricultavel + excluded.area_agricultavel,
+            area_vegetacao = c.area_vegetacao + excluded.area_vegetacao
+        RETURNING c.dimensao, c.chave, c.total_fazendas
+    )
+    SELECT array_agg(dimensao), array_agg(chave) INTO dimensoes, chaves
+    FROM gravados WHERE total_fazendas = 0 AND dimensao <> 'total';
+
+    IF dimensoes IS NOT NULL THEN
+        DELETE FROM dashboard_counters c
+        USING unnest(dimensoes, chaves) AS z(dimensao, chave)
+        WHERE c.dimensao = z.dimensao AND c.chave = z.chave AND c.total_fazendas = 0;
+    END IF;
+    RETURN NULL;
+END
+$$"""
+
+# o gatilho é removido antes de ser criado, para que um segundo ``create_all``
+# sobre um banco existente não falhe
+DROP_TRIGGER = "DROP TRIGGER IF EXISTS dashboard_counters_{operation} ON {table}"
+
+TRIGGER = (
+    "CREATE TRIGGER dashboard_counters_{operation} AFTER {event} ON {table} "
+    "REFERENCING {transitions} FOR EACH STATEMENT EXECUTE FUNCTION {name}()"
+)
+
+TRANSITIONS = {
+    "insert": "NEW TABLE AS novas",
+    "update": "NEW TABLE AS novas OLD TABLE AS antigas",
+    "delete": "OLD TABLE AS antigas",
+}
+
+EXPECTED = """
+    SELECT
+        CASE grouping(estado, area_agricultavel, area_vegetacao)
+            WHEN 7 THEN 'total' WHEN 3 THEN 'estado' ELSE 'uso_solo'
+        END AS dimensao,
+        CASE grouping(estado, area_agricultavel, area_vegetacao)
+            WHEN 7 THEN ''
+            WHEN 3 THEN estado
+            ELSE area_agricultavel || ':' || area_vegetacao
+        END AS chave,
+        count(*) AS total_fazendas,
+        COALESCE(sum(area_total), 0) AS area_total,
+        COALESCE(sum(area_agricultavel), 0) AS area_agricultavel,
+        COALESCE(sum(area_vegetacao), 0) AS area_vegetacao
+    FROM fazendas
+    GROUP BY GROUPING SETS ((), (estado), (area_agricultavel, area_vegetacao))
+    UNION ALL
+    SELECT 'cultura', tipo_cultura, count(*), 0, 0, 0
+    FROM safras WHERE fazenda_id IS NOT NULL GROUP BY tipo_cultura"""
+
+REBUILD = [
+    "LOCK TABLE fazendas, safras IN SHARE MODE",
+    "DELETE FROM dashboard_counters",
+    "INSERT INTO dashboard_counters "
+    "(dimensao, chave, total_fazendas, area_total, area_agricultavel, area_vegetacao)"
+    + EXPECTED,
+]
+
+DRIFT = f"""
+    WITH esperado AS ({EXPECTED})
+    SELECT dimensao, chave, c.total_fazendas AS atual, e.total_fazendas AS esperado
+    FROM esperado e FULL JOIN dashboard_counters c USING (dimensao, chave)
+    WHERE (e.total_fazendas, e.area_total, e.area_agricultavel, e.area_vegetacao)
+        IS DISTINCT FROM
+        (c.total_fazendas, c.area_total, c.area_agricultavel, c.area_vegetacao)
+    ORDER BY dimensao, chave"""
+
+
+def _function_name(table: str, operation: str) -> str:
+    """Retorna o nome da função de gatilho da tabela e operação."""
+    return f"{TABLE}_{table}_{operation}"
+
+
+def _delta(table: str, operation: str) -> str:
+    """Monta a consulta da diferença da instrução: +1 por linha nova, -1 por antiga."""
+    columns = DELTA_COLUMNS[table]
+    sources = []
+    if operation != "delete":
+        sources.append(f"SELECT 1 AS sinal, {columns} FROM novas")
+    if operation != "insert":
+        sources.append(f"SELECT -1 AS sinal, {columns} FROM antigas")
+    return " UNION ALL ".join(sources)
+
+
+def create_statements() -> list:
+    """Retorna as instruções que criam as funções e os gatilhos dos contadores."""
+    statements = [
+        f"INSERT INTO {TABLE} VALUES ('total', '', 0, 0, 0, 0) ON CONFLICT DO NOTHING"
+    ]
+    for table in CHANGES:
+        for operation in OPERATIONS:
+            name = _function_name(table, operation)
+            statements.append(
+                FUNCTION.format(
+                    name=name, delta=_delta(table, operation), changes=CHANGES[table]
+                )
+            )
+            statements.append(
+                DROP_TRIGGER.format(operation=operation, table=table)
+            )
+            statements.append(
+                TRIGGER.format(
+                    operation=operation,
+                    event=operation.upper(),
+                    table=table,
+                    transitions=TRANSITIONS[operation],
+                    name=name,
+                )
+            )
+    return statements
+
+
+def drop_statements() -> list:
+    """Retorna as instruções que removem as funções e, com elas, os gatilhos."""
+    return [
+        f"DROP FUNCTION IF EXISTS {_function_name(table, operation)}() CASCADE"
+        for table in CHANGES
+        for operation in OPERATIONS
+    ]
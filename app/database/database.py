@@ -2,6 +2,8 @@ from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 
+from app.config import DATABASE
+
 
 class Base(DeclarativeBase):
     """Classe de base para o banco de dados."""
@@ -23,36 +25,67 @@ class DataBase:
         self.connection = self.db_config.get("connection", "")
         self.autocommit = self.db_config.get("autocommit", "")
         self.autoflush = self.db_config.get("autoflush", "")
+        self.create_all = self.db_config.get("create_all", False)
+        self.engine = None
+        self.session_maker = None
+
+    @property
+    def url(self) -> str:
+        """Retorna a URL de conexão com o banco de dados."""
+        return f"{self.connection}://{self.user}:{self.password}@{self.host}:{self.port}/{self.db_name}"  # noqa
 
     def _create_engine(self) -> object:
         """Cria o engine de conexão com o banco de dados."""
-        DATABASE_URL = f"{self.connection}://{self.user}:{self.password}@{self.host}:{self.port}/{self.db_name}"  # noqa
         engine = create_async_engine(
-            DATABASE_URL,
+            self.url,
             pool_size=10,
             max_overflow=20,
             pool_pre_ping=True,
         )
         return engine
 
-    def _create_session(self) -> sessionmaker:
+    def _create_session(self, engine) -> sessionmaker:
         """Cria a sessão de conexão com o banco de dados."""
-        engine = self._create_engine()
-
         return sessionmaker(
             bind=engine,
             class_=AsyncSession,
             expire_on_commit=False,
         )
 
-    async def get_db(self) -> object:
-        """Retorna a sessão de conexão com o banco de dados."""
-        engine = self._create_engine()
-        async with engine.begin() as conn:
+    def connect(self) -> None:
+        """Cria o engine e a fábrica de sessões compartilhados pelo processo."""
+        if self.engine is None:
+            self.engine = self._create_engine()
+            self.session_maker = self._create_session(self.engine)
+
+    async def disconnect(self) -> None:
+        """Encerra o pool de conexões do engine."""
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+            self.session_maker = None
+
+    async def create_tables(self) -> None:
+        """Cria as tabelas do banco de dados.
+
+        Uso restrito a desenvolvimento: em produção o esquema é mantido
+        pelas migrações do Alembic (``alembic upgrade head``).
+        """
+        self.connect()
+        async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
-        async_session = self._create_session()
-        async with async_session() as session:
+    async def get_db(self) -> object:
+        """Retorna a sessão de conexão com o banco de dados."""
+        self.connect()
+        async with self.session_maker() as session:
             yield session
 
-        await engine.dispose()
+
+data_base = DataBase(DATABASE)
+
+
+async def get_db():
+    """Retorna a sessão de conexão com o banco de dados."""
+    async for session in data_base.get_db():
+        yield session
@@ -0,0 +1,42 @@
+"""Índices de trigramas (pg_trgm) para a busca aproximada por nome.
+
+Os índices dependem da extensão ``pg_trgm``, distribuída com o PostgreSQL
+(contrib). Quando ela não está disponível no servidor, a criação é ignorada
+com um aviso e a busca por nome fica indisponível; o restante do esquema não é
+afetado. As instruções são usadas pelo ``create_all`` (``app/models/models.py``)
+e pela migração ``0007``.
+"""
+
+INDEXES = {
+    "ix_usuarios_nome_trgm": "usuarios",
+    "ix_fazendas_nome_trgm": "fazendas",
+}
+
+CREATE = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+{indexes}
+    ELSE
+        RAISE NOTICE 'Extensão pg_trgm indisponível: índices de busca não criados';
+    END IF;
+END
+$$"""
+
+CREATE_INDEX = (
+    "        CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (nome gin_trgm_ops);"
+)
+
+
+def create_statements() -> list:
+    """Retorna a instrução que cria a extensão e os índices, se disponível."""
+    indexes = "\n".join(
+        CREATE_INDEX.format(name=name, table=table) for name, table in INDEXES.items()
+    )
+    return [CREATE.format(indexes=indexes)]
+
+
+def drop_statements() -> list:
+    """Retorna as instruções que removem os índices; a extensão é mantida."""
+    return [f"DROP INDEX IF EXISTS {name}" for name in INDEXES]
@@ -1,15 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from app.database.database import data_base
 from app.logs.conflogging import setup_logging
+from app.utils import password
+from app.utils.response import ORJSONResponse
 from app.routers import (
     usuario as usuario_router,
     produtor as produtor_router,
     safra as safra_router,
     fazenda as fazenda_router,
 )
-from fastapi.responses import ORJSONResponse
 
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Abre o pool de conexões na inicialização e o encerra no desligamento."""
+    data_base.connect()
+    if data_base.create_all:
+        await data_base.create_tables()
+    yield
+    await data_base.disconnect()
+    password.shutdown()
+
+
 app = FastAPI(
     title="Gestão de Produtores Rurais",
     description="API para gerenciamento de produtores rurais.",
@@ -17,6 +32,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.include_router(usuario_router.router, prefix="/usuario", tags=["Usuario"])
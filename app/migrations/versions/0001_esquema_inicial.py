@@ -0,0 +1,86 @@
+"""esquema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("cpf_cnpj", sa.String(), nullable=False),
+        sa.Column("telefone", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("senha_hash", sa.String(), nullable=False),
+        sa.Column("tipo", sa.String(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("cpf_cnpj"),
+        sa.UniqueConstraint("email"),
+        sa.UniqueConstraint("telefone"),
+    )
+    op.create_index("ix_usuarios_id", "usuarios", ["id"])
+    op.create_table(
+        "produtores",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_produtores_id", "produtores", ["id"])
+    op.create_table(
+        "fazendas",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("cidade", sa.String(), nullable=False),
+        sa.Column("estado", sa.String(), nullable=False),
+        sa.Column("area_total", sa.Integer(), nullable=False),
+        sa.Column("area_agricultavel", sa.Integer(), nullable=False),
+        sa.Column("area_vegetacao", sa.Integer(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+        sa.Column("produtor_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["produtor_id"], ["produtores.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_fazendas_id", "fazendas", ["id"])
+    op.create_table(
+        "safras",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("tipo_cultura", sa.String(), nullable=False),
+        sa.Column("variedade", sa.String(), nullable=False),
+        sa.Column("ano_plantio", sa.Integer(), nullable=False),
+        sa.Column("ano_colheita", sa.Integer(), nullable=False),
+        sa.Column("produtividade_tonelada", sa.Float(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+        sa.Column("fazenda_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["fazenda_id"], ["fazendas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_safras_id", "safras", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_safras_id", table_name="safras")
+    op.drop_table("safras")
+    op.drop_index("ix_fazendas_id", table_name="fazendas")
+    op.drop_table("fazendas")
+    op.drop_index("ix_produtores_id", table_name="produtores")
+    op.drop_table("produtores")
+    op.drop_index("ix_usuarios_id", table_name="usuarios")
+    op.drop_table("usuarios")
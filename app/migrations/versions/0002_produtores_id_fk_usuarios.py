@@ -0,0 +1,64 @@
+"""produtores.id referencia usuarios.id
+
+A herança entre Usuario e Produtor era mapeada com a condição
+``usuarios.id = usuarios.id``, o que gerava um produto cartesiano entre as
+duas tabelas e numerava ``produtores.id`` com uma sequência própria. A tabela
+``produtores`` não guardava nenhuma chave do usuário (cpf_cnpj, email): um id
+igual ao de um usuário é coincidência, e associar as linhas pelo valor do id
+entregaria o produtor e suas fazendas a outro usuário. Por isso a migração é
+interrompida quando ``produtores`` tem linhas. Para descartá-las, soltando as
+fazendas (``produtor_id`` nulo), e recadastrar os produtores depois:
+
+    alembic -x produtores=descartar upgrade head
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    producers = op.get_bind().scalar(sa.text("SELECT count(*) FROM produtores"))
+    if producers:
+        if context.get_x_argument(as_dictionary=True).get("produtores") != "descartar":
+            raise RuntimeError(
+                f"{producers} produtores existentes não podem ser associados a "
+                "usuários: produtores.id não guarda a chave do usuário. Para "
+                "descartá-los e soltar as fazendas deles, execute "
+                "'alembic -x produtores=descartar upgrade head'."
+            )
+        op.execute("UPDATE fazendas SET produtor_id = NULL WHERE produtor_id IS NOT NULL")
+        op.execute("DELETE FROM produtores")
+    op.alter_column("produtores", "id", server_default=None)
+    op.execute("DROP SEQUENCE IF EXISTS produtores_id_seq")
+    op.create_foreign_key(
+        "produtores_id_fkey", "produtores", "usuarios", ["id"], ["id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("produtores_id_fkey", "produtores", type_="foreignkey")
+    op.execute("CREATE SEQUENCE produtores_id_seq OWNED BY produtores.id")
+    op.execute(
+        "SELECT setval('produtores_id_seq', COALESCE(MAX(id), 0) + 1, false) "
+        "FROM produtores"
+    )
+    op.alter_column(
+        "produtores",
+        "id",
+        server_default=sa.text("nextval('produtores_id_seq'::regclass)"),
+    )
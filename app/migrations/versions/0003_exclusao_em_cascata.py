@@ -0,0 +1,39 @@
+"""exclusão em cascata pelo banco de dados
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOREIGN_KEYS = [
+    ("safras_fazenda_id_fkey", "safras", "fazendas", "fazenda_id", "CASCADE"),
+    ("fazendas_produtor_id_fkey", "fazendas", "produtores", "produtor_id", "SET NULL"),
+    ("produtores_id_fkey", "produtores", "usuarios", "id", "CASCADE"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, source, referent, column, ondelete in FOREIGN_KEYS:
+        op.drop_constraint(name, source, type_="foreignkey")
+        op.create_foreign_key(
+            name, source, referent, [column], ["id"], ondelete=ondelete
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, source, referent, column, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, source, type_="foreignkey")
+        op.create_foreign_key(name, source, referent, [column], ["id"])
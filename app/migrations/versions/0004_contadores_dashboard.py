@@ -0,0 +1,49 @@
+"""contadores do dashboard mantidos por gatilhos
+
+Cria a tabela ``dashboard_counters``, as funções e os gatilhos que a mantêm
+(``app/database/dashboard_counters.py``) e a preenche a partir das fazendas e
+safras existentes.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database import dashboard_counters
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        dashboard_counters.TABLE,
+        sa.Column("dimensao", sa.String(), nullable=False),
+        sa.Column("chave", sa.String(), nullable=False),
+        sa.Column("total_fazendas", sa.BigInteger(), nullable=False),
+        sa.Column("area_total", sa.BigInteger(), nullable=False),
+        sa.Column("area_agricultavel", sa.BigInteger(), nullable=False),
+        sa.Column("area_vegetacao", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("dimensao", "chave"),
+    )
+    for statement in dashboard_counters.create_statements():
+        op.execute(statement)
+    for statement in dashboard_counters.REBUILD:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in dashboard_counters.drop_statements():
+        op.execute(statement)
+    op.drop_table(dashboard_counters.TABLE)
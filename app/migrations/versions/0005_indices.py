@@ -0,0 +1,50 @@
+"""índices das chaves estrangeiras e remoção dos índices duplicados das chaves primárias
+
+``fazendas.produtor_id`` e ``safras.fazenda_id`` são filtradas pelo
+carregamento ``selectin`` das relações, pelas ações ON DELETE e, junto com
+``nome``, pela importação. Os índices ``ix_*_id`` repetiam os das chaves
+primárias e só custavam escrita.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_fazendas_produtor_id_nome", "fazendas", ["produtor_id", "nome"]),
+    ("ix_safras_fazenda_id_nome", "safras", ["fazenda_id", "nome"]),
+]
+
+PRIMARY_KEY_INDEXES = [
+    ("ix_usuarios_id", "usuarios"),
+    ("ix_produtores_id", "produtores"),
+    ("ix_fazendas_id", "fazendas"),
+    ("ix_safras_id", "safras"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    for name, table in PRIMARY_KEY_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table in PRIMARY_KEY_INDEXES:
+        op.create_index(name, table, ["id"])
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
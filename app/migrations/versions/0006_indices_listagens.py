@@ -0,0 +1,34 @@
+"""índices das listagens filtradas e ordenadas
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_fazendas_estado_area_total", "fazendas", ["estado", "area_total", "id"]),
+    ("ix_safras_tipo_cultura_ano_colheita", "safras", ["tipo_cultura", "ano_colheita", "id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
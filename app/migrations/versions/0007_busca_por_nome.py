@@ -0,0 +1,35 @@
+"""índices de trigramas para a busca por nome
+
+Cria a extensão ``pg_trgm`` e os índices GIN de ``usuarios.nome`` e
+``fazendas.nome`` (``app/database/trigram.py``). Sem a extensão no servidor
+a migração apenas registra um aviso.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.database import trigram
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in trigram.create_statements():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in trigram.drop_statements():
+        op.execute(statement)
@@ -0,0 +1,93 @@
+"""Conversão de objetos do ORM em dicionários, gerada a partir dos modelos.
+
+As funções de conversão são montadas uma única vez, na importação, a partir
+dos metadados dos mapeamentos: cada uma lê as colunas com um ``itemgetter``
+sobre o ``__dict__`` do objeto, sem passar pelos descritores do ORM, e
+converte as coleções aninhadas com a função do modelo filho, sem
+introspecção por objeto. Colunas expiradas, ausentes do ``__dict__``, são
+lidas pelos atributos. Nos filhos aninhados a chave estrangeira para o pai
+é omitida. Coleções não carregadas ficam fora do dicionário, para que a
+conversão nunca consulte o banco. Campos sensíveis (``HIDDEN_FIELDS``) nunca
+são incluídos.
+"""
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+
+from sqlalchemy import inspect
+
+from app.models.models import Fazenda, Produtor, Safra, Usuario
+
+HIDDEN_FIELDS = frozenset({"senha_hash"})
+
+
+def compile_mapping(model: type, exclude: tuple = (), collections: dict = None):
+    """Gera a função que converte um objeto do modelo em dicionário.
+
+    ``collections`` associa o nome da chave no dicionário ao relacionamento
+    (um para muitos) e à função de conversão dos filhos.
+    """
+    columns = tuple(
+        attr.key
+        for attr in inspect(model).column_attrs
+        if attr.key not in HIDDEN_FIELDS and attr.key not in exclude
+    )
+    get_loaded, get_attributes = itemgetter(*columns), attrgetter(*columns)
+    nested = tuple(
+        (name, relationship, mapping)
+        for name, (relationship, mapping) in (collections or {}).items()
+    )
+
+    def mapping(data) -> dict:
+        loaded = data.__dict__
+        try:
+            result = dict(zip(columns, get_loaded(loaded)))
+        except KeyError:
+            result = dict(zip(columns, get_attributes(data)))
+        for name, relationship, child_mapping in nested:
+            if relationship in loaded:
+                result[name] = [child_mapping(child) for child in loaded[relationship]]
+        return result
+
+    mapping.columns = columns
+    mapping.collections = dict(collections or {})
+    return mapping
+
+
+def parent_keys(model: type, relationship: str) -> tuple:
+    """Retorna os atributos do filho que apontam para o pai no relacionamento."""
+    prop = inspect(model).relationships[relationship]
+    return tuple(
+        prop.mapper.get_property_by_column(column).key for column in prop.remote_side
+    )
+
+
+def _child(model: type, relationship: str, collections: dict = None):
+    """Gera a conversão dos filhos do relacionamento, sem a chave do pai."""
+    prop = inspect(model).relationships[relationship]
+    return (
+        relationship,
+        compile_mapping(
+            prop.mapper.class_, parent_keys(model, relationship), collections
+        ),
+    )
+
+
+usuario = compile_mapping(Usuario)
+safra = compile_mapping(Safra)
+fazenda = compile_mapping(Fazenda, collections={"safras": _child(Fazenda, "safra")})
+produtor = compile_mapping(
+    Produtor, collections={"fazendas": _child(Produtor, "fazenda")}
+)
+
+MAPPINGS = {Usuario: usuario, Produtor: produtor, Fazenda: fazenda, Safra: safra}
+
+
+@lru_cache(maxsize=None)
+def mapping_for(model: type):
+    """Retorna a conversão do modelo, gerando só as colunas dos não registrados."""
+    return MAPPINGS.get(model) or compile_mapping(model)
+
+
+def to_dict(data) -> dict:
+    """Converte um objeto do ORM em dicionário."""
+    return mapping_for(type(data))(data)
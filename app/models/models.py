@@ -1,16 +1,17 @@
-import bcrypt
 from typing import List, Optional
-from sqlalchemy import ForeignKey
+from sqlalchemy import DDL, BigInteger, ForeignKey, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.orm import relationship
+from app.database import dashboard_counters, trigram
 from app.database.database import Base
+from app.utils import password
 
 
 class Usuario(Base):
     """Tabela Usuários."""
 
     __tablename__ = "usuarios"
-    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     nome: Mapped[str] = mapped_column(nullable=False)
     cpf_cnpj: Mapped[str] = mapped_column(unique=True, nullable=False)
     telefone: Mapped[str] = mapped_column(unique=True, nullable=False)
@@ -30,16 +31,20 @@ class Usuario(Base):
 
     @senha.setter
     def senha(self, senha_sem_hash: str):
-        """Define o hash da senha usando bcrypt."""
-        self.senha_hash = bcrypt.hashpw(
-            senha_sem_hash.encode("utf-8"), bcrypt.gensalt()
-        ).decode("utf-8")
+        """Define o hash da senha usando bcrypt.
+
+        Bloqueia quem chama durante o cálculo; no loop de eventos use
+        ``app.utils.password.hash_password_async`` e grave ``senha_hash``.
+        """
+        self.senha_hash = password.hash_password(senha_sem_hash)
 
     def verify_password(self, senha_sem_hash: str) -> bool:
         """Verifica se a senha clara corresponde ao hash armazenado."""
-        return bcrypt.checkpw(
-            senha_sem_hash.encode("utf-8"), self.senha_hash.encode("utf-8")
-        )
+        return password.check_password(senha_sem_hash, self.senha_hash)
+
+    async def verify_password_async(self, senha_sem_hash: str) -> bool:
+        """Verifica a senha no pool de threads do bcrypt, sem bloquear o loop."""
+        return await password.check_password_async(senha_sem_hash, self.senha_hash)
 
 
 class Produtor(Usuario):
@@ -47,17 +52,21 @@ class Produtor(Usuario):
 
     __tablename__ = "produtores"
 
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
+    id: Mapped[int] = mapped_column(
+        ForeignKey("usuarios.id", ondelete="CASCADE"), primary_key=True
+    )
 
+    # carregadas só quando a consulta pede (``CRUD.load``); o acesso sem a
+    # carga é um erro, nunca uma consulta implícita
     fazenda: Mapped[list["Fazenda"]] = relationship(
         "Fazenda",
         back_populates="produtor",
         cascade="save-update, merge",
-        lazy="selectin",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     __mapper_args__ = {
         "polymorphic_identity": "produtor",
-        "inherit_condition": Usuario.id == Usuario.id,
     }
 
 
@@ -65,7 +74,16 @@ class Safra(Base):
     """Tabela Safras."""
 
     __tablename__ = "safras"
-    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
+    # a chave estrangeira vem primeiro: atende ao carregamento das safras da
+    # fazenda, à exclusão em cascata e à busca por nome na importação; a
+    # listagem por cultura, ordenada ou filtrada pelo ano de colheita, usa o
+    # segundo índice
+    __table_args__ = (
+        Index("ix_safras_fazenda_id_nome", "fazenda_id", "nome"),
+        Index("ix_safras_tipo_cultura_ano_colheita", "tipo_cultura", "ano_colheita", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     nome: Mapped[str] = mapped_column(nullable=False)
     tipo_cultura: Mapped[str] = mapped_column(nullable=False)
     variedade: Mapped[str] = mapped_column(nullable=False)
@@ -74,7 +92,9 @@ class Safra(Base):
     produtividade_tonelada: Mapped[float] = mapped_column(nullable=False)
     ativo: Mapped[bool] = mapped_column(nullable=False)
 
-    fazenda_id: Mapped[int] = mapped_column(ForeignKey("fazendas.id"), nullable=True)
+    fazenda_id: Mapped[int] = mapped_column(
+        ForeignKey("fazendas.id", ondelete="CASCADE"), nullable=True
+    )
 
     fazenda: Mapped[list["Fazenda"]] = relationship(
         "Fazenda",
@@ -96,8 +116,15 @@ class Fazenda(Base):
     """Modelo para a tabela Fazendas."""
 
     __tablename__ = "fazendas"
+    # atende ao carregamento das fazendas do produtor, ao ON DELETE SET NULL
+    # e à busca por nome na importação; a listagem por estado ordenada pela
+    # área usa o segundo índice
+    __table_args__ = (
+        Index("ix_fazendas_produtor_id_nome", "produtor_id", "nome"),
+        Index("ix_fazendas_estado_area_total", "estado", "area_total", "id"),
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     nome: Mapped[str] = mapped_column(nullable=False)
     cidade: Mapped[str] = mapped_column(nullable=False)
     estado: Mapped[str] = mapped_column(nullable=False)
@@ -107,15 +134,20 @@ class Fazenda(Base):
     ativo: Mapped[bool] = mapped_column(nullable=False)
 
     produtor_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("produtores.id"), nullable=True
+        ForeignKey("produtores.id", ondelete="SET NULL"), nullable=True
     )
 
     produtor: Mapped[Optional["Produtor"]] = relationship(
         "Produtor", back_populates="fazenda", cascade="save-update, merge"
     )
 
+    # carregadas só quando a consulta pede (``CRUD.load``)
     safra: Mapped[List["Safra"]] = relationship(
-        "Safra", back_populates="fazenda", lazy="selectin", cascade="all, delete-orphan"
+        "Safra",
+        back_populates="fazenda",
+        lazy="raise_on_sql",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self) -> str:
@@ -127,3 +159,26 @@ class Fazenda(Base):
             f"area_total={self.area_total}"
             f")>"
         )
+
+
+class ContadorDashboard(Base):
+    """Tabela de contadores do dashboard, mantida por gatilhos no banco de dados."""
+
+    __tablename__ = dashboard_counters.TABLE
+
+    dimensao: Mapped[str] = mapped_column(primary_key=True)
+    chave: Mapped[str] = mapped_column(primary_key=True)
+    total_fazendas: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    area_total: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    area_agricultavel: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    area_vegetacao: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+for statement in dashboard_counters.create_statements() + trigram.create_statements():
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in dashboard_counters.drop_statements():
+    event.listen(
+        Base.metadata, "before_drop", DDL(statement).execute_if(dialect="postgresql")
+    )
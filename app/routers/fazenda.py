@@ -1,27 +1,26 @@
 import logging
-from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from typing import List
-from app.database.database import DataBase
-from app.database.crud_fazenda import CRUD_Fazenda
-from app.models.models import Fazenda, Safra
+from fastapi import APIRouter, Body, HTTPException, Request, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.database.crud import (
+    BULK_MAX_SIZE,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_LIMIT,
+    PAGE_SIZE,
+    SEARCH_LIMIT,
+)
+from app.database.database import get_db
+from app.database.crud_fazenda import CRUD_Fazenda, dashboard_cache
+from app.models.models import ContadorDashboard, Fazenda, Safra
 from app.services.fazenda import Fazenda as FazendaService
 from app.schemas.fazenda import CreateUpdateFazenda, FazendaResponse
-
-from app.config import DATABASE
-
-data_base = DataBase(DATABASE)
+from app.schemas.pagina import Pagina
+from app.utils.ndjson import ndjson_batches
+from app.utils.fields import sparse_fields
+from app.utils.response import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
-
-async def get_db():
-    """Retorna a sessão de conexão com o banco de dados."""
-    async for session in data_base.get_db():
-        yield session
-
-
 router = APIRouter()
 
 
@@ -35,35 +34,120 @@ async def create_fazenda(
     try:
         response = await fazenda_service.create(data.model_dump())
         logger.info(f"Fazenda criada em {request.url.path}")
-        return JSONResponse(status_code=201, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=201, content=response)
     except Exception as e:
         logger.error(f"Erro ao criar fazenda em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[FazendaResponse], tags=["Fazenda"])
-async def get_fazenda(request: Request, db=Depends(get_db)):
-    """Busca todas as fazenda."""
+@router.post("/bulk", tags=["Fazenda"])
+async def bulk_create_fazenda(
+    request: Request,
+    data: List[dict] = Body(..., max_length=BULK_MAX_SIZE),
+    db=Depends(get_db),
+):
+    """Cria várias fazendas em uma única transação.
+
+    Cada item é validado com ``CreateUpdateFazenda``; os inválidos são reportados em
+    ``errors`` pela posição no lote e só os válidos são gravados.
+    """
+    crud = CRUD_Fazenda(db)
+    fazenda_service = FazendaService(Fazenda, crud)
+    try:
+        response = await fazenda_service.bulk_create(data)
+        logger.info(f"{len(response['created'])} fazendas criadas em {request.url.path}")
+        return ORJSONResponse(status_code=201, content=response)
+    except Exception as e:
+        logger.error(f"Erro ao criar fazendas em {request.url.path}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/", response_model=Pagina[FazendaResponse], tags=["Fazenda"])
+async def get_fazenda(
+    request: Request,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    estado: Optional[str] = None,
+    cidade: Optional[str] = None,
+    ativo: Optional[bool] = None,
+    produtor_id: Optional[int] = None,
+    tipo_cultura: Optional[str] = None,
+    sort: str = Query("id", description="id, nome ou area_total; '-' inverte a ordem"),
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
+    """Busca as fazendas filtradas e paginadas por cursor."""
+    crud = CRUD_Fazenda(db)
+    fazenda_service = FazendaService(Fazenda, crud)
+    filters = {
+        "estado": estado,
+        "cidade": cidade,
+        "ativo": ativo,
+        "produtor_id": produtor_id,
+        "tipo_cultura": tipo_cultura,
+    }
+    try:
+        response = await fazenda_service.get_page(limit, after, filters, sort, fields)
+        logger.info(f"Dados buscados em {request.url.path}")
+        return ORJSONResponse(status_code=200, content=response)
+    except Exception as e:
+        logger.error(f"Dados buscados em {request.url.path}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/search", response_model=List[FazendaResponse], tags=["Fazenda"])
+async def search_fazenda(
+    request: Request,
+    q: str = Query(..., min_length=3),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
+    """Busca fazendas pelo nome aproximado, dos mais aos menos semelhantes."""
     crud = CRUD_Fazenda(db)
     fazenda_service = FazendaService(Fazenda, crud)
     try:
-        response = await fazenda_service.get_all()
+        response = await fazenda_service.search(q, limit, fields)
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/export", tags=["Fazenda"])
+async def export_fazenda(request: Request):
+    """Exporta todas as fazendas com suas safras em NDJSON."""
+
+    async def generate():
+        async for db in get_db():
+            crud = CRUD_Fazenda(db)
+            fazenda_service = FazendaService(Fazenda, crud)
+            try:
+                async for chunk in ndjson_batches(fazenda_service.export()):
+                    yield chunk
+                logger.info(f"Dados exportados em {request.url.path}")
+            except Exception as e:
+                logger.error(f"Erro ao exportar fazendas em {request.url.path}: {e}")
+                raise e
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/{id}", response_model=FazendaResponse, tags=["Fazenda"])
-async def get_fazenda_by_id(request: Request, id: int, db=Depends(get_db)):
+async def get_fazenda_by_id(
+    request: Request,
+    id: int,
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
     """Busca uma fazenda pelo id."""
     crud = CRUD_Fazenda(db)
     fazenda_service = FazendaService(Fazenda, crud)
     try:
-        response = await fazenda_service.get_by_id(id)
+        response = await fazenda_service.get_by_id(id, fields)
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -79,7 +163,7 @@ async def update_fazenda(
     try:
         response = await fazenda_service.update(id, data.model_dump())
         logger.info(f"Fazenda atualizada em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao atualizar fazenda em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -93,7 +177,7 @@ async def delete_fazenda(request: Request, id: int, db=Depends(get_db)):
     try:
         response = await fazenda_service.delete(id)
         logger.info(f"Fazenda excluida em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao excluir fazenda em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -107,21 +191,46 @@ async def soft_delete_fazenda(request: Request, id: int, db=Depends(get_db)):
     try:
         response = await fazenda_service.soft_delete(id)
         logger.info(f"Fazenda desativada em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao desativar fazenda em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/dashboard/data", tags=["Fazenda"])
-async def get_fazenda_dashboard(request: Request, db=Depends(get_db)):
-    """Busca dados para o dashboard."""
+async def get_fazenda_dashboard(
+    request: Request,
+    soil_use_bucket: Optional[int] = Query(None, ge=1),
+    db=Depends(get_db),
+):
+    """Busca dados para o dashboard.
+
+    Com ``soil_use_bucket`` o uso do solo é agrupado em faixas de áreas dessa
+    largura, em vez de uma linha por par de áreas.
+    """
     crud = CRUD_Fazenda(db)
     fazenda_service = FazendaService(Fazenda, crud)
     try:
-        response = await fazenda_service.get_dashboard_data(Safra)
+        response = await fazenda_service.get_dashboard_data(
+            Safra, ContadorDashboard, soil_use_bucket
+        )
+        logger.info(f"Dados buscados em {request.url.path}")
+        return ORJSONResponse(status_code=200, content=response)
+    except Exception as e:
+        logger.error(f"Dados buscados em {request.url.path}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/dashboard/cache", tags=["Fazenda"])
+async def get_fazenda_dashboard_cache(request: Request):
+    """Busca os contadores de acertos e falhas do cache do dashboard.
+
+    Os contadores ficam na memória do processo; a rota não abre sessão no banco.
+    """
+    try:
+        response = dashboard_cache.stats()
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -143,7 +252,7 @@ async def handle_crop_in_farm_add(
             Safra, farm_id, crop_id, True
         )
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -165,7 +274,7 @@ async def handle_crop_in_farm_remove(
             Safra, farm_id, crop_id, False
         )
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
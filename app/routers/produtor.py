@@ -1,28 +1,27 @@
 import logging
-from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from app.database.database import DataBase
+from fastapi import APIRouter, Body, HTTPException, Request, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.database.crud import (
+    BULK_MAX_SIZE,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_LIMIT,
+    PAGE_SIZE,
+    SEARCH_LIMIT,
+)
+from app.database.database import get_db
 from app.database.crud_produtor import CRUD_Produtor
 from app.models.models import Produtor, Fazenda
 from app.services.produtor import Produtor as ProdutorService
 from app.schemas.usuario import CreateUpdateUsuario as CreateUpdateProdutor
 from app.schemas.produtor import ProdutorResponse
-from typing import List
-
-from app.config import DATABASE
-
-data_base = DataBase(DATABASE)
+from app.schemas.pagina import Pagina
+from app.utils.ndjson import ndjson_batches
+from app.utils.fields import sparse_fields
+from app.utils.response import ORJSONResponse
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
-
-async def get_db():
-    """Retorna a sessão de conexão com o banco de dados."""
-    async for session in data_base.get_db():
-        yield session
-
-
 router = APIRouter()
 
 
@@ -36,49 +35,140 @@ async def create_producer(
     try:
         response = await produtor_service.create(data.model_dump())
         logger.info(f"Produtor criado em {request.url.path}")
-        return JSONResponse(status_code=201, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=201, content=response)
     except Exception as e:
         logger.error(f"Erro ao criar produtor em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[ProdutorResponse], tags=["Produtor"])
-async def get_producers(request: Request, db=Depends(get_db)):
-    """Busca todos os produtor."""
+@router.get("/", response_model=Pagina[ProdutorResponse], tags=["Produtor"])
+async def get_producers(
+    request: Request,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
+    """Busca os produtores paginados por cursor."""
     crud = CRUD_Produtor(db)
     produtor_service = ProdutorService(Produtor, crud)
     try:
-        response = await produtor_service.get_all()
+        response = await produtor_service.get_page(limit, after, fields)
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/search", response_model=List[ProdutorResponse], tags=["Produtor"])
+async def search_produtor(
+    request: Request,
+    q: str = Query(..., min_length=3),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
+    """Busca produtores pelo nome aproximado, dos mais aos menos semelhantes."""
+    crud = CRUD_Produtor(db)
+    produtor_service = ProdutorService(Produtor, crud)
+    try:
+        response = await produtor_service.search(q, limit, fields)
+        logger.info(f"Dados buscados em {request.url.path}")
+        return ORJSONResponse(status_code=200, content=response)
+    except Exception as e:
+        logger.error(f"Dados buscados em {request.url.path}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export", tags=["Produtor"])
+async def export_produtor(request: Request):
+    """Exporta todos os produtores com suas fazendas em NDJSON."""
+
+    async def generate():
+        async for db in get_db():
+            crud = CRUD_Produtor(db)
+            produtor_service = ProdutorService(Produtor, crud)
+            try:
+                async for chunk in ndjson_batches(produtor_service.export()):
+                    yield chunk
+                logger.info(f"Dados exportados em {request.url.path}")
+            except Exception as e:
+                logger.error(f"Erro ao exportar produtores em {request.url.path}: {e}")
+                raise e
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.put("/upsert", response_model=ProdutorResponse, tags=["Produtor"])
+async def upsert_producer(
+    request: Request, data: CreateUpdateProdutor, db=Depends(get_db)
+):
+    """Cria ou atualiza um produtor pelo CPF/CNPJ."""
+    crud = CRUD_Produtor(db)
+    produtor_service = ProdutorService(Produtor, crud)
+    try:
+        response = await produtor_service.upsert(data.model_dump())
+        logger.info(f"Produtor sincronizado em {request.url.path}")
+        return ORJSONResponse(status_code=200, content=response)
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar produtor em {request.url.path}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/upsert/bulk", tags=["Produtor"])
+async def bulk_upsert_producers(
+    request: Request,
+    data: List[CreateUpdateProdutor] = Body(..., max_length=BULK_MAX_SIZE),
+    db=Depends(get_db),
+):
+    """Cria ou atualiza vários produtores pelo CPF/CNPJ."""
+    crud = CRUD_Produtor(db)
+    produtor_service = ProdutorService(Produtor, crud)
+    try:
+        response = await produtor_service.bulk_upsert(
+            [item.model_dump() for item in data]
+        )
+        logger.info(f"Produtores sincronizados em {request.url.path}")
+        return ORJSONResponse(status_code=200, content=response)
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar produtores em {request.url.path}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{id}", response_model=ProdutorResponse, tags=["Produtor"])
-async def get_producer_by_id(request: Request, id: int, db=Depends(get_db)):
+async def get_producer_by_id(
+    request: Request,
+    id: int,
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
     """Busca um produtor pelo id."""
     crud = CRUD_Produtor(db)
     produtor_service = ProdutorService(Produtor, crud)
     try:
-        response = await produtor_service.get_by_id(id)
+        response = await produtor_service.get_by_id(id, fields)
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/cpf_cnpj/{cpf_cnpj}", response_model=ProdutorResponse, tags=["Produtor"])
-async def get_producer_by_cpf_cnpj(request: Request, cpf_cnpj: str, db=Depends(get_db)):
+async def get_producer_by_cpf_cnpj(
+    request: Request,
+    cpf_cnpj: str,
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
     """Busca um produtor pelo cpf_cnpj."""
     crud = CRUD_Produtor(db)
     produtor_service = ProdutorService(Produtor, crud)
     try:
-        response = await produtor_service.get_by_cpf_cnpj(cpf_cnpj)
+        response = await produtor_service.get_by_cpf_cnpj(cpf_cnpj, fields)
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -94,7 +184,7 @@ async def update_producer(
     try:
         response = await produtor_service.update(id, data.model_dump())
         logger.info(f"Produtor atualizado em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao atualizar produtor em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -108,7 +198,7 @@ async def delete_producer(request: Request, id: int, db=Depends(get_db)):
     try:
         response = await produtor_service.delete(id)
         logger.info(f"Produtor excluido em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao excluir produtor em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -122,7 +212,7 @@ async def soft_delete_producer(request: Request, id: int, db=Depends(get_db)):
     try:
         response = await produtor_service.soft_delete(id)
         logger.info(f"Produtor desativado em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao desativar produtor em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -141,7 +231,7 @@ async def handle_farm_in_producer_add(
             Fazenda, producer_id, farm_id
         )
         logger.info(f"Fazenda adicionada ao produtor em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(
             f"Erro ao adicionar fazenda ao produtor em {request.url.path}: {e}"
@@ -163,7 +253,7 @@ async def handle_farm_in_producer_add(
             Fazenda, producer_id, farm_id, False
         )
         logger.info(f"Fazenda removida do produtor em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao remover fazenda do produtor em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,26 +1,19 @@
 import logging
-from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from app.database.database import DataBase
+from fastapi import APIRouter, Body, HTTPException, Request, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.database.crud import BULK_MAX_SIZE, MAX_PAGE_SIZE, PAGE_SIZE
+from app.database.database import get_db
 from app.database.crud_safra import CRUD_Safra
 from app.models.models import Safra
 from app.services.safra import Safra as SafraService
 from app.schemas.safra import CreateUpdateSafra
-
-from app.config import DATABASE
-
-data_base = DataBase(DATABASE)
+from app.utils.ndjson import ndjson_batches
+from app.utils.fields import sparse_fields
+from app.utils.response import ORJSONResponse
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
-
-async def get_db():
-    """Retorna a sessão de conexão com o banco de dados."""
-    async for session in data_base.get_db():
-        yield session
-
-
 router = APIRouter()
 
 
@@ -32,35 +25,102 @@ async def create_safra(request: Request, data: CreateUpdateSafra, db=Depends(get
     try:
         response = await safra_service.create(data.model_dump())
         logger.info(f"Safra criada em {request.url.path}")
-        return JSONResponse(status_code=201, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=201, content=response)
     except Exception as e:
         logger.error(f"Erro ao criar safra em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", tags=["Safra"])
+async def bulk_create_safra(
+    request: Request,
+    data: List[dict] = Body(..., max_length=BULK_MAX_SIZE),
+    db=Depends(get_db),
+):
+    """Cria várias safras em uma única transação.
+
+    Cada item é validado com ``CreateUpdateSafra``; os inválidos são reportados em
+    ``errors`` pela posição no lote e só os válidos são gravados.
+    """
+    crud = CRUD_Safra(db)
+    safra_service = SafraService(Safra, crud)
+    try:
+        response = await safra_service.bulk_create(data)
+        logger.info(f"{len(response['created'])} safras criadas em {request.url.path}")
+        return ORJSONResponse(status_code=201, content=response)
+    except Exception as e:
+        logger.error(f"Erro ao criar safras em {request.url.path}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/", tags=["Safra"])
-async def get_safra(request: Request, db=Depends(get_db)):
-    """Busca todas as safra."""
+async def get_safra(
+    request: Request,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    tipo_cultura: Optional[str] = None,
+    ativo: Optional[bool] = None,
+    fazenda_id: Optional[int] = None,
+    ano_colheita_min: Optional[int] = None,
+    ano_colheita_max: Optional[int] = None,
+    sort: str = Query(
+        "id", description="id, ano_colheita ou produtividade_tonelada; '-' inverte a ordem"
+    ),
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
+    """Busca as safras filtradas e paginadas por cursor."""
     crud = CRUD_Safra(db)
     safra_service = SafraService(Safra, crud)
+    filters = {
+        "tipo_cultura": tipo_cultura,
+        "ativo": ativo,
+        "fazenda_id": fazenda_id,
+        "ano_colheita_min": ano_colheita_min,
+        "ano_colheita_max": ano_colheita_max,
+    }
     try:
-        response = await safra_service.get_all()
+        response = await safra_service.get_page(limit, after, filters, sort, fields)
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/export", tags=["Safra"])
+async def export_safra(request: Request):
+    """Exporta todas as safras em NDJSON."""
+
+    async def generate():
+        async for db in get_db():
+            crud = CRUD_Safra(db)
+            safra_service = SafraService(Safra, crud)
+            try:
+                async for chunk in ndjson_batches(safra_service.export()):
+                    yield chunk
+                logger.info(f"Dados exportados em {request.url.path}")
+            except Exception as e:
+                logger.error(f"Erro ao exportar safras em {request.url.path}: {e}")
+                raise e
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/{id}", tags=["Safra"])
-async def get_safra_by_id(request: Request, id: int, db=Depends(get_db)):
+async def get_safra_by_id(
+    request: Request,
+    id: int,
+    fields=Depends(sparse_fields),
+    db=Depends(get_db),
+):
     """Busca uma safra pelo id."""
     crud = CRUD_Safra(db)
     safra_service = SafraService(Safra, crud)
     try:
-        response = await safra_service.get_by_id(id)
+        response = await safra_service.get_by_id(id, fields)
         logger.info(f"Dados buscados em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Dados buscados em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -74,9 +134,9 @@ async def update_safra(
     crud = CRUD_Safra(db)
     safra_service = SafraService(Safra, crud)
     try:
-        response = await safra_service.update(id, data)
+        response = await safra_service.update(id, data.model_dump())
         logger.info(f"Safra atualizada em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao atualizar safra em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -90,7 +150,7 @@ async def delete_safra(request: Request, id: int, db=Depends(get_db)):
     try:
         response = await safra_service.delete(id)
         logger.info(f"Safra excluida em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao excluir safra em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -104,7 +164,7 @@ async def soft_delete_safra(request: Request, id: int, db=Depends(get_db)):
     try:
         response = await safra_service.soft_delete(id)
         logger.info(f"Safra desativada em {request.url.path}")
-        return JSONResponse(status_code=200, content=jsonable_encoder(response))
+        return ORJSONResponse(status_code=200, content=response)
     except Exception as e:
         logger.error(f"Erro ao desativar safra em {request.url.path}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
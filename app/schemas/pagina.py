@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Pagina(BaseModel, Generic[T]):
+    """Schema para retorno de uma página de resultados."""
+
+    items: List[T]
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor para a próxima página (ausente na última página).",
+    )
@@ -0,0 +1,250 @@
+"""Mede a latência de operações da API sobre o banco configurado.
+
+Cada subcomando executa a operação algumas vezes, após um aquecimento, e
+mostra a latência mínima, a mediana, o p95 e a média em milissegundos. Use
+``app/scripts/seed.py`` para gerar uma base do tamanho desejado antes.
+
+Uso:
+    python -m app.scripts.benchmark dashboard --iterations 20
+    python -m app.scripts.benchmark read --iterations 200
+    python -m app.scripts.benchmark signup_burst --iterations 20
+    python -m app.scripts.benchmark serialize_orjson --iterations 20
+    python -m app.scripts.benchmark list_rows --iterations 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.config import DATABASE
+from app.database.crud import CRUD
+from app.database.crud_fazenda import CRUD_Fazenda
+from app.database.crud_produtor import CRUD_Produtor
+from app.database.database import DataBase
+from app.models.models import ContadorDashboard, Fazenda, Produtor, Safra
+from app.scripts.seed import cpf
+from app.services.fazenda import Fazenda as FazendaService
+from app.services.produtor import Produtor as ProdutorService
+from app.utils import cache
+from app.utils.response import ORJSONResponse
+
+SERIALIZE_ROWS = 10000
+LIST_ROWS = 100000
+
+
+def summary(name: str, timings: list) -> dict:
+    """Resume as latências medidas, em milissegundos."""
+    timings = sorted(timing * 1000 for timing in timings)
+    return {
+        "operacao": name,
+        "execucoes": len(timings),
+        "min": timings[0],
+        "p50": statistics.median(timings),
+        "p95": timings[max(0, round(len(timings) * 0.95) - 1)],
+        "media": statistics.fmean(timings),
+    }
+
+
+async def measure(operation, iterations: int, warmup: int = 1) -> list:
+    """Executa a operação e retorna o tempo de cada execução, em segundos."""
+    for _ in range(warmup):
+        await operation()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await operation()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench_dashboard(
+    data_base: DataBase, iterations: int, soil_use_bucket: int = None
+) -> dict:
+    """Mede a montagem dos dados do dashboard de fazendas, sem o cache."""
+    async with data_base.session_maker() as session:
+        service = FazendaService(Fazenda, CRUD_Fazenda(session))
+
+        async def operation():
+            cache.clear_all()
+            return await service.get_dashboard_data(
+                Safra, ContadorDashboard, soil_use_bucket
+            )
+
+        timings = await measure(operation, iterations)
+    return summary("dashboard", timings)
+
+
+async def bench_dashboard_histogram(data_base: DataBase, iterations: int) -> dict:
+    """Mede o dashboard com o uso do solo em faixas de 500 hectares."""
+    result = await bench_dashboard(data_base, iterations, soil_use_bucket=500)
+    return {**result, "operacao": "dashboard_histogram"}
+
+
+async def _read(session) -> None:
+    """Leitura simples usada como sonda de latência."""
+    await CRUD(session).get_by_id(Fazenda, 1)
+    session.expunge_all()
+
+
+async def bench_read(data_base: DataBase, iterations: int) -> dict:
+    """Mede a leitura de uma fazenda pelo id, sem outra carga no processo."""
+    async with data_base.session_maker() as session:
+        timings = await measure(lambda: _read(session), iterations)
+    return summary("read", timings)
+
+
+async def _signup(data_base: DataBase, index: int) -> int:
+    """Cadastra um produtor de teste, com o hash da senha, e retorna o id."""
+    async with data_base.session_maker() as session:
+        service = ProdutorService(Produtor, CRUD_Produtor(session))
+        producer = await service.create(
+            {
+                "nome": f"Produtor Benchmark {index}",
+                "cpf_cnpj": cpf(900000000 + index),
+                "telefone": f"119{900000000 + index}",
+                "email": f"benchmark{index}@exemplo.com.br",
+                "senha": "Senha123!",
+                "tipo": "comum",
+                "ativo": True,
+            }
+        )
+        return producer.id
+
+
+async def bench_signup_burst(data_base: DataBase, iterations: int) -> dict:
+    """Mede a leitura de uma fazenda durante uma rajada de ``iterations`` cadastros.
+
+    Compare com o benchmark ``read``: com o bcrypt fora do loop de eventos a
+    latência da leitura se mantém durante os cadastros.
+    """
+    burst = asyncio.gather(*(_signup(data_base, index) for index in range(iterations)))
+    timings = []
+    try:
+        async with data_base.session_maker() as session:
+            await _read(session)
+            while not burst.done():
+                start = time.perf_counter()
+                await _read(session)
+                timings.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+        ids = await burst
+    finally:
+        if not burst.done():
+            burst.cancel()
+    async with data_base.session_maker() as session:
+        crud = CRUD_Produtor(session)
+        for id in ids:
+            await crud.delete(Produtor, id)
+    return summary("signup_burst", timings)
+
+
+async def _load_farms(data_base: DataBase, limit: int = SERIALIZE_ROWS) -> list:
+    """Carrega as primeiras fazendas, com as safras, para medir a serialização."""
+    async with data_base.session_maker() as session:
+        result = await session.execute(
+            select(Fazenda)
+            .options(selectinload(Fazenda.safra))
+            .order_by(Fazenda.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+
+async def bench_serialize_jsonable_encoder(data_base: DataBase, iterations: int) -> dict:
+    """Mede a serialização de 10 mil fazendas com ``jsonable_encoder`` e ``json``."""
+    farms = await _load_farms(data_base)
+
+    async def operation():
+        return JSONResponse(content=jsonable_encoder(farms)).body
+
+    timings = await measure(operation, iterations)
+    return summary("serialize_jsonable_encoder", timings)
+
+
+async def bench_serialize_orjson(data_base: DataBase, iterations: int) -> dict:
+    """Mede a serialização de 10 mil fazendas com a resposta orjson da API."""
+    farms = await _load_farms(data_base)
+
+    async def operation():
+        return ORJSONResponse(content=farms).body
+
+    timings = await measure(operation, iterations)
+    return summary("serialize_orjson", timings)
+
+
+async def bench_list_entities(data_base: DataBase, iterations: int) -> dict:
+    """Mede a carga de 100 mil fazendas, com as safras, como objetos do ORM."""
+    async with data_base.session_maker() as session:
+
+        async def operation():
+            query = (
+                select(Fazenda)
+                .options(selectinload(Fazenda.safra))
+                .order_by(Fazenda.id)
+                .limit(LIST_ROWS)
+            )
+            farms = (await session.execute(query)).scalars().all()
+            session.expunge_all()
+            return farms
+
+        timings = await measure(operation, iterations)
+    return summary("list_entities", timings)
+
+
+async def bench_list_rows(data_base: DataBase, iterations: int) -> dict:
+    """Mede a mesma carga pela listagem da API, com projeção de colunas."""
+    async with data_base.session_maker() as session:
+        crud = CRUD_Fazenda(session)
+        timings = await measure(lambda: crud.get_page(Fazenda, LIST_ROWS), iterations)
+    return summary("list_rows", timings)
+
+
+BENCHMARKS = {
+    "dashboard": bench_dashboard,
+    "dashboard_histogram": bench_dashboard_histogram,
+    "list_entities": bench_list_entities,
+    "list_rows": bench_list_rows,
+    "read": bench_read,
+    "serialize_jsonable_encoder": bench_serialize_jsonable_encoder,
+    "serialize_orjson": bench_serialize_orjson,
+    "signup_burst": bench_signup_burst,
+}
+
+
+def parse_args(args=None):
+    """Lê os argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.scripts.benchmark",
+        description="Mede a latência de operações da API.",
+    )
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument(
+        "--iterations", type=int, default=20, help="Execuções medidas (padrão: 20)."
+    )
+    return parser.parse_args(args)
+
+
+async def main(args=None) -> dict:
+    """Executa o benchmark escolhido."""
+    args = parse_args(args)
+    data_base = DataBase(DATABASE)
+    data_base.connect()
+    try:
+        result = await BENCHMARKS[args.benchmark](data_base, args.iterations)
+    finally:
+        await data_base.disconnect()
+    print(
+        f"{result['operacao']}: {result['execucoes']} execuções, "
+        f"min {result['min']:.1f} ms, p50 {result['p50']:.1f} ms, "
+        f"p95 {result['p95']:.1f} ms, média {result['media']:.1f} ms"
+    )
+    return result
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
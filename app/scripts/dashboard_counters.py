@@ -0,0 +1,82 @@
+"""Confere e reconstrói os contadores do dashboard.
+
+Os contadores são mantidos por gatilhos em ``fazendas`` e ``safras``, mas
+escritas que não disparam gatilhos (``TRUNCATE``, restauração de backup com os
+gatilhos desativados) os deixam divergentes. ``check`` lista as chaves
+divergentes; ``rebuild`` recalcula a tabela a partir das fazendas e safras,
+bloqueando as escritas nelas até o fim da transação. O cache do dashboard de
+processos em execução expira pelo TTL configurado.
+
+Uso:
+    python -m app.scripts.dashboard_counters check
+    python -m app.scripts.dashboard_counters rebuild
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+
+from app.config import DATABASE
+from app.database import dashboard_counters
+from app.database.database import DataBase
+from app.logs.conflogging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+async def check(engine) -> list:
+    """Retorna as chaves cujos contadores divergem das fazendas e safras."""
+    async with engine.connect() as conn:
+        result = await conn.execute(text(dashboard_counters.DRIFT))
+        return [dict(row._mapping) for row in result]
+
+
+async def rebuild(engine) -> int:
+    """Recalcula os contadores, retornando a quantidade de chaves gravadas."""
+    start = time.perf_counter()
+    async with engine.begin() as conn:
+        for statement in dashboard_counters.REBUILD:
+            result = await conn.execute(text(statement))
+    logger.info(
+        f"{result.rowcount} contadores recalculados em {time.perf_counter() - start:.1f}s"
+    )
+    return result.rowcount
+
+
+def parse_args(args=None):
+    """Lê os argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.scripts.dashboard_counters",
+        description="Confere e reconstrói os contadores do dashboard.",
+    )
+    parser.add_argument("command", choices=["check", "rebuild"])
+    return parser.parse_args(args)
+
+
+async def main(args=None):
+    """Executa o comando escolhido."""
+    args = parse_args(args)
+    data_base = DataBase(DATABASE)
+    data_base.connect()
+    try:
+        if args.command == "rebuild":
+            result = await rebuild(data_base.engine)
+            print(f"{result} contadores recalculados")
+        else:
+            result = await check(data_base.engine)
+            for row in result:
+                print(
+                    f"{row['dimensao']} {row['chave']!r}: "
+                    f"{row['atual']} (esperado {row['esperado']})"
+                )
+            print(f"{len(result)} contadores divergentes")
+    finally:
+        await data_base.disconnect()
+    return result
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -0,0 +1,456 @@
+"""Importa produtores, fazendas e safras de um arquivo CSV ou NDJSON.
+
+Cada linha do arquivo descreve um produtor e, opcionalmente, uma de suas
+fazendas e uma safra dessa fazenda, com as colunas:
+
+    cpf_cnpj, nome, telefone, email, senha,
+    fazenda_nome, cidade, estado, area_total, area_agricultavel, area_vegetacao,
+    safra_nome, tipo_cultura, variedade, ano_plantio, ano_colheita,
+    produtividade_tonelada
+
+As linhas são validadas em lotes, copiadas (COPY) para tabelas temporárias e
+mescladas nas tabelas definitivas com instruções set-based. Produtores são
+identificados pelo cpf_cnpj, fazendas pelo nome dentro do produtor e safras
+pelo nome dentro da fazenda, de modo que reimportar um arquivo atualiza os
+dados em vez de duplicá-los. Produtores com email ou telefone de outro usuário
+(gravado ou anterior no lote) são rejeitados com suas fazendas e safras.
+
+As senhas dos novos produtores de cada lote são convertidas em hash em
+paralelo, em um pool de processos, com o custo de ``PASSWORD["import_rounds"]``
+ou o informado em ``--rounds``.
+
+Uso:
+    python -m app.scripts.import produtores.csv --batch-size 10000
+    python -m app.scripts.import produtores.csv --rounds 10
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import time
+from collections import Counter
+from itertools import islice
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import text
+
+from app.config import DATABASE
+from app.database.crud_usuario import CRUD_Usuario
+from app.database.database import DataBase
+from app.logs.conflogging import setup_logging
+from app.models.models import Usuario
+from app.schemas.fazenda import CreateUpdateFazenda
+from app.schemas.safra import CreateUpdateSafra
+from app.schemas.usuario import CreateUpdateUsuario
+from app.utils import password
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+
+STAGING_TABLES = {
+    "stg_produtores": {
+        "cpf_cnpj": "varchar",
+        "nome": "varchar",
+        "telefone": "varchar",
+        "email": "varchar",
+        "senha_hash": "varchar",
+    },
+    "stg_fazendas": {
+        "cpf_cnpj": "varchar",
+        "nome": "varchar",
+        "cidade": "varchar",
+        "estado": "varchar",
+        "area_total": "integer",
+        "area_agricultavel": "integer",
+        "area_vegetacao": "integer",
+    },
+    "stg_safras": {
+        "cpf_cnpj": "varchar",
+        "fazenda_nome": "varchar",
+        "nome": "varchar",
+        "tipo_cultura": "varchar",
+        "variedade": "varchar",
+        "ano_plantio": "integer",
+        "ano_colheita": "integer",
+        "produtividade_tonelada": "double precision",
+    },
+}
+
+MERGE_PRODUCERS = text(
+    """
+    WITH upserted AS (
+        INSERT INTO usuarios (nome, cpf_cnpj, telefone, email, senha_hash, tipo, ativo)
+        SELECT s.nome, s.cpf_cnpj, s.telefone, s.email,
+               COALESCE(s.senha_hash, u.senha_hash), 'comum', true
+        FROM stg_produtores s
+        LEFT JOIN usuarios u ON u.cpf_cnpj = s.cpf_cnpj
+        ON CONFLICT (cpf_cnpj) DO UPDATE
+        SET nome = excluded.nome, telefone = excluded.telefone, email = excluded.email
+        WHERE usuarios.id IN (SELECT id FROM produtores)
+        RETURNING usuarios.id, xmax = 0 AS created
+    ), new_producers AS (
+        INSERT INTO produtores (id) SELECT id FROM upserted WHERE created
+    )
+    SELECT count(*) FILTER (WHERE created) AS created,
+           count(*) FILTER (WHERE NOT created) AS updated
+    FROM upserted
+    """
+)
+
+UPDATE_FARMS = text(
+    """
+    UPDATE fazendas f
+    SET cidade = s.cidade, estado = s.estado, area_total = s.area_total,
+        area_agricultavel = s.area_agricultavel, area_vegetacao = s.area_vegetacao
+    FROM stg_fazendas s
+    JOIN usuarios u ON u.cpf_cnpj = s.cpf_cnpj
+    WHERE f.produtor_id = u.id AND f.nome = s.nome
+    """
+)
+
+INSERT_FARMS = text(
+    """
+    INSERT INTO fazendas (nome, cidade, estado, area_total, area_agricultavel,
+                          area_vegetacao, ativo, produtor_id)
+    SELECT s.nome, s.cidade, s.estado, s.area_total, s.area_agricultavel,
+           s.area_vegetacao, true, p.id
+    FROM stg_fazendas s
+    JOIN usuarios u ON u.cpf_cnpj = s.cpf_cnpj
+    JOIN produtores p ON p.id = u.id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM fazendas f WHERE f.produtor_id = p.id AND f.nome = s.nome
+    )
+    """
+)
+
+UPDATE_CROPS = text(
+    """
+    UPDATE safras c
+    SET tipo_cultura = s.tipo_cultura, variedade = s.variedade,
+        ano_plantio = s.ano_plantio, ano_colheita = s.ano_colheita,
+        produtividade_tonelada = s.produtividade_tonelada
+    FROM stg_safras s
+    JOIN usuarios u ON u.cpf_cnpj = s.cpf_cnpj
+    JOIN fazendas f ON f.produtor_id = u.id AND f.nome = s.fazenda_nome
+    WHERE c.fazenda_id = f.id AND c.nome = s.nome
+    """
+)
+
+INSERT_CROPS = text(
+    """
+    INSERT INTO safras (nome, tipo_cultura, variedade, ano_plantio, ano_colheita,
+                        produtividade_tonelada, ativo, fazenda_id)
+    SELECT s.nome, s.tipo_cultura, s.variedade, s.ano_plantio, s.ano_colheita,
+           s.produtividade_tonelada, true, f.id
+    FROM stg_safras s
+    JOIN usuarios u ON u.cpf_cnpj = s.cpf_cnpj
+    JOIN fazendas f ON f.produtor_id = u.id AND f.nome = s.fazenda_nome
+    WHERE NOT EXISTS (
+        SELECT 1 FROM safras c WHERE c.fazenda_id = f.id AND c.nome = s.nome
+    )
+    """
+)
+
+
+def read_rows(path: str, file_format: str = None):
+    """Lê as linhas do arquivo, retornando o número da linha e os dados."""
+    file_format = file_format or ("ndjson" if path.endswith(".ndjson") else "csv")
+    with open(path, encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_number, orjson.loads(line)
+
+
+def _error_message(error: ValidationError, prefix: str) -> str:
+    """Formata os erros de validação de uma linha."""
+    return "; ".join(
+        f"{prefix}.{'.'.join(str(loc) for loc in item['loc']) or 'dados'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class Batch:
+    """Lote de linhas validadas, sem repetições de produtores, fazendas ou safras."""
+
+    def __init__(self):
+        """Inicia o lote vazio."""
+        self.producers = {}
+        self.farms = {}
+        self.crops = {}
+        self.errors = []
+        self.rows = 0
+        self.lines = {}
+        self._validated = {}
+
+    def _producer(self, row: dict) -> CreateUpdateUsuario:
+        """Valida os dados do produtor da linha, uma vez por produtor no lote."""
+        data = {key: row.get(key) for key in ("nome", "cpf_cnpj", "telefone", "email", "senha")}
+        key = tuple(data.values())
+        if key not in self._validated:
+            try:
+                self._validated[key] = CreateUpdateUsuario(**data, tipo="comum", ativo=True)
+            except ValidationError as e:
+                self._validated[key] = ValueError(_error_message(e, "produtor"))
+        producer = self._validated[key]
+        if isinstance(producer, ValueError):
+            raise producer
+        return producer
+
+    def _farm(self, row: dict) -> CreateUpdateFazenda:
+        """Valida os dados da fazenda da linha, se houver."""
+        if "fazenda_nome" not in row:
+            return None
+        try:
+            return CreateUpdateFazenda(
+                nome=row["fazenda_nome"],
+                cidade=row.get("cidade"),
+                estado=row.get("estado"),
+                area_total=row.get("area_total"),
+                area_agricultavel=row.get("area_agricultavel"),
+                area_vegetacao=row.get("area_vegetacao"),
+                ativo=True,
+            )
+        except ValidationError as e:
+            raise ValueError(_error_message(e, "fazenda"))
+
+    def _crop(self, row: dict, farm: CreateUpdateFazenda) -> CreateUpdateSafra:
+        """Valida os dados da safra da linha, se houver."""
+        if "safra_nome" not in row:
+            return None
+        if farm is None:
+            raise ValueError("Safra informada sem fazenda")
+        try:
+            return CreateUpdateSafra(
+                nome=row["safra_nome"],
+                tipo_cultura=row.get("tipo_cultura"),
+                variedade=row.get("variedade"),
+                ano_plantio=row.get("ano_plantio"),
+                ano_colheita=row.get("ano_colheita"),
+                produtividade_tonelada=row.get("produtividade_tonelada"),
+                ativo=True,
+            )
+        except ValidationError as e:
+            raise ValueError(_error_message(e, "safra"))
+
+    def add(self, line_number: int, row: dict) -> None:
+        """Valida uma linha e a adiciona ao lote."""
+        self.rows += 1
+        row = {key: value for key, value in row.items() if value not in (None, "")}
+        try:
+            producer = self._producer(row)
+            farm = self._farm(row)
+            crop = self._crop(row, farm)
+        except ValueError as e:
+            self.errors.append({"linha": line_number, "erro": str(e)})
+            return
+
+        self.producers[producer.cpf_cnpj] = producer
+        self.lines.setdefault(producer.cpf_cnpj, []).append(line_number)
+        if farm is not None:
+            self.farms[(producer.cpf_cnpj, farm.nome)] = farm
+        if crop is not None:
+            self.crops[(producer.cpf_cnpj, farm.nome, crop.nome)] = crop
+
+    def reject(self, cpf_cnpj: str, message: str) -> None:
+        """Remove do lote um produtor, com suas fazendas e safras, e registra suas linhas."""
+        del self.producers[cpf_cnpj]
+        self.farms = {key: farm for key, farm in self.farms.items() if key[0] != cpf_cnpj}
+        self.crops = {key: crop for key, crop in self.crops.items() if key[0] != cpf_cnpj}
+        self.errors.extend(
+            {"linha": line_number, "erro": message}
+            for line_number in self.lines.pop(cpf_cnpj)
+        )
+        self.errors.sort(key=lambda error: error["linha"])
+
+    def records(self, password_hashes: dict) -> dict:
+        """Retorna as linhas de cada tabela temporária, com os hashes dos novos produtores."""
+        producers = [
+            (
+                cpf_cnpj,
+                producer.nome,
+                producer.telefone,
+                producer.email,
+                password_hashes.get(cpf_cnpj),
+            )
+            for cpf_cnpj, producer in self.producers.items()
+        ]
+        farms = [
+            (
+                cpf_cnpj,
+                farm.nome,
+                farm.cidade,
+                farm.estado,
+                farm.area_total,
+                farm.area_agricultavel,
+                farm.area_vegetacao,
+            )
+            for (cpf_cnpj, _), farm in self.farms.items()
+        ]
+        crops = [
+            (
+                cpf_cnpj,
+                farm_name,
+                crop.nome,
+                crop.tipo_cultura,
+                crop.variedade,
+                crop.ano_plantio,
+                crop.ano_colheita,
+                crop.produtividade_tonelada,
+            )
+            for (cpf_cnpj, farm_name, _), crop in self.crops.items()
+        ]
+        return {"stg_produtores": producers, "stg_fazendas": farms, "stg_safras": crops}
+
+
+class Importer:
+    """Importa os dados em lotes por uma única conexão."""
+
+    def __init__(self, engine, batch_size: int = BATCH_SIZE, rounds: int = None):
+        """Inicia a classe com o engine, o tamanho do lote e o custo do bcrypt."""
+        self.engine = engine
+        self.batch_size = batch_size
+        self.rounds = rounds or password.import_rounds("import")
+        self.stats = Counter()
+        self.errors = []
+
+    async def _create_staging_tables(self, conn) -> None:
+        """Cria as tabelas temporárias, esvaziadas a cada commit."""
+        async with conn.begin():
+            for table, columns in STAGING_TABLES.items():
+                definition = ", ".join(f"{name} {type_}" for name, type_ in columns.items())
+                await conn.execute(
+                    text(f"CREATE TEMP TABLE {table} ({definition}) ON COMMIT DELETE ROWS")
+                )
+
+    async def _load(self, conn, batch: Batch) -> None:
+        """Copia o lote para as tabelas temporárias e o mescla nas tabelas definitivas."""
+        async with conn.begin():
+            existing, conflicts = await CRUD_Usuario(conn).check_upsert(
+                Usuario,
+                [
+                    {"cpf_cnpj": cpf_cnpj, "email": producer.email, "telefone": producer.telefone}
+                    for cpf_cnpj, producer in batch.producers.items()
+                ],
+            )
+            for cpf_cnpj, message in conflicts.items():
+                batch.reject(cpf_cnpj, message)
+            new_users = [cpf_cnpj for cpf_cnpj in batch.producers if cpf_cnpj not in existing]
+            hashes = await password.hash_passwords_async(
+                [batch.producers[cpf_cnpj].senha for cpf_cnpj in new_users], self.rounds
+            )
+            raw_connection = await conn.get_raw_connection()
+            driver = raw_connection.driver_connection
+            for table, records in batch.records(dict(zip(new_users, hashes))).items():
+                if records:
+                    await driver.copy_records_to_table(
+                        table, records=records, columns=list(STAGING_TABLES[table])
+                    )
+            producers = (await conn.execute(MERGE_PRODUCERS)).one()
+            self.stats["produtores_criados"] += producers.created
+            self.stats["produtores_atualizados"] += producers.updated
+            self.stats["produtores_ignorados"] += (
+                len(batch.producers) - producers.created - producers.updated
+            )
+            self.stats["fazendas_atualizadas"] += (await conn.execute(UPDATE_FARMS)).rowcount
+            self.stats["fazendas_criadas"] += (await conn.execute(INSERT_FARMS)).rowcount
+            self.stats["safras_atualizadas"] += (await conn.execute(UPDATE_CROPS)).rowcount
+            self.stats["safras_criadas"] += (await conn.execute(INSERT_CROPS)).rowcount
+
+    async def run(self, rows) -> dict:
+        """Importa as linhas em lotes e retorna o resumo da importação."""
+        start = time.perf_counter()
+        rows = iter(rows)
+        async with self.engine.connect() as conn:
+            await self._create_staging_tables(conn)
+            while True:
+                chunk = list(islice(rows, self.batch_size))
+                if not chunk:
+                    break
+                batch = Batch()
+                for line_number, row in chunk:
+                    batch.add(line_number, row)
+                batch_start = time.perf_counter()
+                try:
+                    await self._load(conn, batch)
+                except Exception as e:
+                    logger.error(
+                        f"Erro ao importar as linhas {chunk[0][0]} a {chunk[-1][0]}: {e}"
+                    )
+                    raise e
+                self.stats["linhas"] += batch.rows
+                self.stats["linhas_rejeitadas"] += len(batch.errors)
+                self.errors.extend(batch.errors)
+                elapsed = time.perf_counter() - batch_start
+                logger.info(
+                    f"Lote de {batch.rows} linhas importado em {elapsed:.3f}s "
+                    f"({batch.rows / elapsed:.0f} linhas/s)"
+                )
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"{self.stats['linhas']} linhas importadas em {elapsed:.1f}s "
+            f"({self.stats['linhas'] / elapsed:.0f} linhas/s)"
+        )
+        return dict(self.stats)
+
+
+def parse_args(args=None):
+    """Lê os argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.scripts.import",
+        description="Importa produtores, fazendas e safras de um arquivo CSV ou NDJSON.",
+    )
+    parser.add_argument("path", help="Arquivo CSV ou NDJSON a importar.")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="Formato do arquivo (padrão: pela extensão).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Linhas por lote (padrão: {BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        choices=range(4, 32),
+        metavar="ROUNDS",
+        help="Custo do bcrypt das senhas (padrão: PASSWORD['import_rounds']['import']).",
+    )
+    parser.add_argument(
+        "--errors", help="Arquivo NDJSON onde gravar as linhas rejeitadas."
+    )
+    return parser.parse_args(args)
+
+
+async def main(args=None) -> dict:
+    """Executa a importação."""
+    args = parse_args(args)
+    data_base = DataBase(DATABASE)
+    data_base.connect()
+    importer = Importer(data_base.engine, args.batch_size, args.rounds)
+    try:
+        stats = await importer.run(read_rows(args.path, args.format))
+    finally:
+        await data_base.disconnect()
+        password.shutdown()
+    if args.errors:
+        with open(args.errors, "wb") as file:
+            for error in importer.errors:
+                file.write(orjson.dumps(error) + b"\n")
+    for key, value in sorted(stats.items()):
+        print(f"{key}: {value}")
+    return stats
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -0,0 +1,292 @@
+"""Gera dados sintéticos de produtores, fazendas e safras para testes de escala.
+
+A geração é determinística: a mesma semente, sobre o mesmo banco, produz os
+mesmos dados. CPFs e CNPJs são derivados do id do usuário, com os dígitos
+verificadores calculados pelos mesmos algoritmos de ``app/utils``, e por isso
+são válidos e únicos. Os dados são gravados por COPY, em lotes de produtores.
+
+Uso:
+    python -m app.scripts.seed --produtores 100000 --fazendas 5 --safras 4 --seed 42
+"""
+import argparse
+import asyncio
+import logging
+import random
+import string
+import time
+
+import bcrypt
+from sqlalchemy import text
+
+from app.config import DATABASE
+from app.database.database import DataBase
+from app.logs.conflogging import setup_logging
+from app.models.models import Fazenda, Produtor, Safra, Usuario
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 10000
+PASSWORD = "Senha123!"
+BCRYPT_ALPHABET = "./" + string.ascii_uppercase + string.ascii_lowercase + string.digits
+
+CIDADES = {
+    "AC": "Rio Branco",
+    "AL": "Maceió",
+    "AP": "Macapá",
+    "AM": "Manaus",
+    "BA": "Barreiras",
+    "CE": "Fortaleza",
+    "DF": "Brasília",
+    "ES": "Linhares",
+    "GO": "Rio Verde",
+    "MA": "Balsas",
+    "MT": "Sorriso",
+    "MS": "Dourados",
+    "MG": "Uberlândia",
+    "PA": "Paragominas",
+    "PB": "João Pessoa",
+    "PR": "Cascavel",
+    "PE": "Petrolina",
+    "PI": "Uruçuí",
+    "RJ": "Campos dos Goytacazes",
+    "RN": "Mossoró",
+    "RS": "Passo Fundo",
+    "RO": "Vilhena",
+    "RR": "Boa Vista",
+    "SC": "Chapecó",
+    "SP": "Ribeirão Preto",
+    "SE": "Lagarto",
+    "TO": "Palmas",
+}
+
+CULTURAS = {
+    "Soja": ["Transgênica", "Convencional", "Orgânica"],
+    "Milho": ["Híbrido", "Safrinha", "Pipoca"],
+    "Café": ["Arábica", "Conilon"],
+    "Algodão": ["Herbáceo", "Colorido"],
+    "Cana-de-açúcar": ["RB867515", "CTC4"],
+    "Trigo": ["Pão", "Durum"],
+    "Feijão": ["Carioca", "Preto"],
+    "Arroz": ["Irrigado", "Sequeiro"],
+}
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Hugo"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Pereira", "Lima", "Costa", "Martins"]
+FAZENDAS = ["Boa Vista", "Santa Clara", "Primavera", "Sol Nascente", "Bela Vista"]
+
+
+def _check_digit(digits: str, weights: list) -> str:
+    """Calcula um dígito verificador (resto da soma ponderada por 11)."""
+    digit = sum(int(d) * w for d, w in zip(digits, weights)) % 11
+    return str(0 if digit > 9 else digit)
+
+
+def cpf(index: int) -> str:
+    """Retorna o CPF válido de número base ``index``."""
+    base = f"{index:09d}"
+    base += _check_digit(base, range(1, 10))
+    return base + _check_digit(base, range(0, 10))
+
+
+def cnpj(index: int) -> str:
+    """Retorna o CNPJ válido (matriz 0001) de número base ``index``."""
+    base = f"{index:08d}0001"
+    base += _check_digit(base, [6, 7, 8, 9, 2, 3, 4, 5, 6, 7, 8, 9])
+    return base + _check_digit(base, [5, 6, 7, 8, 9, 2, 3, 4, 5, 6, 7, 8, 9])
+
+
+class Generator:
+    """Gera os registros de cada tabela a partir de uma semente."""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        farms_per_producer: int = 3,
+        crops_per_farm: int = 2,
+        cnpj_ratio: float = 0.2,
+    ):
+        """Inicia a classe com a semente e as quantidades por produtor e fazenda."""
+        self.random = random.Random(seed)
+        self.farms_per_producer = farms_per_producer
+        self.crops_per_farm = crops_per_farm
+        self.cnpj_ratio = cnpj_ratio
+        self.senha_hash = self._password_hash(PASSWORD)
+
+    def _password_hash(self, senha: str) -> str:
+        """Gera o hash bcrypt da senha de todos os produtores, com sal da semente."""
+        salt = "".join(self.random.choice(BCRYPT_ALPHABET) for _ in range(21))
+        salt += self.random.choice(".Oeu")
+        return bcrypt.hashpw(senha.encode("utf-8"), f"$2b$12${salt}".encode()).decode()
+
+    def _producer(self, user_id: int) -> tuple:
+        """Gera o usuário de um produtor."""
+        rng = self.random
+        cpf_cnpj = cnpj(user_id) if rng.random() < self.cnpj_ratio else cpf(user_id)
+        nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {user_id}"
+        telefone = f"{rng.randint(11, 99)}9{user_id:08d}"
+        email = f"produtor{user_id}@exemplo.com.br"
+        ativo = rng.random() < 0.95
+        return (user_id, nome, cpf_cnpj, telefone, email, self.senha_hash, "comum", ativo)
+
+    def _farm(self, farm_id: int, producer_id: int) -> tuple:
+        """Gera uma fazenda em uma UF aleatória."""
+        rng = self.random
+        estado = rng.choice(list(CIDADES))
+        area_total = rng.randint(50, 10000)
+        area_agricultavel = rng.randint(0, area_total)
+        area_vegetacao = rng.randint(0, area_total - area_agricultavel)
+        nome = f"Fazenda {rng.choice(FAZENDAS)} {farm_id}"
+        return (
+            farm_id,
+            nome,
+            CIDADES[estado],
+            estado,
+            area_total,
+            area_agricultavel,
+            area_vegetacao,
+            rng.random() < 0.95,
+            producer_id,
+        )
+
+    def _crop(self, crop_id: int, farm_id: int) -> tuple:
+        """Gera uma safra."""
+        rng = self.random
+        cultura = rng.choice(list(CULTURAS))
+        ano_plantio = rng.randint(2015, 2024)
+        return (
+            crop_id,
+            f"Safra {cultura} {ano_plantio}",
+            cultura,
+            rng.choice(CULTURAS[cultura]),
+            ano_plantio,
+            ano_plantio + rng.randint(0, 1),
+            round(rng.uniform(1, 100), 2),
+            rng.random() < 0.95,
+            farm_id,
+        )
+
+    def chunk(self, first_ids: dict, count: int) -> dict:
+        """Gera ``count`` produtores com suas fazendas e safras.
+
+        ``first_ids`` traz o primeiro id livre de usuarios, fazendas e safras.
+        """
+        user_id, farm_id, crop_id = (
+            first_ids["usuarios"],
+            first_ids["fazendas"],
+            first_ids["safras"],
+        )
+        records = {"usuarios": [], "produtores": [], "fazendas": [], "safras": []}
+        for _ in range(count):
+            records["usuarios"].append(self._producer(user_id))
+            records["produtores"].append((user_id,))
+            for _ in range(self.farms_per_producer):
+                records["fazendas"].append(self._farm(farm_id, user_id))
+                for _ in range(self.crops_per_farm):
+                    records["safras"].append(self._crop(crop_id, farm_id))
+                    crop_id += 1
+                farm_id += 1
+            user_id += 1
+        first_ids.update(usuarios=user_id, fazendas=farm_id, safras=crop_id)
+        return records
+
+
+COLUMNS = {
+    table.name: [column.name for column in table.columns]
+    for table in (
+        Usuario.__table__,
+        Produtor.__table__,
+        Fazenda.__table__,
+        Safra.__table__,
+    )
+}
+
+SEQUENCES = ("usuarios", "fazendas", "safras")
+
+
+async def seed(engine, generator: Generator, producers: int, chunk_size: int = CHUNK_SIZE):
+    """Grava os produtores gerados em lotes, retornando o total de linhas por tabela."""
+    totals = {table: 0 for table in COLUMNS}
+    start = time.perf_counter()
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT (SELECT COALESCE(MAX(id), 0) + 1 FROM usuarios) AS usuarios, "
+                "(SELECT COALESCE(MAX(id), 0) + 1 FROM fazendas) AS fazendas, "
+                "(SELECT COALESCE(MAX(id), 0) + 1 FROM safras) AS safras"
+            )
+        )
+        first_ids = dict(result.one()._mapping)
+        await conn.commit()
+        remaining = producers
+        while remaining > 0:
+            count = min(chunk_size, remaining)
+            records = generator.chunk(first_ids, count)
+            async with conn.begin():
+                raw_connection = await conn.get_raw_connection()
+                driver = raw_connection.driver_connection
+                for table in COLUMNS:
+                    if records[table]:
+                        await driver.copy_records_to_table(
+                            table, records=records[table], columns=COLUMNS[table]
+                        )
+                    totals[table] += len(records[table])
+                for table in SEQUENCES:
+                    await conn.execute(
+                        text(
+                            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                            f"{first_ids[table]}, false)"
+                        )
+                    )
+            remaining -= count
+            rows = sum(totals.values())
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"{totals['produtores']} produtores gerados, {rows} linhas em "
+                f"{elapsed:.1f}s ({rows / elapsed:.0f} linhas/s)"
+            )
+    return totals
+
+
+def parse_args(args=None):
+    """Lê os argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.scripts.seed",
+        description="Gera dados sintéticos de produtores, fazendas e safras.",
+    )
+    parser.add_argument(
+        "--produtores", type=int, default=1000, help="Produtores (padrão: 1000)."
+    )
+    parser.add_argument(
+        "--fazendas", type=int, default=3, help="Fazendas por produtor (padrão: 3)."
+    )
+    parser.add_argument(
+        "--safras", type=int, default=2, help="Safras por fazenda (padrão: 2)."
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Semente (padrão: 42).")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help=f"Produtores por lote (padrão: {CHUNK_SIZE}).",
+    )
+    return parser.parse_args(args)
+
+
+async def main(args=None) -> dict:
+    """Executa a geração dos dados."""
+    args = parse_args(args)
+    data_base = DataBase(DATABASE)
+    data_base.connect()
+    generator = Generator(args.seed, args.fazendas, args.safras)
+    try:
+        totals = await seed(data_base.engine, generator, args.produtores, args.chunk_size)
+    finally:
+        await data_base.disconnect()
+    for table, total in totals.items():
+        print(f"{table}: {total}")
+    return totals
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
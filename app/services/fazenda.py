@@ -1,11 +1,22 @@
+from app.schemas.fazenda import CreateUpdateFazenda
+from app.utils.bulk import validate_items
+
+
 class Fazenda:
     """Classe Fazenda."""
 
+    # relacionamentos carregados nas leituras de objetos (``CRUD.load``)
+    LOADS = ("safra",)
+
     def __init__(self, model, db):
         """Inicia a classe com suas configurações."""
         self.model = model
         self.db = db
 
+    def _options(self) -> tuple:
+        """Opções de carga dos relacionamentos usados nas respostas."""
+        return tuple(self.db.load(self.model, path) for path in self.LOADS)
+
     def _validate_areas(
         self, agricultural_area: int, vegetation_area: int, total_area: int
     ):
@@ -21,26 +32,56 @@ class Fazenda:
         self._validate_areas(
             data["area_agricultavel"], data["area_vegetacao"], data["area_total"]
         )
-        result = await self.db.create(self.model, data)
-        new_data = await self.db.get_by_id(self.model, result.id)
-        return new_data
+        return await self.db.create(self.model, data)
 
-    async def get_by_id(self, id: int):
+    async def bulk_create(self, data: list):
+        """Cria várias fazendas, reportando os itens inválidos pela posição no lote."""
+        valid, errors = validate_items(CreateUpdateFazenda, data)
+        ids = await self.db.bulk_create(self.model, valid)
+        return {"created": ids, "errors": errors}
+
+    async def get_by_id(self, id: int, fields: list = None):
         """Obtem uma safra pelo ID."""
-        result = await self.db.get_by_id(self.model, id)
+        result = await self.db.get_by_id(self.model, id, fields, self._options())
         return result
 
     async def get_all(self):
         """Obtem todas as fazendas."""
-        result = await self.db.get_all(self.model)
+        result = await self.db.get_all(self.model, self._options())
+        return result
+
+    async def get_page(
+        self,
+        limit: int,
+        after: str = None,
+        filters: dict = None,
+        sort: str = "id",
+        fields: list = None,
+    ):
+        """Obtem uma página de fazendas, filtrada e ordenada."""
+        result = await self.db.get_page(self.model, limit, after, filters, sort, fields)
         return result
 
+    async def search(self, term: str, limit: int, fields: list = None):
+        """Busca fazendas pelo nome aproximado."""
+        result = await self.db.search(
+            self.model, term, limit, fields, self._options()
+        )
+        if fields is not None:
+            return result
+        return [self.db.farm_mapping(farm) for farm in result]
+
+    async def export(self):
+        """Percorre todas as fazendas com suas safras, em lotes de dicionários."""
+        async for batch in self.db.stream_all(self.model, options=self._options()):
+            yield [self.db.farm_mapping(farm) for farm in batch]
+
     async def update(self, id: int, data: dict):
         """Atualiza uma safra."""
         self._validate_areas(
             data["area_agricultavel"], data["area_vegetacao"], data["area_total"]
         )
-        result = await self.db.update(self.model, id, data)
+        result = await self.db.update(self.model, id, data, self._options())
         return result
 
     async def delete(self, id: int):
@@ -53,21 +94,13 @@ class Fazenda:
         result = await self.db.soft_delete(self.model, id)
         return result
 
-    async def get_dashboard_data(self, crop_model):
-        """Retorna os dados para o dashboard."""
-        total_farms = await self.db.get_total_farms(self.model)
-        total_area = await self.db.get_total_area(self.model)
-        farms_by_state = await self.db.get_farms_by_state(self.model)
-        farms_by_culture = await self.db.get_farms_by_culture(self.model, crop_model)
-        farms_by_soil_use = await self.db.get_farms_by_soil_use(self.model)
-        result = {
-            "total_farms": total_farms,
-            "total_area": total_area,
-            "farms_by_state": farms_by_state,
-            "farms_by_culture": farms_by_culture,
-            "farms_by_soil_use": farms_by_soil_use,
-        }
-        return result
+    async def get_dashboard_data(
+        self, crop_model, counter_model, soil_use_bucket: int = None
+    ):
+        """Retorna os dados para o dashboard, com o uso do solo opcionalmente em faixas."""
+        return await self.db.get_dashboard(
+            self.model, crop_model, counter_model, soil_use_bucket
+        )
 
     async def handle_crop_in_farm(
         self, crop_model: object, farm_id: int, crop_id: int, is_add: bool = True
@@ -2,6 +2,8 @@ from app.services.usuario import Usuario
 
 
 class Produtor(Usuario):
+    LOADS = ("fazenda",)
+
     def __init__(self, model, db):
         """Inicia a classe com suas configurações."""
         self.model = model
@@ -15,14 +17,95 @@ class Produtor(Usuario):
     async def create(self, data: dict):
         """Cria um novo produtor."""
         self._is_type_admin(data)
-        result = await self.db.create(self.model, data)
-        new_data = await self.db.get_by_id(self.model, result.id)
-        return new_data
+        data = await self._hash_password(data)
+        return await self.db.create(self.model, data)
 
     async def update(self, id: int, data: dict):
         """Atualiza um produtor."""
         self._is_type_admin(data)
-        return await self.db.update(self.model, id, data)
+        data = await self._hash_password(data)
+        return await self.db.update(self.model, id, data, self._options())
+
+    def _keep_password(self, data: dict, existing: dict) -> dict:
+        """Troca a senha de um usuário já cadastrado pelo hash gravado.
+
+        O upsert não altera o ``senha_hash`` de quem já existe; o hash gravado
+        só preenche a coluna obrigatória do ``INSERT``.
+        """
+        data = {key: value for key, value in data.items() if key != "senha"}
+        data["senha_hash"] = existing[data["cpf_cnpj"]]
+        return data
+
+    async def upsert(self, data: dict):
+        """Cria ou atualiza um produtor pelo cpf_cnpj."""
+        self._is_type_admin(data)
+        existing, conflicts = await self.db.check_upsert(self.model, [data])
+        if conflicts:
+            raise Exception(conflicts[data["cpf_cnpj"]])
+        if data["cpf_cnpj"] in existing:
+            data = self._keep_password(data, existing)
+        else:
+            data = await self._hash_password(data)
+        rows = await self.db.upsert(self.model, [data])
+        if not rows:
+            raise Exception("CPF/CNPJ pertence a um usuário que não é produtor")
+        producer = await self.db.get_by_id(
+            self.model, rows[0]["id"], options=self._options()
+        )
+        return self.db.producer_mapping(producer)
+
+    async def bulk_upsert(self, data: list):
+        """Cria ou atualiza vários produtores pelo cpf_cnpj.
+
+        Um cpf_cnpj repetido no lote mantém apenas a última ocorrência; itens
+        com email ou telefone de outro usuário são reportados em ``errors``.
+        Só as senhas dos produtores novos são convertidas em hash.
+        """
+        valid, errors = {}, []
+        for index, item in enumerate(data):
+            try:
+                self._is_type_admin(item)
+            except ValueError as e:
+                errors.append({"index": index, "detail": str(e)})
+                continue
+            valid[item["cpf_cnpj"]] = (index, item)
+        existing, conflicts = await self.db.check_upsert(
+            self.model, [item for _, item in valid.values()]
+        )
+        for cpf_cnpj, detail in conflicts.items():
+            errors.append({"index": valid.pop(cpf_cnpj)[0], "detail": detail})
+        items = await self._hash_passwords(
+            [
+                self._keep_password(item, existing) if cpf_cnpj in existing else item
+                for cpf_cnpj, (_, item) in valid.items()
+            ],
+            "bulk_upsert",
+        )
+        rows = await self.db.upsert(self.model, items)
+        response = {"created": [], "updated": [], "errors": errors}
+        for row in rows:
+            response["created" if row["created"] else "updated"].append(row["id"])
+            del valid[row["cpf_cnpj"]]
+        for index, _ in valid.values():
+            errors.append(
+                {"index": index, "detail": "CPF/CNPJ pertence a um usuário que não é produtor"}
+            )
+        errors.sort(key=lambda error: error["index"])
+        return response
+
+    async def search(self, term: str, limit: int, fields: list = None):
+        """Busca produtores pelo nome aproximado."""
+        result = await self.db.search(
+            self.model, term, limit, fields, self._options()
+        )
+        if fields is not None:
+            return result
+        return [self.db.producer_mapping(producer) for producer in result]
+
+    async def export(self):
+        """Percorre todos os produtores com suas fazendas, em lotes de dicionários."""
+        async for batch in self.db.stream_all(self.model, options=self._options()):
+            yield [self.db.producer_mapping(producer) for producer in batch]
 
     async def handle_farm_in_producer(
         self, farm_model: object, producer_id: int, farm_id: int, is_add: bool = True
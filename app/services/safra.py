@@ -1,3 +1,7 @@
+from app.schemas.safra import CreateUpdateSafra
+from app.utils.bulk import validate_items
+
+
 class Safra:
     """Classe Safra."""
 
@@ -8,18 +12,38 @@ class Safra:
 
     async def create(self, data: dict):
         """Cria uma nova safra."""
-        result = await self.db.create(self.model, data)
-        new_data = await self.db.get_by_id(self.model, result.id)
-        return new_data
+        return await self.db.create(self.model, data)
+
+    async def bulk_create(self, data: list):
+        """Cria várias safras, reportando os itens inválidos pela posição no lote."""
+        valid, errors = validate_items(CreateUpdateSafra, data)
+        ids = await self.db.bulk_create(self.model, valid)
+        return {"created": ids, "errors": errors}
 
-    async def get_by_id(self, id: int):
+    async def get_by_id(self, id: int, fields: list = None):
         """Retorna uma safra pelo id."""
-        return await self.db.get_by_id(self.model, id)
+        return await self.db.get_by_id(self.model, id, fields)
 
     async def get_all(self):
         """Retorna todas as safra."""
         return await self.db.get_all(self.model)
 
+    async def get_page(
+        self,
+        limit: int,
+        after: str = None,
+        filters: dict = None,
+        sort: str = "id",
+        fields: list = None,
+    ):
+        """Retorna uma página de safras, filtrada e ordenada."""
+        return await self.db.get_page(self.model, limit, after, filters, sort, fields)
+
+    async def export(self):
+        """Percorre todas as safras, em lotes de dicionários."""
+        async for batch in self.db.stream_all(self.model):
+            yield [self.db.crop_mapping(crop) for crop in batch]
+
     async def update(self, id: int, data: dict):
         """Atualiza uma safra."""
         return await self.db.update(self.model, id, data)
@@ -1,34 +1,72 @@
+from app.utils import password
+
+
 class Usuario:
+    # relacionamentos carregados nas leituras de objetos (``CRUD.load``)
+    LOADS = ()
+
     def __init__(self, model, db):
         """Inicia a classe com suas configurações."""
         self.model = model
         self.db = db
 
+    def _options(self) -> tuple:
+        """Opções de carga dos relacionamentos usados nas respostas."""
+        return tuple(self.db.load(self.model, path) for path in self.LOADS)
+
+    async def _hash_password(self, data: dict) -> dict:
+        """Substitui a senha pelo hash, calculado fora do loop de eventos."""
+        if data.get("senha") is None:
+            return data
+        data = dict(data)
+        data["senha_hash"] = await password.hash_password_async(data.pop("senha"))
+        return data
+
+    async def _hash_passwords(self, items: list, mode: str) -> list:
+        """Substitui as senhas de um lote pelos hashes, calculados no pool de processos."""
+        pending = [index for index, item in enumerate(items) if item.get("senha") is not None]
+        hashes = await password.hash_passwords_async(
+            [items[index]["senha"] for index in pending], password.import_rounds(mode)
+        )
+        items = list(items)
+        for index, senha_hash in zip(pending, hashes):
+            item = dict(items[index])
+            del item["senha"]
+            item["senha_hash"] = senha_hash
+            items[index] = item
+        return items
+
     async def create(self, data: dict):
         """Cria um novo usuario."""
-        result = await self.db.create(self.model, data)
-        new_data = await self.db.get_by_id(self.model, result.id)
-        return new_data
+        data = await self._hash_password(data)
+        return await self.db.create(self.model, data)
 
-    async def get_by_id(self, id: int):
+    async def get_by_id(self, id: int, fields: list = None):
         """Retorna um usuario pelo id."""
-        return await self.db.get_by_id(self.model, id)
+        return await self.db.get_by_id(self.model, id, fields, self._options())
 
-    async def get_by_cpf_cnpj(self, cpf_cnpj: str):
+    async def get_by_cpf_cnpj(self, cpf_cnpj: str, fields: list = None):
         """Retorna um usuario pelo cpf_cnpj."""
-        return await self.db.get_by_cpf_cnpj(self.model, cpf_cnpj)
+        return await self.db.get_by_cpf_cnpj(
+            self.model, cpf_cnpj, fields, self._options()
+        )
 
     async def get_by_email(self, email: int):
         """Retorna um usuario pelo email."""
-        return await self.db.get_by_email(self.model, email)
+        return await self.db.get_by_email(self.model, email, self._options())
 
     async def get_all(self):
         """Retorna todos os usuarios."""
-        return await self.db.get_all(self.model)
+        return await self.db.get_all(self.model, self._options())
+
+    async def get_page(self, limit: int, after: str = None, fields: list = None):
+        """Retorna uma página de usuarios."""
+        return await self.db.get_page(self.model, limit, after, fields=fields)
 
     async def update(self, id: int, data: dict):
         """Atualiza um usuario."""
-        return await self.db.update(self.model, id, data)
+        data = await self._hash_password(data)
+        return await self.db.update(self.model, id, data, self._options())
 
     async def delete(self, id: int):
         """Exclui um usuario."""
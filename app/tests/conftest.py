@@ -1,16 +1,27 @@
+import pytest
 import pytest_asyncio
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.database.database import DataBase, Base
 from fastapi.testclient import TestClient
 from app.main import app
 from app.config import DATABASE_TEST
+from app.utils import cache
 
 DataBase = DataBase(DATABASE_TEST)
 get_db = DataBase.get_db
 
 DATABASE_URL = f"postgresql+asyncpg://{DATABASE_TEST['user']}:{DATABASE_TEST['password']}@{DATABASE_TEST['host']}:{DATABASE_TEST['port']}/{DATABASE_TEST['database']}"  # noqa
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Esvazia os caches em memória entre os testes."""
+    cache.clear_all()
+    yield
+    cache.clear_all()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def get_db():
     """Conexão com o banco de dados para os testes."""
@@ -43,3 +54,27 @@ def client(get_db):
 
     app.dependency_overrides[get_db] = override_get_db
     return TestClient(app)
+
+
+@pytest.fixture(scope="function")
+def sql_statements(get_db):
+    """Registra as instruções SQL executadas pela sessão de testes."""
+    statements = []
+
+    def register(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", register)
+    yield statements
+    event.remove(engine, "before_cursor_execute", register)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def trigram(get_db):
+    """Pula o teste quando a extensão pg_trgm não está instalada no banco de testes."""
+    installed = await get_db.scalar(
+        text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'")
+    )
+    if not installed:
+        pytest.skip("Extensão pg_trgm indisponível")
@@ -1,7 +1,13 @@
 import pytest
 from unittest import mock
+from sqlalchemy.exc import InvalidRequestError
 from app.database.crud import CRUD
-from app.models.models import Usuario
+from app.database.crud_fazenda import CRUD_Fazenda
+from app.database.crud_produtor import CRUD_Produtor
+from app.models.models import Fazenda, Produtor, Safra, Usuario
+from app.tests.fixtures.fazenda import farms_in_db
+from app.tests.fixtures.produtor import producers_in_db
+from app.tests.fixtures.safra import crops_in_db
 from app.tests.fixtures.usuario import users_in_db
 
 
@@ -29,6 +35,63 @@ async def test_create(get_db):
         excinfo.match("Erro ao criar o dado")
 
 
+@pytest.mark.asyncio
+async def test_create_single_statement(get_db, sql_statements):
+    """Testa se a criação usa uma única instrução INSERT ... RETURNING."""
+    crud = CRUD(get_db)
+    data = {
+        "nome": "Fazenda Horizonte",
+        "cidade": "Uberlândia",
+        "estado": "MG",
+        "area_total": 1000,
+        "area_agricultavel": 700,
+        "area_vegetacao": 300,
+        "ativo": True,
+    }
+    result = await crud.create(Fazenda, data)
+    assert result.id
+    assert result.nome == "Fazenda Horizonte"
+    assert result.safra == []
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("INSERT INTO fazendas")
+    assert "RETURNING" in sql_statements[0]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create(get_db, sql_statements):
+    """Testa se a criação em lote usa um único INSERT de várias linhas."""
+    crud = CRUD(get_db)
+    data = [
+        {
+            "nome": f"Fazenda Horizonte {i}",
+            "cidade": "Uberlândia",
+            "estado": "MG",
+            "area_total": 1000,
+            "area_agricultavel": 700,
+            "area_vegetacao": 300,
+            "ativo": True,
+        }
+        for i in range(3)
+    ]
+    ids = await crud.bulk_create(Fazenda, data)
+    assert len(ids) == 3
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("INSERT INTO fazendas")
+
+    # ids retornados na ordem dos dados
+    for id, item in zip(ids, data):
+        result = await crud.get_by_id(Fazenda, id)
+        assert result.nome == item["nome"]
+
+    assert await crud.bulk_create(Fazenda, []) == []
+
+    # nenhuma linha é inserida se uma delas falhar
+    invalid = [dict(data[0]), dict(data[1], nome=None)]
+    with pytest.raises(Exception):
+        await crud.bulk_create(Fazenda, invalid)
+    assert len(await crud.get_all(Fazenda)) == 3
+
+
 @pytest.mark.asyncio
 async def test_get_by_id(get_db, users_in_db):
     """Testa a busca de um dado pelo id."""
@@ -59,6 +122,24 @@ async def test_get_all(get_db, users_in_db):
         excinfo.match("Erro genérico")
 
 
+@pytest.mark.asyncio
+async def test_get_page(get_db, users_in_db):
+    """Testa a busca paginada por cursor."""
+    crud = CRUD(get_db)
+    first_page = await crud.get_page(Usuario, limit=2)
+    assert [user["id"] for user in first_page["items"]] == [1, 2]
+    assert first_page["next_cursor"] is not None
+
+    last_page = await crud.get_page(Usuario, limit=2, after=first_page["next_cursor"])
+    assert [user["id"] for user in last_page["items"]] == [3]
+    assert last_page["next_cursor"] is None
+
+    # cursor inválido
+    with pytest.raises(ValueError) as excinfo:
+        await crud.get_page(Usuario, limit=2, after="invalido")
+    excinfo.match("Cursor inválido")
+
+
 @pytest.mark.asyncio
 async def test_update(get_db, users_in_db):
     """Testa a atualização de um dado."""
@@ -78,6 +159,72 @@ async def test_update(get_db, users_in_db):
         excinfo.match("Erro ao atualizar o dado")
 
 
+@pytest.mark.asyncio
+async def test_update_loads(get_db, farms_in_db, crops_in_db, sql_statements):
+    """Testa se a atualização só consulta os filhos quando pedido."""
+    crud = CRUD(get_db)
+    await CRUD_Fazenda(get_db).handle_crop_in_farm(Fazenda, Safra, 1, 1)
+    get_db.expunge_all()
+    sql_statements.clear()
+
+    result = await crud.update(Fazenda, 1, {"nome": "Fazenda Nova"})
+    assert result.nome == "Fazenda Nova"
+    assert "safra" not in result.__dict__
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("UPDATE fazendas")
+
+    sql_statements.clear()
+    result = await crud.update(
+        Fazenda, 1, {"nome": "Fazenda Velha"}, (crud.load(Fazenda, "safra"),)
+    )
+    assert [crop.id for crop in result.safra] == [1]
+    assert len(sql_statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_load_options(
+    get_db, producers_in_db, farms_in_db, crops_in_db, sql_statements
+):
+    """Testa a carga dos relacionamentos escolhida a cada consulta."""
+    crud = CRUD(get_db)
+    await CRUD_Fazenda(get_db).handle_crop_in_farm(Fazenda, Safra, 1, 1)
+    await CRUD_Produtor(get_db).handle_farm_in_producer(Produtor, Fazenda, 1, 1)
+    get_db.expunge_all()
+    sql_statements.clear()
+
+    # sem opções os relacionamentos não são carregados nem consultados
+    producer = await crud.get_by_id(Produtor, 1)
+    assert len(sql_statements) == 1
+    with pytest.raises(InvalidRequestError):
+        producer.fazenda
+
+    # produtor -> fazendas -> safras: uma consulta por nível com selectin
+    get_db.expunge_all()
+    sql_statements.clear()
+    producer = await crud.get_by_id(
+        Produtor, 1, options=(crud.load(Produtor, "fazenda.safra"),)
+    )
+    assert [crop.id for crop in producer.fazenda[0].safra] == [1]
+    assert len(sql_statements) == 3
+
+    # e uma única consulta com joined
+    get_db.expunge_all()
+    sql_statements.clear()
+    producers = await crud.get_all(
+        Produtor, options=(crud.load(Produtor, "fazenda.safra", "joined"),)
+    )
+    producer = next(producer for producer in producers if producer.id == 1)
+    assert [crop.id for crop in producer.fazenda[0].safra] == [1]
+    assert len(sql_statements) == 1
+
+    with pytest.raises(ValueError) as excinfo:
+        crud.load(Produtor, "fazenda.produtor_id")
+    excinfo.match("Relacionamento inválido: produtor_id")
+    with pytest.raises(ValueError) as excinfo:
+        crud.load(Produtor, "fazenda", "lazy")
+    excinfo.match("Estratégia de carga inválida: lazy")
+
+
 @pytest.mark.asyncio
 async def test_delete(get_db, users_in_db):
     """Testa a exclusão de um dado."""
@@ -93,6 +240,26 @@ async def test_delete(get_db, users_in_db):
         excinfo.match("Erro ao excluir o dado")
 
 
+@pytest.mark.asyncio
+async def test_delete_single_statement(get_db, farms_in_db, crops_in_db, sql_statements):
+    """Testa se a exclusão usa um único DELETE e deixa a cascata para o banco."""
+    crud = CRUD(get_db)
+    await CRUD_Fazenda(get_db).handle_crop_in_farm(Fazenda, Safra, 1, 1)
+    get_db.expunge_all()
+    sql_statements.clear()
+
+    result = await crud.delete(Fazenda, 1)
+    assert result is True
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("DELETE FROM fazendas")
+    assert await crud.get_by_id(Safra, 1) is None
+
+    # dado nao encontrado
+    with pytest.raises(Exception) as excinfo:
+        await crud.delete(Fazenda, 1)
+    excinfo.match("Dado nao encontrado")
+
+
 @pytest.mark.asyncio
 async def test_soft_delete(get_db, users_in_db):
     """Testa a inativação de um dado."""
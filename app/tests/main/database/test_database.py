@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import event, text
+from app.database.crud import CRUD
+from app.database.database import DataBase
+from app.models.models import Usuario
+from app.config import DATABASE_TEST
+
+
+@pytest.mark.asyncio
+async def test_engine_is_shared_between_sessions():
+    """Testa se as sessões reutilizam o mesmo engine e pool de conexões."""
+    data_base = DataBase(DATABASE_TEST)
+    data_base.connect()
+    engine = data_base.engine
+
+    async for session in data_base.get_db():
+        assert session.bind is engine
+    async for session in data_base.get_db():
+        assert session.bind is engine
+
+    # conectar novamente não recria o engine
+    data_base.connect()
+    assert data_base.engine is engine
+
+    await data_base.disconnect()
+    assert data_base.engine is None
+    assert data_base.session_maker is None
+
+
+@pytest.mark.asyncio
+async def test_no_ddl_in_request_path(get_db):
+    """Testa se a sessão da requisição não executa DDL nem consulta o catálogo."""
+    data_base = DataBase(DATABASE_TEST)
+    data_base.connect()
+    statements = []
+
+    def count_statements(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    event.listen(data_base.engine.sync_engine, "before_cursor_execute", count_statements)
+
+    for _ in range(2):
+        statements.clear()
+        async for session in data_base.get_db():
+            await CRUD(session).get_by_id(Usuario, 1)
+        assert len(statements) == 1
+        assert statements[0].startswith("SELECT usuarios.id")
+
+    await data_base.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_create_tables_twice(get_db):
+    """Testa se a criação das tabelas pode ser repetida sobre um banco existente."""
+    data_base = DataBase(DATABASE_TEST)
+    await data_base.create_tables()
+    await data_base.create_tables()
+    await data_base.disconnect()
+
+    # os gatilhos dos contadores continuam únicos
+    await get_db.execute(
+        text(
+            "INSERT INTO fazendas (nome, cidade, estado, area_total, area_agricultavel,"
+            " area_vegetacao, ativo) VALUES ('Fazenda', 'Uberlândia', 'MG', 10, 5, 5, true)"
+        )
+    )
+    await get_db.commit()
+    total = await get_db.scalar(
+        text("SELECT total_fazendas FROM dashboard_counters WHERE dimensao = 'total'")
+    )
+    assert total == 1
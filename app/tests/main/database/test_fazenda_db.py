@@ -1,6 +1,7 @@
 import pytest
 from sqlalchemy import select
-from app.models.models import Fazenda, Safra
+from app.database.crud_fazenda import CRUD_Fazenda, dashboard_cache
+from app.models.models import ContadorDashboard, Fazenda, Safra
 from app.tests.fixtures.fazenda import farms_in_db
 from app.tests.fixtures.safra import crops_in_db
 
@@ -20,7 +21,7 @@ async def test_create_farm(get_db, crops_in_db):
 
     get_db.add(new_farm)
     await get_db.commit()
-    await get_db.refresh(new_farm)
+    await get_db.refresh(new_farm, ["safra"])
 
     crops = await get_db.execute(select(Safra))
     crops = crops.scalars().all()
@@ -107,3 +108,331 @@ async def test_delete_farm(get_db, farms_in_db, crops_in_db):
     result = await get_db.execute(select(Safra))
     crops = result.scalars().all()
     assert len(crops) == expected_len
+
+
+@pytest.mark.asyncio
+async def test_get_farms_page_filters(get_db, farms_in_db, crops_in_db):
+    """Testa a listagem de fazendas filtrada pelas colunas e pelas culturas."""
+    crud = CRUD_Fazenda(get_db)
+    crops = (await get_db.execute(select(Safra).order_by(Safra.id))).scalars().all()
+    crops[0].fazenda_id = 1
+    crops[1].fazenda_id = 3
+    await get_db.commit()
+
+    async def ids(**filters):
+        page = await crud.get_page(Fazenda, filters=filters)
+        return [farm["id"] for farm in page["items"]]
+
+    assert await ids(estado="SP") == [1, 2]
+    assert await ids(estado="SP", cidade="Ribeirão Preto") == [1]
+    assert await ids(ativo=False) == [3]
+    assert await ids(tipo_cultura="Milho") == [3]
+    assert await ids(tipo_cultura="Milho", ativo=True) == []
+    assert await ids(estado=None) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_get_farms_fields(get_db, farms_in_db, crops_in_db, sql_statements):
+    """Testa os campos pedidos: só as colunas pedidas, e as safras só quando pedidas."""
+    crud = CRUD_Fazenda(get_db)
+    await crud.handle_crop_in_farm(Fazenda, Safra, 1, 1)
+    sql_statements.clear()
+
+    page = await crud.get_page(Fazenda, limit=2, sort="-area_total", fields=["nome", "estado"])
+    assert page["items"] == [
+        {"nome": "Fazenda Horizonte", "estado": "MG"},
+        {"nome": "Fazenda Sol Nascente", "estado": "SP"},
+    ]
+    assert len(sql_statements) == 1
+    assert "area_vegetacao" not in sql_statements[0]
+    next_page = await crud.get_page(
+        Fazenda, limit=2, after=page["next_cursor"], sort="-area_total", fields=["id"]
+    )
+    assert next_page["items"] == [{"id": 1}]
+
+    sql_statements.clear()
+    farm = await crud.get_by_id(Fazenda, 1, fields=["id", "safras"])
+    assert list(farm) == ["id", "safras"]
+    assert [crop["id"] for crop in farm["safras"]] == [1]
+    assert len(sql_statements) == 2
+    assert await crud.get_by_id(Fazenda, 99, fields=["id"]) is None
+
+    # lista vazia traz todos os campos
+    page = await crud.get_page(Fazenda, limit=1, fields=[])
+    assert page["items"][0]["id"] == 1
+    assert page["items"][0] == await crud.get_by_id(Fazenda, 1, fields=[])
+    assert [crop["id"] for crop in page["items"][0]["safras"]] == [1]
+
+    with pytest.raises(ValueError) as excinfo:
+        await crud.get_page(Fazenda, fields=["nome", "senha_hash", "produtor"])
+    excinfo.match("Campos inválidos: senha_hash, produtor")
+
+
+@pytest.mark.asyncio
+async def test_get_farms_page_sorted(get_db, farms_in_db):
+    """Testa a paginação por cursor sobre uma ordenação diferente do id."""
+    crud = CRUD_Fazenda(get_db)
+    await crud.create(
+        Fazenda,
+        {
+            "nome": "Fazenda Esperança",
+            "cidade": "Londrina",
+            "estado": "PR",
+            "area_total": 750,
+            "area_agricultavel": 500,
+            "area_vegetacao": 250,
+            "ativo": True,
+        },
+    )
+
+    # o empate em area_total é desfeito pelo id, também em ordem decrescente
+    pages, after = [], None
+    while True:
+        page = await crud.get_page(Fazenda, limit=1, after=after, sort="-area_total")
+        pages.append([farm["id"] for farm in page["items"]])
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert pages == [[3], [4], [2], [1]]
+
+    page = await crud.get_page(Fazenda, limit=2, sort="area_total")
+    assert [farm["id"] for farm in page["items"]] == [1, 2]
+
+    # o cursor de uma ordenação não serve para outra
+    with pytest.raises(ValueError) as excinfo:
+        await crud.get_page(Fazenda, limit=2, after=page["next_cursor"], sort="nome")
+    excinfo.match("Cursor inválido")
+    with pytest.raises(ValueError) as excinfo:
+        await crud.get_page(Fazenda, limit=2, after=page["next_cursor"])
+    excinfo.match("Cursor inválido")
+
+    with pytest.raises(ValueError) as excinfo:
+        await crud.get_page(Fazenda, sort="cidade")
+    excinfo.match("Ordenação inválida: cidade")
+
+
+@pytest.mark.asyncio
+async def test_search_farms(get_db, trigram, farms_in_db):
+    """Testa a busca de fazendas pelo nome aproximado."""
+    crud = CRUD_Fazenda(get_db)
+    result = await crud.search(Fazenda, "primavra")
+    assert [farm.nome for farm in result] == ["Fazenda Primavera"]
+
+    result = await crud.search(Fazenda, "Fazenda", limit=2)
+    assert len(result) == 2
+    assert await crud.search(Fazenda, "xyzw") == []
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard(get_db, farms_in_db, crops_in_db, sql_statements):
+    """Testa se o dashboard é lido da tabela de contadores em uma única consulta."""
+    crud = CRUD_Fazenda(get_db)
+    crops = (await get_db.execute(select(Safra).order_by(Safra.id))).scalars().all()
+    crops[0].fazenda_id = 1
+    crops[1].fazenda_id = 1
+    crops[2].fazenda_id = 3
+    await get_db.commit()
+    sql_statements.clear()
+
+    result = await crud.get_dashboard(Fazenda, Safra, ContadorDashboard)
+    assert len(sql_statements) == 1
+    assert "FROM dashboard_counters" in sql_statements[0]
+    assert result["total_farms"] == 3
+    assert result["total_area"] == 2250
+    assert result["farms_by_state"] == [
+        {"state": "MG", "total_farms": 1},
+        {"state": "SP", "total_farms": 2},
+    ]
+    assert result["farms_by_culture"] == [
+        {"tipo_cultura": "Milho", "total_farms": 1},
+        {"tipo_cultura": "Soja", "total_farms": 1},
+        {"tipo_cultura": "Trigo", "total_farms": 1},
+    ]
+    assert [item["area_agricultavel"] for item in result["farms_by_soil_use"]] == [
+        300,
+        500,
+        700,
+    ]
+
+
+async def counters(db) -> dict:
+    """Retorna os contadores do dashboard por dimensão e chave."""
+    result = await db.execute(select(ContadorDashboard))
+    return {
+        (row.dimensao, row.chave): (row.total_fazendas, row.area_total)
+        for row in result.scalars()
+    }
+
+
+@pytest.mark.asyncio
+async def test_dashboard_counters(get_db, farms_in_db, crops_in_db):
+    """Testa se os gatilhos aplicam as diferenças de cada escrita aos contadores."""
+    crud = CRUD_Fazenda(get_db)
+    assert await counters(get_db) == {
+        ("total", ""): (3, 2250),
+        ("estado", "MG"): (1, 1000),
+        ("estado", "SP"): (2, 1250),
+        ("uso_solo", "300:200"): (1, 500),
+        ("uso_solo", "500:250"): (1, 750),
+        ("uso_solo", "700:300"): (1, 1000),
+    }
+
+    # criação
+    data = {
+        "nome": "Fazenda Esperança",
+        "cidade": "Londrina",
+        "estado": "PR",
+        "area_total": 100,
+        "area_agricultavel": 50,
+        "area_vegetacao": 50,
+        "ativo": True,
+    }
+    farm = await crud.create(Fazenda, data)
+    result = await counters(get_db)
+    assert result[("total", "")] == (4, 2350)
+    assert result[("estado", "PR")] == (1, 100)
+    assert result[("uso_solo", "50:50")] == (1, 100)
+
+    # atualização move a fazenda de estado e de uso do solo
+    await crud.update(Fazenda, farm.id, {"estado": "MG", "area_agricultavel": 40})
+    result = await counters(get_db)
+    assert result[("total", "")] == (4, 2350)
+    assert result[("estado", "MG")] == (2, 1100)
+    assert ("estado", "PR") not in result
+    assert ("uso_solo", "50:50") not in result
+    assert result[("uso_solo", "40:50")] == (1, 100)
+
+    # exclusão lógica mantém a fazenda no dashboard
+    await crud.soft_delete(Fazenda, farm.id)
+    assert (await counters(get_db))[("total", "")] == (4, 2350)
+
+    # safras associadas e removidas da fazenda
+    await crud.handle_crop_in_farm(Fazenda, Safra, farm.id, 1)
+    await crud.handle_crop_in_farm(Fazenda, Safra, farm.id, 2)
+    result = await counters(get_db)
+    assert result[("cultura", "Soja")] == (1, 0)
+    assert result[("cultura", "Milho")] == (1, 0)
+    await crud.handle_crop_in_farm(Fazenda, Safra, farm.id, 2, is_add=False)
+    assert ("cultura", "Milho") not in await counters(get_db)
+
+    # exclusão remove a fazenda e, em cascata, suas safras
+    await crud.delete(Fazenda, farm.id)
+    result = await counters(get_db)
+    assert result[("total", "")] == (3, 2250)
+    assert result[("estado", "MG")] == (1, 1000)
+    assert ("cultura", "Soja") not in result
+
+
+@pytest.mark.asyncio
+async def test_dashboard_counters_bulk_create(get_db):
+    """Testa se a inclusão em lote atualiza cada contador uma única vez."""
+    data = [
+        {
+            "nome": f"Fazenda {index}",
+            "cidade": "Cascavel",
+            "estado": "PR" if index % 2 else "SC",
+            "area_total": 100,
+            "area_agricultavel": 60,
+            "area_vegetacao": 40,
+            "ativo": True,
+        }
+        for index in range(10)
+    ]
+    await CRUD_Fazenda(get_db).bulk_create(Fazenda, data)
+    assert await counters(get_db) == {
+        ("total", ""): (10, 1000),
+        ("estado", "PR"): (5, 500),
+        ("estado", "SC"): (5, 500),
+        ("uso_solo", "60:40"): (10, 1000),
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_empty(get_db):
+    """Testa o dashboard sem fazendas cadastradas."""
+    result = await CRUD_Fazenda(get_db).get_dashboard(Fazenda, Safra, ContadorDashboard)
+    assert result == {
+        "total_farms": 0,
+        "total_area": None,
+        "total_area_agricultavel": None,
+        "total_area_vegetacao": None,
+        "farms_by_state": [],
+        "farms_by_culture": [],
+        "soil_use_bucket": None,
+        "farms_by_soil_use": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_soil_use_bucket(get_db, farms_in_db, sql_statements):
+    """Testa o uso do solo agrupado em faixas de áreas."""
+    crud = CRUD_Fazenda(get_db)
+    await crud.create(
+        Fazenda,
+        {
+            "nome": "Fazenda Esperança",
+            "cidade": "Londrina",
+            "estado": "PR",
+            "area_total": 800,
+            "area_agricultavel": 550,
+            "area_vegetacao": 210,
+            "ativo": True,
+        },
+    )
+    sql_statements.clear()
+
+    result = await crud.get_dashboard(Fazenda, Safra, ContadorDashboard, 250)
+    assert len(sql_statements) == 1
+    assert result["soil_use_bucket"] == 250
+    assert result["total_area_agricultavel"] == 2050
+    assert result["total_area_vegetacao"] == 960
+    assert result["farms_by_soil_use"] == [
+        {"area_agricultavel": 250, "area_vegetacao": 0, "total_farms": 1},
+        {"area_agricultavel": 500, "area_vegetacao": 0, "total_farms": 1},
+        {"area_agricultavel": 500, "area_vegetacao": 250, "total_farms": 2},
+    ]
+
+    # cada largura de faixa tem sua entrada no cache
+    exact = await crud.get_dashboard(Fazenda, Safra, ContadorDashboard)
+    assert len(exact["farms_by_soil_use"]) == 4
+    assert exact["total_area_agricultavel"] == 2050
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_cache(get_db, farms_in_db, crops_in_db, sql_statements):
+    """Testa se o dashboard em cache é descartado pelas escritas em fazendas e safras."""
+    crud = CRUD_Fazenda(get_db)
+    result = await crud.get_dashboard(Fazenda, Safra, ContadorDashboard)
+    assert result["total_farms"] == 3
+
+    # leituras repetidas não consultam o banco
+    sql_statements.clear()
+    assert await crud.get_dashboard(Fazenda, Safra, ContadorDashboard) == result
+    assert sql_statements == []
+    assert dashboard_cache.stats()["hits"] == 1
+
+    # criação de fazenda
+    data = {
+        "nome": "Fazenda Esperança",
+        "cidade": "Londrina",
+        "estado": "PR",
+        "area_total": 100,
+        "area_agricultavel": 50,
+        "area_vegetacao": 50,
+        "ativo": True,
+    }
+    farm = await crud.create(Fazenda, data)
+    result = await crud.get_dashboard(Fazenda, Safra, ContadorDashboard)
+    assert result["total_farms"] == 4
+
+    # safra associada à fazenda
+    await crud.handle_crop_in_farm(Fazenda, Safra, farm.id, 1)
+    result = await crud.get_dashboard(Fazenda, Safra, ContadorDashboard)
+    assert result["farms_by_culture"] == [{"tipo_cultura": "Soja", "total_farms": 1}]
+
+    # exclusão de fazenda
+    await crud.delete(Fazenda, farm.id)
+    result = await crud.get_dashboard(Fazenda, Safra, ContadorDashboard)
+    assert result["total_farms"] == 3
+    assert result["farms_by_culture"] == []
+    assert dashboard_cache.stats()["misses"] == 4
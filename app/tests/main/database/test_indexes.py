@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.dialects import postgresql
+from app.database.crud import CRUD
+from app.models.models import Fazenda, Produtor, Safra
+from app.scripts.seed import Generator, seed
+
+
+async def explain(db, query) -> str:
+    """Retorna o plano de execução da consulta."""
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await db.execute(text(f"EXPLAIN {sql}"))
+    return "\n".join(result.scalars())
+
+
+@pytest.mark.asyncio
+async def test_foreign_key_queries_use_indexes(get_db):
+    """Testa se as consultas pelas chaves estrangeiras usam os índices."""
+    await seed(get_db.bind, Generator(farms_per_producer=5, crops_per_farm=4), 2000)
+    await get_db.execute(text("ANALYZE"))
+
+    # carregamento selectin das fazendas do produtor e das safras da fazenda
+    plan = await explain(get_db, select(Fazenda).where(Fazenda.produtor_id.in_([10, 20])))
+    assert "ix_fazendas_produtor_id_nome" in plan
+    plan = await explain(get_db, select(Safra).where(Safra.fazenda_id.in_([10, 20])))
+    assert "ix_safras_fazenda_id_nome" in plan
+
+    # ON DELETE: o banco localiza os dependentes pelas mesmas colunas
+    plan = await explain(get_db, delete(Safra).where(Safra.fazenda_id == 10))
+    assert "ix_safras_fazenda_id_nome" in plan
+    plan = await explain(
+        get_db, update(Fazenda).where(Fazenda.produtor_id == 10).values(produtor_id=None)
+    )
+    assert "ix_fazendas_produtor_id_nome" in plan
+
+    # busca por nome na importação
+    plan = await explain(
+        get_db,
+        select(Fazenda.id).where(Fazenda.produtor_id == 10, Fazenda.nome == "Fazenda"),
+    )
+    assert "ix_fazendas_produtor_id_nome" in plan
+
+    # listagens filtradas e ordenadas
+    plan = await explain(
+        get_db,
+        select(Fazenda)
+        .where(Fazenda.estado == "SP")
+        .order_by(Fazenda.area_total.desc(), Fazenda.id.desc())
+        .limit(51),
+    )
+    assert "ix_fazendas_estado_area_total" in plan
+    plan = await explain(
+        get_db,
+        select(Safra)
+        .where(Safra.tipo_cultura == "Soja", Safra.ano_colheita >= 2020)
+        .order_by(Safra.ano_colheita, Safra.id)
+        .limit(51),
+    )
+    assert "ix_safras_tipo_cultura_ano_colheita" in plan
+
+    # as chaves primárias são atendidas pelos próprios índices
+    plan = await explain(get_db, select(Produtor).where(Produtor.id == 10))
+    assert "usuarios_pkey" in plan and "produtores_pkey" in plan
+
+
+@pytest.mark.asyncio
+async def test_name_search_uses_trigram_index(get_db, trigram):
+    """Testa se a busca por nome usa o índice de trigramas."""
+    await seed(get_db.bind, Generator(farms_per_producer=5, crops_per_farm=0), 2000)
+    await get_db.execute(text("ANALYZE"))
+
+    query = CRUD(get_db)._search_query(Fazenda, "Primavera 123")
+    assert "ix_fazendas_nome_trgm" in await explain(get_db, query)
+    query = CRUD(get_db)._search_query(Produtor, "Silva 123")
+    assert "ix_usuarios_nome_trgm" in await explain(get_db, query)
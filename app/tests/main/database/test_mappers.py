@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app.database.crud_fazenda import CRUD_Fazenda
+from app.database.crud_produtor import CRUD_Produtor
+from app.models import mappers
+from app.models.models import Fazenda, Produtor, Safra, Usuario
+from app.tests.fixtures.fazenda import farms_in_db
+from app.tests.fixtures.produtor import producers_in_db
+from app.tests.fixtures.safra import crops_in_db
+
+
+def test_mappings_follow_models():
+    """Testa se as colunas convertidas seguem os modelos, sem campos sensíveis."""
+    assert mappers.usuario.columns == (
+        "id", "nome", "cpf_cnpj", "telefone", "email", "tipo", "ativo"
+    )
+    assert mappers.produtor.columns == mappers.usuario.columns
+    assert "fazenda_id" in mappers.safra.columns
+    assert mappers.MAPPINGS[Fazenda] is mappers.fazenda
+    assert mappers.mapping_for(Usuario) is mappers.usuario
+
+
+@pytest.mark.asyncio
+async def test_nested_collections(get_db, producers_in_db, farms_in_db, crops_in_db):
+    """Testa a conversão das coleções aninhadas, sem a chave do pai."""
+    await CRUD_Fazenda(get_db).handle_crop_in_farm(Fazenda, Safra, 1, 1)
+    await CRUD_Produtor(get_db).handle_farm_in_producer(Produtor, Fazenda, 1, 1)
+    farm = (
+        await get_db.execute(
+            select(Fazenda)
+            .where(Fazenda.id == 1)
+            .options(selectinload(Fazenda.safra))
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one()
+
+    result = mappers.fazenda(farm)
+    assert result["produtor_id"] == 1
+    assert [crop["id"] for crop in result["safras"]] == [1]
+    assert "fazenda_id" not in result["safras"][0]
+    assert result["safras"][0]["ano_plantio"] == 2023
+
+    producer = (
+        await get_db.execute(
+            select(Produtor)
+            .where(Produtor.id == 1)
+            .options(selectinload(Produtor.fazenda))
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one()
+    result = mappers.to_dict(producer)
+    assert [farm["id"] for farm in result["fazendas"]] == [1]
+    assert "produtor_id" not in result["fazendas"][0]
+    assert "safras" not in result["fazendas"][0]
+
+
+def test_unloaded_collections_are_skipped():
+    """Testa se coleções não carregadas ficam fora, sem consultar o banco."""
+    result = mappers.fazenda(Fazenda(id=1, nome="Fazenda Boa Vista"))
+    assert "safras" not in result
+    assert result["nome"] == "Fazenda Boa Vista"
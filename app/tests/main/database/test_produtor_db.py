@@ -1,6 +1,7 @@
 import pytest
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from app.database.crud_produtor import CRUD_Produtor
 from app.models.models import Produtor, Fazenda
 from app.tests.fixtures.produtor import producers_in_db
 from app.tests.fixtures.fazenda import farms_in_db
@@ -26,7 +27,7 @@ async def test_create_producer(get_db, farms_in_db):
 
     get_db.add(new_producer)
     await get_db.commit()
-    await get_db.refresh(new_producer)
+    await get_db.refresh(new_producer, ["fazenda"])
 
     # usuário foi salvo corretamenente
     assert new_producer.id is not None
@@ -59,8 +60,7 @@ async def test_get_producers(get_db, producers_in_db):
     """Testa a obtenção de produtores."""
     result = await get_db.execute(select(Produtor))
     producers = result.scalars().all()
-    # TODO: Verificar bug de criacao de 9 produtores ao invés de 9
-    assert len(producers) > 0
+    assert len(producers) == 3
 
 
 @pytest.mark.asyncio
@@ -109,3 +109,113 @@ async def test_delete_producer(get_db, producers_in_db, farms_in_db):
     farms = await get_db.execute(select(Fazenda))
     farms = farms.scalars().all()
     assert len(farms) == expected_len
+
+
+@pytest.mark.asyncio
+async def test_upsert_producers(get_db, producers_in_db, sql_statements):
+    """Testa se o upsert usa um INSERT ... ON CONFLICT e cria apenas os produtores novos."""
+    crud = CRUD_Produtor(get_db)
+    data = [
+        {
+            "nome": "Pedro da Silva",
+            "cpf_cnpj": "93231382076",
+            "telefone": "11985768364",
+            "email": "pedro.silva@teste.com.br",
+            "senha": "123Abc!!",
+            "tipo": "comum",
+            "ativo": True,
+        },
+        {
+            "nome": "Laura Pereira Souza",
+            "cpf_cnpj": "22334455666",
+            "telefone": "11922334455",
+            "email": "laura.pereira@teste.com.br",
+            "senha": "Laura456!",
+            "tipo": "comum",
+            "ativo": True,
+        },
+    ]
+    rows = await crud.upsert(Produtor, data)
+    assert sorted((row["cpf_cnpj"], row["created"]) for row in rows) == [
+        ("22334455666", False),
+        ("93231382076", True),
+    ]
+    assert "ON CONFLICT (cpf_cnpj) DO UPDATE" in sql_statements[0]
+    assert sql_statements[1].startswith("INSERT INTO produtores")
+    inserts = [statement for statement in sql_statements if statement.startswith("INSERT")]
+    assert len(inserts) == 2
+
+    producers = await crud.get_all(Produtor)
+    assert len(producers) == 4
+    producer = await crud.get_by_cpf_cnpj(Produtor, "22334455666")
+    assert producer.nome == "Laura Pereira Souza"
+    assert producer.ativo is True
+
+    assert await crud.upsert(Produtor, []) == []
+
+
+@pytest.mark.asyncio
+async def test_check_upsert(get_db, producers_in_db):
+    """Testa os usuários já cadastrados e os conflitos de email e telefone do lote."""
+    crud = CRUD_Produtor(get_db)
+    item = {"cpf_cnpj": "93231382076", "telefone": "11985768364", "email": "a@teste.com.br"}
+    data = [
+        # o próprio produtor mantém o email e o telefone
+        {"cpf_cnpj": "11223344556", "telefone": "11988776655", "email": "bruno.lima@teste.com.br"},
+        dict(item),
+        dict(item, cpf_cnpj="44556677888", telefone="11944556677"),
+        dict(item, cpf_cnpj="55667788999", telefone="11922334455", email="b@teste.com.br"),
+    ]
+    existing, conflicts = await crud.check_upsert(Produtor, data)
+    assert list(existing) == ["11223344556"]
+    assert existing["11223344556"].startswith("$2b$")
+    assert conflicts == {
+        "44556677888": "E-mail já pertence a outro usuário",
+        "55667788999": "Telefone já pertence a outro usuário",
+    }
+    assert await crud.check_upsert(Produtor, []) == ({}, {})
+
+
+@pytest.mark.asyncio
+async def test_search_producers(get_db, trigram, producers_in_db):
+    """Testa a busca de produtores pelo nome aproximado."""
+    crud = CRUD_Produtor(get_db)
+    result = await crud.search(Produtor, "Gustavo Martin")
+    assert [producer.nome for producer in result][0] == "Gustavo Martins"
+    assert await crud.search(Produtor, "pereyra") != []
+
+    result = await crud.search(Produtor, "Gustavo Martin", fields=["nome"])
+    assert result[0] == {"nome": "Gustavo Martins"}
+
+
+@pytest.mark.asyncio
+async def test_get_producers_page(get_db, producers_in_db, farms_in_db):
+    """Testa a listagem por projeção de colunas, com as fazendas de cada produtor."""
+    crud = CRUD_Produtor(get_db)
+    await crud.handle_farm_in_producer(Produtor, Fazenda, 2, 1)
+    await crud.handle_farm_in_producer(Produtor, Fazenda, 2, 3)
+    get_db.expunge_all()
+
+    page = await crud.get_page(Produtor, limit=2)
+    first, second = page["items"]
+    assert isinstance(first, dict) and "senha_hash" not in first
+    assert first["fazendas"] == []
+    assert [farm["id"] for farm in second["fazendas"]] == [1, 3]
+    assert "produtor_id" not in second["fazendas"][0]
+    assert len(get_db.identity_map) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_producer_fields(get_db, producers_in_db, farms_in_db, sql_statements):
+    """Testa a busca pelo cpf_cnpj só com os campos pedidos."""
+    crud = CRUD_Produtor(get_db)
+    await crud.handle_farm_in_producer(Produtor, Fazenda, 2, 1)
+    sql_statements.clear()
+
+    producer = await crud.get_by_cpf_cnpj(Produtor, "22334455666", fields=["nome"])
+    assert producer == {"nome": "Laura Pereira"}
+    assert len(sql_statements) == 1
+
+    producer = await crud.get_by_cpf_cnpj(Produtor, "22334455666", fields=["fazendas"])
+    assert [farm["id"] for farm in producer["fazendas"]] == [1]
+    assert await crud.get_by_cpf_cnpj(Produtor, "00000000000", fields=["nome"]) is None
@@ -1,5 +1,6 @@
 import pytest
 from sqlalchemy import select
+from app.database.crud_safra import CRUD_Safra
 from app.models.models import Safra
 from app.tests.fixtures.safra import crops_in_db
 
@@ -66,3 +67,26 @@ async def test_delete_safra(get_db, crops_in_db):
     result = await get_db.execute(select(Safra).where(Safra.id == 1))
     crop = result.scalars().first()
     assert crop is None
+
+
+@pytest.mark.asyncio
+async def test_get_crops_page(get_db, crops_in_db):
+    """Testa a listagem de safras filtrada pelo ano de colheita e ordenada."""
+    crud = CRUD_Safra(get_db)
+
+    async def ids(sort="id", **filters):
+        page = await crud.get_page(Safra, filters=filters, sort=sort)
+        return [crop["id"] for crop in page["items"]]
+
+    assert await ids(ano_colheita_min=2023) == [1, 2]
+    assert await ids(ano_colheita_min=2022, ano_colheita_max=2023) == [2, 3]
+    assert await ids(tipo_cultura="Trigo") == [3]
+    assert await ids(ativo=True, sort="-produtividade_tonelada") == [1, 3]
+    assert await ids(sort="ano_colheita") == [3, 2, 1]
+
+    first = await crud.get_page(Safra, limit=2, sort="-ano_colheita")
+    last = await crud.get_page(
+        Safra, limit=2, after=first["next_cursor"], sort="-ano_colheita"
+    )
+    assert [crop["id"] for crop in first["items"] + last["items"]] == [1, 2, 3]
+    assert last["next_cursor"] is None
@@ -1,6 +1,8 @@
+import json
 import pytest
 from unittest import mock
 from app.main import app
+from app.routers.fazenda import router
 from app.tests.mocks.fazenda.mocks import VALID_FARM_DATA
 from app.tests.mocks.services.fazenda_mocks import (
     DASHBOARD_DATA,
@@ -29,16 +31,93 @@ async def test_create_farm():
             assert response.json() == {"detail": "Erro ao criar a fazenda"}
 
 
+@pytest.mark.asyncio
+async def test_bulk_create_farms():
+    """Testa a criação de fazendas em lote."""
+    data = VALID_FARM_DATA.copy()
+    async with TestClient(app) as client:
+        with mock.patch("app.services.fazenda.Fazenda.bulk_create") as bulk_mock:
+            bulk_mock.return_value = {"created": [1, 2], "errors": []}
+            response = await client.post("/fazenda/bulk", json=[data, data])
+            assert response.status_code == 201
+            assert response.json() == {"created": [1, 2], "errors": []}
+            bulk_mock.assert_called_with([data, data])
+
+            bulk_mock.side_effect = Exception("Erro ao criar as fazendas")
+            response = await client.post("/fazenda/bulk", json=[data])
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Erro ao criar as fazendas"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_farms_mixed():
+    """Testa se os itens inválidos do lote são reportados e os válidos gravados."""
+    data = VALID_FARM_DATA.copy()
+    invalid_area = dict(data, area_total=100)
+    invalid_state = dict(data, estado="Minas")
+    async with TestClient(app) as client:
+        with mock.patch("app.database.crud.CRUD.bulk_create") as bulk_mock:
+            bulk_mock.return_value = [1, 2]
+            response = await client.post(
+                "/fazenda/bulk", json=[data, invalid_area, data, invalid_state]
+            )
+            assert response.status_code == 201
+            assert response.json() == {
+                "created": [1, 2],
+                "errors": [
+                    {
+                        "index": 1,
+                        "detail": "A soma das áreas agricultável e de vegetação não "
+                        + "pode exceder a área total da fazenda.",
+                    },
+                    {
+                        "index": 3,
+                        "detail": "estado: String should have at most 2 characters",
+                    },
+                ],
+            }
+            assert bulk_mock.call_args.args[1] == [data, data]
+
+
 @pytest.mark.asyncio
 async def test_get_farm():
     """Testa a busca de todas as fazendas."""
     data = VALID_FARM_DATA.copy()
     async with TestClient(app) as client:
-        with mock.patch("app.services.fazenda.Fazenda.get_all") as get_mock:
-            get_mock.return_value = [data]
-            response = await client.get("/fazenda/")
+        with mock.patch("app.services.fazenda.Fazenda.get_page") as get_mock:
+            get_mock.return_value = {"items": [data], "next_cursor": "WzFd"}
+            response = await client.get("/fazenda/?limit=1")
             assert response.status_code == 200
-            assert response.json() == [data]
+            assert response.json() == {"items": [data], "next_cursor": "WzFd"}
+            filters = {
+                "estado": None,
+                "cidade": None,
+                "ativo": None,
+                "produtor_id": None,
+                "tipo_cultura": None,
+            }
+            get_mock.assert_called_with(1, None, filters, "id", None)
+
+            response = await client.get(
+                "/fazenda/?estado=SP&ativo=false&tipo_cultura=Soja&sort=-area_total"
+            )
+            assert response.status_code == 200
+            filters.update(estado="SP", ativo=False, tipo_cultura="Soja")
+            get_mock.assert_called_with(50, None, filters, "-area_total", None)
+
+            response = await client.get("/fazenda/?fields=id, nome,estado")
+            assert response.status_code == 200
+            filters.update(estado=None, ativo=None, tipo_cultura=None)
+            get_mock.assert_called_with(50, None, filters, "id", ["id", "nome", "estado"])
+
+            # sem nenhum campo a resposta traz todos
+            for fields in ("", ",", " , "):
+                response = await client.get("/fazenda/", query_string={"fields": fields})
+                assert response.status_code == 200
+                get_mock.assert_called_with(50, None, filters, "id", None)
+
+            response = await client.get("/fazenda/?limit=0")
+            assert response.status_code == 422
 
             get_mock.side_effect = Exception("Erro ao buscar as fazendas")
             response = await client.get("/fazenda/")
@@ -46,6 +125,24 @@ async def test_get_farm():
             assert response.json() == {"detail": "Erro ao buscar as fazendas"}
 
 
+@pytest.mark.asyncio
+async def test_export_farms():
+    """Testa a exportação das fazendas em NDJSON."""
+    data = VALID_FARM_DATA.copy()
+
+    async def export_mock(self):
+        yield [data, data]
+        yield [data]
+
+    async with TestClient(app) as client:
+        with mock.patch("app.services.fazenda.Fazenda.export", export_mock):
+            response = await client.get("/fazenda/export")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = response.text.splitlines()
+            assert [json.loads(line) for line in lines] == [data, data, data]
+
+
 @pytest.mark.asyncio
 async def test_get_farm_by_id():
     """Testa a busca de uma fazenda pelo id."""
@@ -112,6 +209,27 @@ async def test_soft_delete_farm():
             assert response.json() == {"detail": "Erro ao excluir a fazenda"}
 
 
+@pytest.mark.asyncio
+async def test_get_farm_dashboard_cache():
+    """Testa a busca dos contadores do cache do dashboard."""
+    stats = {"name": "dashboard", "hits": 1, "misses": 1, "size": 1, "maxsize": 32, "ttl": 60}
+    async with TestClient(app) as client:
+        with mock.patch("app.database.crud_fazenda.dashboard_cache.stats") as stats_mock:
+            stats_mock.return_value = stats
+            response = await client.get("/fazenda/dashboard/cache")
+            assert response.status_code == 200
+            assert response.json() == stats
+
+            stats_mock.side_effect = Exception("Erro ao buscar o cache")
+            response = await client.get("/fazenda/dashboard/cache")
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Erro ao buscar o cache"}
+
+    # a rota não depende da sessão do banco
+    route = next(route for route in router.routes if route.path == "/dashboard/cache")
+    assert route.dependant.dependencies == []
+
+
 @pytest.mark.asyncio
 async def test_get_farm_dashboard():
     """Testa a busca de todas as fazendas."""
@@ -123,6 +241,13 @@ async def test_get_farm_dashboard():
             assert response.status_code == 200
             assert response.json() == data
 
+            response = await client.get("/fazenda/dashboard/data?soil_use_bucket=100")
+            assert response.status_code == 200
+            assert get_mock.call_args.args[-1] == 100
+
+            response = await client.get("/fazenda/dashboard/data?soil_use_bucket=0")
+            assert response.status_code == 422
+
             get_mock.side_effect = Exception("Erro ao buscar as fazendas")
             response = await client.get("/fazenda/dashboard/data")
             assert response.status_code == 400
@@ -171,3 +296,24 @@ async def test_handle_crop_in_farm_remove():
             assert response.json() == {
                 "detail": "Erro ao associar a safra a uma fazenda"
             }
+
+
+@pytest.mark.asyncio
+async def test_search_fazendas():
+    """Testa a busca de fazendas pelo nome."""
+    data = VALID_FARM_DATA.copy()
+    async with TestClient(app) as client:
+        with mock.patch("app.services.fazenda.Fazenda.search") as search_mock:
+            search_mock.return_value = [data]
+            response = await client.get("/fazenda/search?q=silva&limit=5")
+            assert response.status_code == 200
+            assert response.json() == [data]
+            search_mock.assert_called_with("silva", 5, None)
+
+            response = await client.get("/fazenda/search?q=si")
+            assert response.status_code == 422
+
+            search_mock.side_effect = Exception("Erro ao buscar")
+            response = await client.get("/fazenda/search?q=silva")
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Erro ao buscar"}
@@ -29,16 +29,63 @@ async def test_create_producer():
             assert response.json() == {"detail": "Erro ao criar o produtor"}
 
 
+@pytest.mark.asyncio
+async def test_upsert_producer():
+    """Testa a criação ou atualização de um produtor pelo CPF/CNPJ."""
+    data = VALID_PRODUCER_DATA.copy()
+    async with TestClient(app) as client:
+        with mock.patch("app.services.produtor.Produtor.upsert") as upsert_mock:
+            upsert_mock.return_value = RESULT_PRODUCER_WITHOUT_FARM
+            response = await client.put("/produtor/upsert", json=data)
+            assert response.status_code == 200
+            assert response.json() == RESULT_PRODUCER_WITHOUT_FARM
+            upsert_mock.assert_called_with(data)
+
+            upsert_mock.side_effect = Exception("Erro ao sincronizar o produtor")
+            response = await client.put("/produtor/upsert", json=data)
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Erro ao sincronizar o produtor"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_producers():
+    """Testa a criação ou atualização de vários produtores pelo CPF/CNPJ."""
+    data = VALID_PRODUCER_DATA.copy()
+    result = {"created": [1], "updated": [2], "errors": []}
+    async with TestClient(app) as client:
+        with mock.patch("app.services.produtor.Produtor.bulk_upsert") as upsert_mock:
+            upsert_mock.return_value = result
+            response = await client.put("/produtor/upsert/bulk", json=[data, data])
+            assert response.status_code == 200
+            assert response.json() == result
+            upsert_mock.assert_called_with([data, data])
+
+            # CPF/CNPJ inválido rejeita o lote indicando sua posição
+            invalid = dict(data, cpf_cnpj="123")
+            response = await client.put("/produtor/upsert/bulk", json=[data, invalid])
+            assert response.status_code == 422
+            assert response.json()["detail"][0]["loc"][:2] == ["body", 1]
+
+            upsert_mock.side_effect = Exception("Erro ao sincronizar os produtores")
+            response = await client.put("/produtor/upsert/bulk", json=[data])
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Erro ao sincronizar os produtores"}
+
+
 @pytest.mark.asyncio
 async def test_get_all_producers():
     """Testa a busca de todos os produtores."""
     data = VALID_PRODUCER_DATA.copy()
     async with TestClient(app) as client:
-        with mock.patch("app.services.produtor.Produtor.get_all") as get_mock:
-            get_mock.return_value = [data]
-            response = await client.get("/produtor/")
+        with mock.patch("app.services.produtor.Produtor.get_page") as get_mock:
+            get_mock.return_value = {"items": [data], "next_cursor": "WzFd"}
+            response = await client.get("/produtor/?limit=1")
             assert response.status_code == 200
-            assert response.json() == [data]
+            assert response.json() == {"items": [data], "next_cursor": "WzFd"}
+            get_mock.assert_called_with(1, None, None)
+
+            response = await client.get("/produtor/?limit=0")
+            assert response.status_code == 422
 
             get_mock.side_effect = Exception("Erro ao buscar os produtores")
             response = await client.get("/produtor/")
@@ -171,3 +218,24 @@ async def test_handle_farm_in_producer_remove():
             assert response.json() == {
                 "detail": "Erro ao desassociar o produtor com a fazenda"
             }
+
+
+@pytest.mark.asyncio
+async def test_search_produtores():
+    """Testa a busca de produtores pelo nome."""
+    data = VALID_PRODUCER_DATA.copy()
+    async with TestClient(app) as client:
+        with mock.patch("app.services.produtor.Produtor.search") as search_mock:
+            search_mock.return_value = [data]
+            response = await client.get("/produtor/search?q=silva&limit=5")
+            assert response.status_code == 200
+            assert response.json() == [data]
+            search_mock.assert_called_with("silva", 5, None)
+
+            response = await client.get("/produtor/search?q=si")
+            assert response.status_code == 422
+
+            search_mock.side_effect = Exception("Erro ao buscar")
+            response = await client.get("/produtor/search?q=silva")
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Erro ao buscar"}
@@ -24,16 +24,74 @@ async def test_create_crop():
             assert response.json() == {"detail": "Erro ao criar a safra"}
 
 
+@pytest.mark.asyncio
+async def test_bulk_create_crops():
+    """Testa a criação de safras em lote."""
+    data = VALID_CROP_DATA.copy()
+    async with TestClient(app) as client:
+        with mock.patch("app.services.safra.Safra.bulk_create") as bulk_mock:
+            bulk_mock.return_value = {"created": [1, 2], "errors": []}
+            response = await client.post("/safra/bulk", json=[data, data])
+            assert response.status_code == 201
+            assert response.json() == {"created": [1, 2], "errors": []}
+            assert len(bulk_mock.call_args.args[0]) == 2
+
+            bulk_mock.side_effect = Exception("Erro ao criar as safras")
+            response = await client.post("/safra/bulk", json=[data])
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Erro ao criar as safras"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_crops_mixed():
+    """Testa se os itens inválidos do lote são reportados e os válidos gravados."""
+    data = VALID_CROP_DATA.copy()
+    invalid = dict(data, ano_plantio=2025)
+    async with TestClient(app) as client:
+        with mock.patch("app.database.crud.CRUD.bulk_create") as bulk_mock:
+            bulk_mock.return_value = [1]
+            response = await client.post("/safra/bulk", json=[invalid, data])
+            assert response.status_code == 201
+            assert response.json() == {
+                "created": [1],
+                "errors": [
+                    {
+                        "index": 0,
+                        "detail": "O ano de plantio não pode ser maior que o ano de colheita.",
+                    }
+                ],
+            }
+            assert bulk_mock.call_args.args[1] == [data]
+
+
 @pytest.mark.asyncio
 async def test_get_all_crops():
     """Testa a busca de todas as safra."""
     data = VALID_CROP_DATA.copy()
     async with TestClient(app) as client:
-        with mock.patch("app.services.safra.Safra.get_all") as get_mock:
-            get_mock.return_value = [data]
-            response = await client.get("/safra/")
+        with mock.patch("app.services.safra.Safra.get_page") as get_mock:
+            get_mock.return_value = {"items": [data], "next_cursor": "WzFd"}
+            response = await client.get("/safra/?limit=1")
             assert response.status_code == 200
-            assert response.json() == [data]
+            assert response.json() == {"items": [data], "next_cursor": "WzFd"}
+            filters = {
+                "tipo_cultura": None,
+                "ativo": None,
+                "fazenda_id": None,
+                "ano_colheita_min": None,
+                "ano_colheita_max": None,
+            }
+            get_mock.assert_called_with(1, None, filters, "id", None)
+
+            response = await client.get(
+                "/safra/?tipo_cultura=Soja&ano_colheita_min=2020&sort=-ano_colheita"
+            )
+            assert response.status_code == 200
+            filters.update(tipo_cultura="Soja", ano_colheita_min=2020)
+            get_mock.assert_called_with(50, None, filters, "-ano_colheita", None)
+
+            response = await client.get("/safra/?limit=0")
+            assert response.status_code == 422
 
             get_mock.side_effect = Exception("Erro ao buscar as safra")
             response = await client.get("/safra/")
@@ -1,6 +1,7 @@
 import pytest
 from unittest import mock
 from app.main import app
+from app.utils import password
 from app.tests.mocks.usuario.mocks import (
     VALID_USER_DATA,
     VALID_USER_DATA_WITH_SENHA_HASH,
@@ -33,11 +34,15 @@ async def test_get_all_users():
     """Testa a busca de todos os usuarios."""
     data = VALID_USER_DATA.copy()
     async with TestClient(app) as client:
-        with mock.patch("app.services.usuario.Usuario.get_all") as get_mock:
-            get_mock.return_value = [data]
-            response = await client.get("/usuario/")
+        with mock.patch("app.services.usuario.Usuario.get_page") as get_mock:
+            get_mock.return_value = {"items": [data], "next_cursor": "WzFd"}
+            response = await client.get("/usuario/?limit=1")
             assert response.status_code == 200
-            assert response.json() == [data]
+            assert response.json() == {"items": [data], "next_cursor": "WzFd"}
+            get_mock.assert_called_with(1, None, None)
+
+            response = await client.get("/usuario/?limit=0")
+            assert response.status_code == 422
 
             get_mock.side_effect = Exception("Erro ao buscar os usuarios")
             response = await client.get("/usuario/")
@@ -96,6 +101,23 @@ async def test_update_user():
             assert response.json() == {"detail": "Erro ao atualizar o usuario"}
 
 
+@pytest.mark.asyncio
+async def test_update_user_hashes_password():
+    """Testa a atualização pelo serviço real: a senha chega ao CRUD como hash."""
+    data = VALID_USER_DATA.copy()
+    async with TestClient(app) as client:
+        with mock.patch("app.database.crud.CRUD.update") as update_mock:
+            update_mock.return_value = VALID_USER_DATA_WITH_SENHA_HASH.copy()
+            response = await client.put("/usuario/1", json=data)
+            assert response.status_code == 200
+            assert response.json() == VALID_USER_DATA_WITHOUT_SENHA_HASH.copy()
+
+            model, id, values = update_mock.call_args.args[:3]
+            assert id == 1
+            assert "senha" not in values
+            assert password.check_password("123Abc!!", values["senha_hash"])
+
+
 @pytest.mark.asyncio
 async def test_delete_user():
     """Testa a exclusão de um usuario."""
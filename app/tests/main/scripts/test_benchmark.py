@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import select
+from app.config import DATABASE_TEST
+from app.database.database import DataBase
+from app.models.models import Usuario
+from app.scripts.benchmark import (
+    bench_dashboard,
+    bench_dashboard_histogram,
+    bench_list_entities,
+    bench_list_rows,
+    bench_read,
+    bench_serialize_jsonable_encoder,
+    bench_serialize_orjson,
+    bench_signup_burst,
+    measure,
+    summary,
+)
+from app.tests.fixtures.fazenda import farms_in_db
+
+
+def test_summary():
+    """Testa o resumo das latências em milissegundos."""
+    result = summary("teste", [0.004, 0.001, 0.002, 0.003])
+    assert result == {
+        "operacao": "teste",
+        "execucoes": 4,
+        "min": 1.0,
+        "p50": 2.5,
+        "p95": 4.0,
+        "media": 2.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_measure():
+    """Testa se a operação é aquecida antes de ser medida."""
+    calls = []
+
+    async def operation():
+        calls.append(1)
+
+    timings = await measure(operation, 3, warmup=2)
+    assert len(timings) == 3
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_bench_dashboard(get_db, farms_in_db):
+    """Testa o benchmark do dashboard sobre a base de testes."""
+    data_base = DataBase(DATABASE_TEST)
+    data_base.connect()
+    try:
+        result = await bench_dashboard(data_base, 2)
+        histogram = await bench_dashboard_histogram(data_base, 2)
+    finally:
+        await data_base.disconnect()
+    assert result["operacao"] == "dashboard"
+    assert result["execucoes"] == 2
+    assert histogram["operacao"] == "dashboard_histogram"
+
+
+@pytest.mark.asyncio
+async def test_bench_signup_burst(get_db, farms_in_db):
+    """Testa a sonda de leitura durante uma rajada de cadastros."""
+    data_base = DataBase(DATABASE_TEST)
+    data_base.connect()
+    try:
+        read = await bench_read(data_base, 3)
+        burst = await bench_signup_burst(data_base, 2)
+    finally:
+        await data_base.disconnect()
+    assert read["execucoes"] == 3
+    assert burst["operacao"] == "signup_burst"
+    # a leitura continua respondendo enquanto as senhas são calculadas
+    assert burst["execucoes"] > 1
+    # os produtores do benchmark são excluídos ao final
+    assert (await get_db.execute(select(Usuario))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_bench_serialize(get_db, farms_in_db):
+    """Testa os benchmarks de serialização das fazendas."""
+    data_base = DataBase(DATABASE_TEST)
+    data_base.connect()
+    try:
+        before = await bench_serialize_jsonable_encoder(data_base, 2)
+        after = await bench_serialize_orjson(data_base, 2)
+    finally:
+        await data_base.disconnect()
+    assert before["operacao"] == "serialize_jsonable_encoder"
+    assert after["operacao"] == "serialize_orjson"
+    assert after["execucoes"] == 2
+
+
+@pytest.mark.asyncio
+async def test_bench_list(get_db, farms_in_db):
+    """Testa os benchmarks de carga das listagens."""
+    data_base = DataBase(DATABASE_TEST)
+    data_base.connect()
+    try:
+        entities = await bench_list_entities(data_base, 2)
+        rows = await bench_list_rows(data_base, 2)
+    finally:
+        await data_base.disconnect()
+    assert entities["operacao"] == "list_entities"
+    assert rows["operacao"] == "list_rows"
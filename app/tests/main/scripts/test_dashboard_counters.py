@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import text
+from app.scripts.dashboard_counters import check, rebuild
+from app.scripts.seed import Generator, seed
+
+
+@pytest.mark.asyncio
+async def test_counters_after_seed(get_db):
+    """Testa se os contadores acompanham a carga por COPY."""
+    generator = Generator(farms_per_producer=3, crops_per_farm=2)
+    await seed(get_db.bind, generator, 30, chunk_size=10)
+    assert await check(get_db.bind) == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild(get_db):
+    """Testa se a reconstrução corrige contadores divergentes."""
+    generator = Generator(farms_per_producer=2, crops_per_farm=2)
+    await seed(get_db.bind, generator, 10)
+    await get_db.execute(text("TRUNCATE safras"))
+    await get_db.execute(
+        text("UPDATE dashboard_counters SET total_fazendas = 0 WHERE dimensao = 'total'")
+    )
+    await get_db.commit()
+
+    drift = await check(get_db.bind)
+    assert {"dimensao": "total", "chave": "", "atual": 0, "esperado": 20} in drift
+    assert all(row["esperado"] is None for row in drift if row["dimensao"] == "cultura")
+
+    assert await rebuild(get_db.bind) > 0
+    assert await check(get_db.bind) == []
@@ -0,0 +1,187 @@
+import csv
+import importlib
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+from app.models.models import Fazenda, Produtor, Safra, Usuario
+from app.tests.fixtures.usuario import users_in_db
+
+importer = importlib.import_module("app.scripts.import")
+
+COLUMNS = [
+    "cpf_cnpj",
+    "nome",
+    "telefone",
+    "email",
+    "senha",
+    "fazenda_nome",
+    "cidade",
+    "estado",
+    "area_total",
+    "area_agricultavel",
+    "area_vegetacao",
+    "safra_nome",
+    "tipo_cultura",
+    "variedade",
+    "ano_plantio",
+    "ano_colheita",
+    "produtividade_tonelada",
+]
+
+PRODUCER = ["43518999133", "Ana Souza", "11911112222", "ana.souza@teste.com.br", "Ana123!!"]
+FARM = ["Fazenda Boa Vista", "Uberlândia", "MG", "1000", "600", "400"]
+CROP = ["Safra Soja 2023", "Soja", "Transgênica", "2023", "2024", "50.5"]
+
+ROWS = [
+    PRODUCER + FARM + CROP,
+    PRODUCER + FARM + ["Safra Milho 2023", "Milho", "Híbrido", "2023", "2023", "30"],
+    PRODUCER + ["Fazenda Santa Clara", "Campinas", "SP", "500", "200", "100"] + [""] * 6,
+    ["80598324682", "Bruno Costa", "11933334444", "bruno.costa@teste.com.br", "Bruno123!"]
+    + [""] * 12,
+    # cpf inválido
+    ["12345678900", "Carla Dias", "11955556666", "carla@teste.com.br", "Carla123!"]
+    + [""] * 12,
+    # áreas excedem a área total
+    PRODUCER + ["Fazenda Rio Claro", "Campinas", "SP", "100", "200", "100"] + [""] * 6,
+    # safra sem fazenda
+    PRODUCER + [""] * 6 + CROP,
+]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+async def count(session, model):
+    return await session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.asyncio
+async def test_import(get_db, tmp_path):
+    """Testa a importação de produtores, fazendas e safras por lotes."""
+    path = str(tmp_path / "produtores.csv")
+    write_csv(path, ROWS)
+
+    stats = await importer.Importer(get_db.bind, batch_size=3, rounds=4).run(
+        importer.read_rows(path)
+    )
+    assert stats["linhas"] == 7
+    assert stats["linhas_rejeitadas"] == 3
+    assert stats["produtores_criados"] == 2
+    assert stats["fazendas_criadas"] == 2
+    assert stats["safras_criadas"] == 2
+    assert await count(get_db, Produtor) == 2
+    assert await count(get_db, Fazenda) == 2
+    assert await count(get_db, Safra) == 2
+
+    producer = await get_db.scalar(
+        select(Produtor)
+        .where(Produtor.cpf_cnpj == "43518999133")
+        .options(selectinload(Produtor.fazenda))
+    )
+    assert producer.senha_hash.startswith("$2b$04$")
+    assert producer.verify_password("Ana123!!")
+    assert producer.tipo == "comum"
+    assert sorted(farm.nome for farm in producer.fazenda) == [
+        "Fazenda Boa Vista",
+        "Fazenda Santa Clara",
+    ]
+
+    # reimportar atualiza os dados em vez de duplicá-los
+    rows = [row[:] for row in ROWS[:4]]
+    for row in rows[:3]:
+        row[1] = "Ana Souza Lima"
+        row[4] = "OutraSenha1!"
+    rows[0][8] = "2000"
+    write_csv(path, rows)
+    importer_again = importer.Importer(get_db.bind)
+    stats = await importer_again.run(importer.read_rows(path))
+    assert stats["produtores_criados"] == 0
+    assert stats["produtores_atualizados"] == 2
+    assert stats["fazendas_atualizadas"] == 2
+    assert stats["safras_atualizadas"] == 2
+    assert await count(get_db, Fazenda) == 2
+    assert await count(get_db, Safra) == 2
+
+    producer = await get_db.scalar(
+        select(Produtor)
+        .where(Produtor.cpf_cnpj == "43518999133")
+        .execution_options(populate_existing=True)
+    )
+    assert producer.nome == "Ana Souza Lima"
+    assert producer.verify_password("Ana123!!")
+
+
+@pytest.mark.asyncio
+async def test_import_errors(get_db, tmp_path):
+    """Testa o relatório das linhas rejeitadas."""
+    path = str(tmp_path / "produtores.ndjson")
+    with open(path, "w", encoding="utf-8") as file:
+        for row in ROWS[4:]:
+            file.write(importer.orjson.dumps(dict(zip(COLUMNS, row))).decode() + "\n")
+
+    batch = importer.Batch()
+    for line_number, row in importer.read_rows(path):
+        batch.add(line_number, row)
+    assert [error["linha"] for error in batch.errors] == [1, 2, 3]
+    assert "CPF/CNPJ inválido" in batch.errors[0]["erro"]
+    assert batch.errors[0]["erro"].startswith("produtor.cpf_cnpj")
+    assert "exceder a área total" in batch.errors[1]["erro"]
+    assert batch.errors[2]["erro"] == "Safra informada sem fazenda"
+    assert batch.producers == {}
+
+
+@pytest.mark.asyncio
+async def test_import_keeps_other_users(get_db, users_in_db, tmp_path):
+    """Testa se usuários que não são produtores não são alterados."""
+    path = str(tmp_path / "produtores.csv")
+    user = await get_db.get(Usuario, 1)
+    write_csv(
+        path,
+        [
+            [user.cpf_cnpj, "Outro Nome", "11977778888", "outro@teste.com.br", "Senha1!"]
+            + FARM
+            + [""] * 6
+        ],
+    )
+    stats = await importer.Importer(get_db.bind).run(importer.read_rows(path))
+    assert stats["produtores_ignorados"] == 1
+    assert stats["fazendas_criadas"] == 0
+    assert await count(get_db, Produtor) == 0
+
+
+@pytest.mark.asyncio
+async def test_import_unique_conflicts(get_db, users_in_db, tmp_path):
+    """Testa a rejeição de produtores com email ou telefone de outro usuário."""
+    path = str(tmp_path / "produtores.csv")
+    user = await get_db.get(Usuario, 1)
+    write_csv(
+        path,
+        [
+            PRODUCER + FARM + CROP,
+            # email de um produtor anterior do lote
+            ["80598324682", "Bruno Costa", "11933334444", PRODUCER[3], "Bruno123!"]
+            + FARM
+            + CROP,
+            ["80598324682", "Bruno Costa", "11933334444", PRODUCER[3], "Bruno123!"]
+            + [""] * 12,
+            # telefone de um usuário gravado
+            ["93231382076", "Carla Dias", user.telefone, "carla@teste.com.br", "Carla123!"]
+            + [""] * 12,
+        ],
+    )
+    imported = importer.Importer(get_db.bind, rounds=4)
+    stats = await imported.run(importer.read_rows(path))
+    assert stats["linhas_rejeitadas"] == 3
+    assert stats["produtores_criados"] == 1
+    assert stats["fazendas_criadas"] == 1
+    assert stats["safras_criadas"] == 1
+    assert imported.errors == [
+        {"linha": 3, "erro": "E-mail já pertence a outro usuário"},
+        {"linha": 4, "erro": "E-mail já pertence a outro usuário"},
+        {"linha": 5, "erro": "Telefone já pertence a outro usuário"},
+    ]
+    assert await count(get_db, Produtor) == 1
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+from app.models.models import Fazenda, Produtor, Safra
+from app.scripts.seed import CIDADES, Generator, cnpj, cpf, seed
+from app.tests.fixtures.produtor import producers_in_db
+from app.utils.cnpj_validator import validate_cnpj
+from app.utils.cpf_validator import validate_cpf
+
+
+def test_cpf_cnpj():
+    """Testa se os CPFs e CNPJs gerados são válidos."""
+    assert cpf(1) == "00000000191"
+    assert all(validate_cpf(cpf(index)) for index in range(1, 2000))
+    assert all(validate_cnpj(cnpj(index)) for index in range(1, 2000))
+
+
+def test_generator_is_deterministic():
+    """Testa se a mesma semente gera os mesmos dados."""
+    first_ids = {"usuarios": 1, "fazendas": 1, "safras": 1}
+    records = Generator(seed=7).chunk(dict(first_ids), 50)
+    assert records == Generator(seed=7).chunk(dict(first_ids), 50)
+    assert records != Generator(seed=8).chunk(dict(first_ids), 50)
+
+
+def test_generator_records():
+    """Testa a quantidade e a validade dos registros gerados."""
+    first_ids = {"usuarios": 10, "fazendas": 20, "safras": 30}
+    records = Generator(farms_per_producer=3, crops_per_farm=2).chunk(first_ids, 100)
+    assert len(records["usuarios"]) == 100
+    assert len(records["fazendas"]) == 300
+    assert len(records["safras"]) == 600
+    assert first_ids == {"usuarios": 110, "fazendas": 320, "safras": 630}
+
+    cpf_cnpj = [user[2] for user in records["usuarios"]]
+    assert len(set(cpf_cnpj)) == 100
+    assert all(validate_cpf(value) or validate_cnpj(value) for value in cpf_cnpj)
+    for farm in records["fazendas"]:
+        _, _, cidade, estado, area_total, area_agricultavel, area_vegetacao, _, _ = farm
+        assert CIDADES[estado] == cidade
+        assert area_agricultavel + area_vegetacao <= area_total
+    assert all(crop[4] <= crop[5] for crop in records["safras"])
+
+
+@pytest.mark.asyncio
+async def test_seed(get_db, producers_in_db):
+    """Testa a gravação dos dados gerados após os dados existentes."""
+    generator = Generator(farms_per_producer=2, crops_per_farm=3)
+    totals = await seed(get_db.bind, generator, 25, chunk_size=10)
+    assert totals == {"usuarios": 25, "produtores": 25, "fazendas": 50, "safras": 150}
+
+    assert await get_db.scalar(select(func.count()).select_from(Produtor)) == 28
+    assert await get_db.scalar(select(func.count()).select_from(Fazenda)) == 50
+    assert await get_db.scalar(select(func.count()).select_from(Safra)) == 150
+
+    # as sequências continuam após os dados gerados
+    producer = Produtor(
+        nome="Pedro da Silva",
+        cpf_cnpj="93231382076",
+        telefone="11985768364",
+        email="pedro.silva@teste.com.br",
+        senha="123Abc!!",
+        tipo="comum",
+        ativo=True,
+    )
+    get_db.add(producer)
+    await get_db.commit()
+    assert producer.id == 29
+
+    producer = await get_db.get(
+        Produtor, 4, options=[selectinload(Produtor.fazenda)]
+    )
+    assert producer.verify_password("Senha123!")
+    assert len(producer.fazenda) == 2
@@ -4,11 +4,12 @@ from unittest import mock
 import sqlalchemy
 from app.services.fazenda import Fazenda as FazendaService
 from app.services.safra import Safra as SafraService
-from app.models.models import Fazenda, Safra
+from app.models.models import ContadorDashboard, Fazenda, Safra
 from app.database.crud_fazenda import CRUD_Fazenda
 from app.database.crud_safra import CRUD_Safra
 from app.tests.fixtures.fazenda import farms_in_db
 from app.tests.fixtures.safra import crops_in_db
+from app.utils.response import to_dict
 from app.tests.mocks.services.fazenda_mocks import (
     DASHBOARD_DATA,
     RESULT_FARM_WITH_CROPS,
@@ -55,6 +56,36 @@ async def test_create_fazenda(get_db):
         excinfo.match("Erro ao criar o dado")
 
 
+@pytest.mark.asyncio
+async def test_bulk_create_fazenda(get_db):
+    """Testa a criação de fazendas em lote."""
+    crud = CRUD_Fazenda(get_db)
+    service = FazendaService(Fazenda, crud)
+
+    data = {
+        "nome": "Fazenda de Soja 2023",
+        "cidade": "Uberlândia",
+        "estado": "MG",
+        "area_agricultavel": 100,
+        "area_vegetacao": 50,
+        "area_total": 150,
+        "ativo": True,
+    }
+    invalid = dict(data, area_total=50)
+    result = await service.bulk_create([data, invalid, dict(data)])
+
+    # somente as fazendas válidas são criadas
+    assert len(result["created"]) == 2
+    assert result["errors"] == [
+        {
+            "index": 1,
+            "detail": "A soma das áreas agricultável e de vegetação não "
+            + "pode exceder a área total da fazenda.",
+        }
+    ]
+    assert len(await service.get_all()) == 2
+
+
 @pytest.mark.asyncio
 async def test_get_all_farms(get_db, farms_in_db):
     """Testa a obtenção de todas as fazendas."""
@@ -72,13 +103,35 @@ async def test_get_all_farms(get_db, farms_in_db):
 
 
 @pytest.mark.asyncio
-async def test_get_by_id(get_db, farms_in_db):
+async def test_export_farms(get_db, farms_in_db, crops_in_db):
+    """Testa a exportação das fazendas em lotes."""
+    crud = CRUD_Fazenda(get_db)
+    service = FazendaService(Fazenda, crud)
+    await crud.handle_crop_in_farm(Fazenda, Safra, 1, 1)
+
+    batches = [batch async for batch in service.export()]
+    assert batches[0][0] == RESULT_FARM_WITH_CROPS
+    assert [farm["id"] for batch in batches for farm in batch] == [1, 2, 3]
+
+    # leitura em lotes pelo cursor no servidor
+    batches = [batch async for batch in crud.stream_all(Fazenda, batch_size=2)]
+    assert [len(batch) for batch in batches] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_get_by_id(get_db, farms_in_db, sql_statements):
     """Testa a obtenção de uma fazenda pelo id."""
     crud = CRUD_Fazenda(get_db)
     service = FazendaService(Fazenda, crud)
+    get_db.expunge_all()
+    sql_statements.clear()
     result = await service.get_by_id(1)
     assert result.id == 1
 
+    # as safras da resposta vêm em uma segunda consulta (selectin)
+    assert result.safra == []
+    assert len(sql_statements) == 2
+
     # id nao encontrado
     result_none = await service.get_by_id(1000)
     assert result_none is None
@@ -108,6 +161,9 @@ async def test_update_farm(get_db, farms_in_db):
     result = await service.update(1, data)
     assert result.nome == "Fazenda de Soja 2025"
 
+    # a resposta mantém as safras da fazenda
+    assert to_dict(result)["safras"] == []
+
     # area total menor que area agricultavel e vegetacao
     data_area_total = data.copy()
     data_area_total["area_total"] = 50
@@ -145,7 +201,7 @@ async def test_get_dashboard(get_db, farms_in_db, crops_in_db):
     crops[1].fazenda = farms[1]
     crops[2].fazenda = farms[2]
 
-    result = await farm_service.get_dashboard_data(Safra)
+    result = await farm_service.get_dashboard_data(Safra, ContadorDashboard)
     assert result == DASHBOARD_DATA
 
 
@@ -3,10 +3,14 @@ from unittest import mock
 
 import sqlalchemy
 from app.services.produtor import Produtor as ProdutorService
-from app.models.models import Produtor, Fazenda
+from app.models.models import Produtor, Fazenda, Usuario
 from app.database.crud_produtor import CRUD_Produtor
+from app.database.crud_usuario import CRUD_Usuario
+from app.utils import password
+from app.utils.response import to_dict
 from app.tests.fixtures.produtor import producers_in_db
 from app.tests.fixtures.fazenda import farms_in_db
+from app.tests.fixtures.usuario import users_in_db
 from app.tests.mocks.services.produtor_mocks import (
     RESULT_PRODUCER_WITH_FARM,
     RESULT_PRODUCER_WITHOUT_FARM,
@@ -50,13 +54,19 @@ async def test_create_produtor(get_db):
 
 
 @pytest.mark.asyncio
-async def test_get_by_id(get_db, producers_in_db):
+async def test_get_by_id(get_db, producers_in_db, sql_statements):
     """Testa a busca de um produtor pelo id."""
     crud = CRUD_Produtor(get_db)
     produtor_service = ProdutorService(Produtor, crud)
+    get_db.expunge_all()
+    sql_statements.clear()
     result = await produtor_service.get_by_id(1)
     assert result.id == 1
 
+    # as fazendas da resposta vêm em uma segunda consulta (selectin)
+    assert result.fazenda == []
+    assert len(sql_statements) == 2
+
     # id não encontrado
     result_none = await produtor_service.get_by_id(1000)
     assert result_none is None
@@ -145,6 +155,11 @@ async def test_update(get_db, producers_in_db):
     }
     result = await produtor_service.update(1, data)
     assert result.id == 1
+    assert result.cpf_cnpj == "93231382076"
+    assert result.verify_password("123Abc!!")
+
+    # a resposta mantém as fazendas do produtor
+    assert to_dict(result)["fazendas"] == []
 
     # produtor não pode ser do tipo admin
     data_admin = data.copy()
@@ -166,6 +181,118 @@ async def test_update(get_db, producers_in_db):
         excinfo.match("Erro ao atualizar o dado")
 
 
+@pytest.mark.asyncio
+async def test_upsert(get_db, producers_in_db, users_in_db):
+    """Testa a criação ou atualização de um produtor pelo cpf_cnpj."""
+    crud = CRUD_Produtor(get_db)
+    produtor_service = ProdutorService(Produtor, crud)
+    data = {
+        "nome": "Bruno Lima",
+        "cpf_cnpj": "93231382076",
+        "telefone": "11985768364",
+        "email": "bruno.lima.novo@teste.com.br",
+        "senha": "123Abc!!",
+        "tipo": "comum",
+        "ativo": True,
+    }
+
+    # produtor novo é criado
+    result = await produtor_service.upsert(data)
+    assert result["cpf_cnpj"] == "93231382076"
+    assert result["fazendas"] == []
+    producer = await crud.get_by_cpf_cnpj(Produtor, "93231382076")
+    assert producer.id == result["id"]
+    assert producer.verify_password("123Abc!!")
+
+    # produtor existente é atualizado
+    data_update = dict(data, cpf_cnpj="22334455666", telefone="11922334455")
+    data_update["email"] = "laura.pereira.nova@teste.com.br"
+    result = await produtor_service.upsert(data_update)
+    assert result["id"] == 2
+    assert result["email"] == "laura.pereira.nova@teste.com.br"
+    assert result["ativo"] is True
+    # a senha de quem já existe não é alterada
+    producer = await crud.get_by_cpf_cnpj(Produtor, "22334455666")
+    assert producer.verify_password("Laura456!")
+
+    # usuário que não é produtor não é alterado
+    data_user = dict(data, cpf_cnpj="98765432100", telefone="11912345678")
+    data_user["email"] = "maria.oliveira@teste.com.br"
+    with pytest.raises(Exception) as excinfo:
+        await produtor_service.upsert(data_user)
+    excinfo.match("CPF/CNPJ pertence a um usuário que não é produtor")
+
+    # email ou telefone de outro usuário
+    data_taken = dict(data, cpf_cnpj="44556677888", telefone="11988776655")
+    with pytest.raises(Exception) as excinfo:
+        await produtor_service.upsert(data_taken)
+    excinfo.match("E-mail já pertence a outro usuário; Telefone já pertence a outro usuário")
+
+    # produtor não pode ser do tipo admin
+    with pytest.raises(ValueError) as excinfo:
+        await produtor_service.upsert(dict(data, tipo="admin"))
+    excinfo.match("Produtor não pode ser do tipo admin")
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert(get_db, producers_in_db, users_in_db):
+    """Testa a criação ou atualização de vários produtores pelo cpf_cnpj."""
+    crud = CRUD_Produtor(get_db)
+    produtor_service = ProdutorService(Produtor, crud)
+    data = {
+        "nome": "Bruno Lima",
+        "cpf_cnpj": "93231382076",
+        "telefone": "11985768364",
+        "email": "bruno.lima.novo@teste.com.br",
+        "senha": "123Abc!!",
+        "tipo": "comum",
+        "ativo": True,
+    }
+    items = [
+        data,
+        dict(
+            data,
+            nome="Gustavo Lima",
+            cpf_cnpj="33445566777",
+            telefone="11955667788",
+            email="gustavo.martins@teste.com.br",
+        ),
+        dict(data, tipo="admin"),
+        dict(data, cpf_cnpj="98765432100", telefone="11912345678", email="m@teste.com.br"),
+        dict(data, nome="Bruno Lima Filho"),
+        dict(
+            data,
+            cpf_cnpj="44556677888",
+            telefone="11944556677",
+            email="ana.costa@teste.com.br",
+        ),
+    ]
+    result = await produtor_service.bulk_upsert(items)
+
+    # cpf_cnpj repetido mantém a última ocorrência; email de outro usuário é
+    # reportado sem desfazer o lote
+    assert len(result["created"]) == 1
+    assert result["updated"] == [3]
+    assert result["errors"] == [
+        {"index": 2, "detail": "Produtor não pode ser do tipo admin"},
+        {"index": 3, "detail": "CPF/CNPJ pertence a um usuário que não é produtor"},
+        {"index": 5, "detail": "E-mail já pertence a outro usuário"},
+    ]
+    producer = await produtor_service.get_by_id(result["created"][0])
+    assert producer.nome == "Bruno Lima Filho"
+    rounds = password.import_rounds("bulk_upsert")
+    assert producer.senha_hash.startswith(f"$2b${rounds:02d}$")
+    assert producer.verify_password("123Abc!!")
+    producer = await produtor_service.get_by_id(3)
+    assert producer.nome == "Gustavo Lima"
+    assert producer.verify_password("Gustavo789!")
+    assert len(await produtor_service.get_all()) == 4
+
+    # lote sem itens válidos
+    result = await produtor_service.bulk_upsert([dict(data, tipo="admin")])
+    assert result["created"] == [] and result["updated"] == []
+
+
 @pytest.mark.asyncio
 async def test_delete(get_db, producers_in_db):
     """Testa a exclusão de um produtor."""
@@ -174,6 +301,9 @@ async def test_delete(get_db, producers_in_db):
     result = await produtor_service.delete(1)
     assert result is True
 
+    # o usuário do produtor também é excluído
+    assert await CRUD_Usuario(get_db).get_by_id(Usuario, 1) is None
+
     # excluir id inexistente
     with pytest.raises(Exception) as excinfo:
         await produtor_service.delete(1000)
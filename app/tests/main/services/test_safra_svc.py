@@ -38,6 +38,30 @@ async def test_create_safra(get_db):
         excinfo.match("Erro ao criar o dado")
 
 
+@pytest.mark.asyncio
+async def test_bulk_create_safra(get_db):
+    """Testa a criação de safras em lote."""
+    crud = CRUD_Safra(get_db)
+    service = SafraService(Safra, crud)
+
+    data = {
+        "nome": "Safra de Soja 2023",
+        "tipo_cultura": "Soja",
+        "variedade": "Orgânico",
+        "ano_plantio": 2023,
+        "ano_colheita": 2024,
+        "produtividade_tonelada": 50.5,
+        "ativo": True,
+    }
+    result = await service.bulk_create([data, {"nome": "Safra"}, dict(data)])
+
+    # somente as safras válidas são criadas
+    assert len(result["created"]) == 2
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert "tipo_cultura: Field required" in result["errors"][0]["detail"]
+    assert len(await service.get_all()) == 2
+
+
 @pytest.mark.asyncio
 async def test_get_by_id(get_db, crops_in_db):
     """Testa a busca de uma safra pelo id."""
@@ -24,6 +24,8 @@ async def test_create_user(get_db):
     }
     result = await service.create(data)
     assert result.id
+    assert await result.verify_password_async("123Abc!!")
+    assert "senha" in data
 
     # usuario ja cadastrado
     with pytest.raises(sqlalchemy.exc.IntegrityError):
@@ -133,6 +135,7 @@ async def test_update(get_db, users_in_db):
     }
     result = await service.update(1, data)
     assert result.id == 1
+    assert result.verify_password("123Abc!!")
 
     # atualização falhou
     with mock.patch("app.database.crud.CRUD.update") as update_mock:
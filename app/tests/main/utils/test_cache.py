@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from unittest import mock
+from app.utils import cache
+from app.utils.cache import MISSING, TTLCache
+
+
+def test_get_set():
+    """Testa a leitura e a gravação com contadores de acertos e falhas."""
+    data = TTLCache("teste", maxsize=2, ttl=60)
+    assert data.get("a") is MISSING
+    data.set("a", 1)
+    assert data.get("a") == 1
+    assert data.stats() == {
+        "name": "teste",
+        "hits": 1,
+        "misses": 1,
+        "size": 1,
+        "maxsize": 2,
+        "ttl": 60,
+    }
+
+
+def test_ttl():
+    """Testa a expiração das entradas."""
+    data = TTLCache("teste", ttl=10)
+    with mock.patch("app.utils.cache.time.monotonic", return_value=100):
+        data.set("a", 1)
+    with mock.patch("app.utils.cache.time.monotonic", return_value=110):
+        assert data.get("a") == 1
+    with mock.patch("app.utils.cache.time.monotonic", return_value=110.1):
+        assert data.get("a") is MISSING
+    assert data.stats()["size"] == 0
+
+
+def test_lru():
+    """Testa o descarte da entrada menos usada."""
+    data = TTLCache("teste", maxsize=2)
+    data.set("a", 1)
+    data.set("b", 2)
+    data.get("a")
+    data.set("c", 3)
+    assert data.get("b") is MISSING
+    assert data.get("a") == 1
+    assert data.get("c") == 3
+
+
+def test_invalidate():
+    """Testa a invalidação pelas tabelas das quais as entradas dependem."""
+    data = TTLCache("teste")
+    data.set("fazendas", 1, ["fazendas", "safras"])
+    data.set("usuarios", 2, ["usuarios"])
+    cache.invalidate(["safras"])
+    assert data.get("fazendas") is MISSING
+    assert data.get("usuarios") == 2
+
+    cache.clear_all()
+    assert data.get("usuarios") is MISSING
+    assert data.stats()["hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_or_set():
+    """Testa se chamadas simultâneas carregam o valor uma única vez."""
+    data = TTLCache("teste")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "valor"
+
+    results = await asyncio.gather(*[data.get_or_set("a", loader) for _ in range(5)])
+    assert results == ["valor"] * 5
+    assert len(calls) == 1
+    # quem aguardou a carga recebeu o valor guardado: um acerto
+    assert data.stats()["hits"] == 4 and data.stats()["misses"] == 1
+    assert data._locks == {}
+    assert await data.get_or_set("a", loader) == "valor"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_keeps_lock_for_waiters():
+    """Testa se a chave não é carregada em paralelo enquanto houver chamadas aguardando."""
+    data = TTLCache("teste")
+    loading, concurrent = [], []
+
+    async def loader():
+        concurrent.append(len(loading))
+        loading.append(1)
+        await asyncio.sleep(0.05)
+        loading.pop()
+        # o valor não é guardado, então cada chamada que aguardava carrega de novo
+        cache.invalidate(["fazendas"])
+        return "valor"
+
+    calls = [asyncio.ensure_future(data.get_or_set("a", loader, ["fazendas"]))]
+    calls.append(asyncio.ensure_future(data.get_or_set("a", loader, ["fazendas"])))
+    # chega durante a segunda carga, depois de a primeira liberar a trava
+    await asyncio.sleep(0.075)
+    calls.append(asyncio.ensure_future(data.get_or_set("a", loader, ["fazendas"])))
+    assert await asyncio.gather(*calls) == ["valor"] * 3
+    assert concurrent == [0, 0, 0]
+    assert data.stats()["misses"] == 3
+    assert data._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_invalidated_while_loading():
+    """Testa se o valor carregado durante uma escrita não é guardado."""
+    data = TTLCache("teste")
+
+    async def loader():
+        cache.invalidate(["fazendas"])
+        return "antigo"
+
+    assert await data.get_or_set("a", loader, ["fazendas"]) == "antigo"
+    assert data.get("a") is MISSING
@@ -0,0 +1,16 @@
+import pytest
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("values", [[1], [1000000], ["SP", 42]])
+def test_encode_decode_cursor(values):
+    """Testa se o cursor decodificado retorna os valores codificados."""
+    assert decode_cursor(encode_cursor(values), len(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["", "invalido", encode_cursor([1, 2])])
+def test_decode_invalid_cursor(cursor):
+    """Testa a rejeição de cursores inválidos."""
+    with pytest.raises(ValueError) as excinfo:
+        decode_cursor(cursor)
+    excinfo.match("Cursor inválido")
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import pytest
+from app.utils import password
+
+
+def test_hash_and_check():
+    """Testa o hash com o custo informado e a verificação da senha."""
+    senha_hash = password.hash_password("123Abc!!", rounds=4)
+    assert senha_hash.startswith("$2b$04$")
+    assert password.check_password("123Abc!!", senha_hash)
+    assert not password.check_password("outra", senha_hash)
+
+
+@pytest.mark.asyncio
+async def test_hash_async_runs_in_pool():
+    """Testa se o hash assíncrono roda no pool do bcrypt sem bloquear o loop."""
+    threads = set()
+    hash_password = password.hash_password
+
+    def spy(senha, rounds=None):
+        threads.add(threading.current_thread().name)
+        return hash_password(senha, rounds)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    task = asyncio.create_task(ticker())
+    password.hash_password = spy
+    try:
+        hashes = await asyncio.gather(
+            *(password.hash_password_async("123Abc!!", rounds=10) for _ in range(6))
+        )
+    finally:
+        password.hash_password = hash_password
+        task.cancel()
+
+    assert all(threads) and all(name.startswith("bcrypt") for name in threads)
+    assert len(threads) <= password.PASSWORD["workers"]
+    assert ticks > 10
+    assert await password.check_password_async("123Abc!!", hashes[0])
+    assert not await password.check_password_async("outra", hashes[0])
+
+
+@pytest.mark.asyncio
+async def test_hash_passwords_async():
+    """Testa o hash de um lote no pool de processos, na ordem recebida."""
+    senhas = [f"Senha{index}!" for index in range(9)]
+    hashes = await password.hash_passwords_async(senhas, rounds=4)
+    assert password._process_pool is not None
+    assert len(hashes) == len(senhas)
+    assert all(senha_hash.startswith("$2b$04$") for senha_hash in hashes)
+    assert all(password.check_password(*pair) for pair in zip(senhas, hashes))
+    assert await password.hash_passwords_async([]) == []
+    password.shutdown()
+
+
+def test_import_rounds():
+    """Testa o custo configurado por modo de importação."""
+    assert password.import_rounds("import") == password.PASSWORD["import_rounds"]["import"]
+    with pytest.raises(KeyError):
+        password.import_rounds("desconhecido")
+
+
+def test_shutdown():
+    """Testa se os pools são recriados após o encerramento."""
+    executor = password._get_executor()
+    process_pool = password._get_process_pool()
+    password.shutdown()
+    assert password._executor is None and password._process_pool is None
+    assert password._get_executor() is not executor
+    assert password._get_process_pool() is not process_pool
+    password.shutdown()
@@ -0,0 +1,39 @@
+import orjson
+import pytest
+from app.models.models import Fazenda, Safra, Usuario
+from app.utils.response import ORJSONResponse, dumps, to_dict
+
+
+def test_to_dict_hides_password_hash():
+    """Testa se o hash da senha nunca é serializado."""
+    user = Usuario(id=1, nome="Ana", senha_hash="$2b$12$hash")
+    result = to_dict(user)
+    assert result["id"] == 1 and result["nome"] == "Ana"
+    assert "senha_hash" not in result
+    assert to_dict({"id": 1, "senha_hash": "$2b$12$hash"}) == {"id": 1}
+
+
+def test_dumps_orm_objects():
+    """Testa a serialização de objetos do ORM com os relacionamentos carregados."""
+    farm = Fazenda(id=1, nome="Fazenda Boa Vista", area_total=100)
+    farm.safra = [Safra(id=2, nome="Safra 2024", produtividade_tonelada=3.5)]
+    content = orjson.loads(dumps({"items": [farm], "next_cursor": None}))
+    item = content["items"][0]
+    assert item["nome"] == "Fazenda Boa Vista"
+    assert item["safras"][0]["produtividade_tonelada"] == 3.5
+    assert "fazenda_id" not in item["safras"][0]
+    assert content["next_cursor"] is None
+
+
+def test_dumps_unknown_type():
+    """Testa a rejeição de tipos não serializáveis."""
+    with pytest.raises(TypeError):
+        dumps({"dados": object()})
+
+
+def test_response_body():
+    """Testa o corpo e o tipo da resposta."""
+    response = ORJSONResponse(status_code=201, content={"id": 1})
+    assert response.status_code == 201
+    assert response.body == b'{"id":1}'
+    assert response.media_type == "application/json"
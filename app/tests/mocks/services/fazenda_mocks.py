@@ -1,19 +1,22 @@
 DASHBOARD_DATA = {
-    'farms_by_culture': [{'tipo_cultura': 'Trigo', 'total_farms': 1},
+    'farms_by_culture': [{'tipo_cultura': 'Milho', 'total_farms': 1},
                          {'tipo_cultura': 'Soja', 'total_farms': 1},
-                         {'tipo_cultura': 'Milho', 'total_farms': 1}],
-    'farms_by_soil_use': [{'area_agricultavel': 700,
-                           'area_vegetacao': 300,
+                         {'tipo_cultura': 'Trigo', 'total_farms': 1}],
+    'farms_by_soil_use': [{'area_agricultavel': 300,
+                           'area_vegetacao': 200,
                            'total_farms': 1},
                           {'area_agricultavel': 500,
                            'area_vegetacao': 250,
                            'total_farms': 1},
-                          {'area_agricultavel': 300,
-                           'area_vegetacao': 200,
+                          {'area_agricultavel': 700,
+                           'area_vegetacao': 300,
                            'total_farms': 1}],
     'farms_by_state': [{'state': 'MG', 'total_farms': 1},
                        {'state': 'SP', 'total_farms': 2}],
+    'soil_use_bucket': None,
     'total_area': 2250,
+    'total_area_agricultavel': 1500,
+    'total_area_vegetacao': 750,
     'total_farms': 3
 }
 
@@ -26,12 +29,14 @@ RESULT_FARM_WITH_CROPS = {
     "area_agricultavel": 300,
     "area_vegetacao": 200,
     "ativo": True,
+    "produtor_id": None,
     "safras": [
         {
             "id": 1,
             "nome": "Safra de Soja 2023",
             "variedade": "Orgânico",
             "tipo_cultura": "Soja",
+            "ano_plantio": 2023,
             "ano_colheita": 2024,
             "produtividade_tonelada": 50.5,
             "ativo": True,
@@ -48,5 +53,6 @@ RESULT_FARM_WITHOUT_CROPS = {
     "area_agricultavel": 300,
     "area_vegetacao": 200,
     "ativo": True,
+    "produtor_id": None,
     "safras": [],
 }
@@ -4,6 +4,7 @@ RESULT_PRODUCER_WITH_FARM = {
     "telefone": "11988776655",
     "cpf_cnpj": "11223344556",
     "email": "bruno.lima@teste.com.br",
+    "tipo": "admin",
     "ativo": True,
     "fazendas": [
         {
@@ -25,6 +26,7 @@ RESULT_PRODUCER_WITHOUT_FARM = {
     "telefone": "11988776655",
     "cpf_cnpj": "11223344556",
     "email": "bruno.lima@teste.com.br",
+    "tipo": "admin",
     "ativo": True,
     "fazendas": [],
 }
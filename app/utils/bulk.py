@@ -0,0 +1,33 @@
+"""Validação item a item dos lotes recebidos pelas rotas de criação em lote.
+
+Cada item é validado com o schema da rota: os inválidos são reportados pela
+posição no lote, em vez de rejeitarem o lote inteiro, e só os válidos são
+gravados.
+"""
+from pydantic import BaseModel, ValidationError
+
+
+def error_message(error: ValidationError) -> str:
+    """Formata os erros de validação de um item."""
+    messages = []
+    for item in error.errors():
+        context = item.get("ctx") or {}
+        message = str(context["error"]) if "error" in context else item["msg"]
+        location = ".".join(str(loc) for loc in item["loc"])
+        messages.append(f"{location}: {message}" if location else message)
+    return "; ".join(messages)
+
+
+def validate_items(schema: type[BaseModel], data: list) -> tuple:
+    """Valida cada item do lote com o schema.
+
+    Retorna os dados dos itens válidos, na ordem recebida, e os erros dos
+    inválidos (``{"index": posição, "detail": mensagem}``).
+    """
+    valid, errors = [], []
+    for index, item in enumerate(data):
+        try:
+            valid.append(schema.model_validate(item).model_dump())
+        except ValidationError as e:
+            errors.append({"index": index, "detail": error_message(e)})
+    return valid, errors
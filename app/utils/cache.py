@@ -0,0 +1,121 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+_caches = []
+
+
+class TTLCache:
+    """Cache em memória com expiração (TTL) e descarte do menos usado (LRU).
+
+    Cada entrada registra as tabelas das quais depende; uma escrita em uma
+    dessas tabelas, notificada por ``invalidate``, descarta a entrada.
+    """
+
+    def __init__(self, name: str, maxsize: int = 128, ttl: float = 60):
+        """Inicia o cache vazio e o registra para invalidação."""
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._locks = {}
+        self._generation = 0
+        _caches.append(self)
+
+    def _lookup(self, key) -> object:
+        """Retorna o valor da chave sem alterar os contadores."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            return MISSING
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def get(self, key) -> object:
+        """Retorna o valor da chave, ou ``MISSING`` se ausente ou expirado."""
+        value = self._lookup(key)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, tables=()) -> None:
+        """Guarda o valor da chave, descartando a entrada menos usada se cheio."""
+        self._entries[key] = (time.monotonic() + self.ttl, value, frozenset(tables))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_set(self, key, loader, tables=()) -> object:
+        """Retorna o valor da chave, carregando-o uma única vez se ausente.
+
+        Chamadas simultâneas para a mesma chave aguardam a mesma carga e contam
+        como acertos; o valor não é guardado se as tabelas forem alteradas
+        durante a carga. A trava da chave é mantida enquanto houver chamadas
+        aguardando por ela.
+        """
+        value = self._lookup(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        waiting = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        waiting[1] += 1
+        try:
+            async with waiting[0]:
+                value = self._lookup(key)
+                if value is not MISSING:
+                    self.hits += 1
+                    return value
+                self.misses += 1
+                generation = self._generation
+                value = await loader()
+                if generation == self._generation:
+                    self.set(key, value, tables)
+                return value
+        finally:
+            waiting[1] -= 1
+            if not waiting[1] and self._locks.get(key) is waiting:
+                del self._locks[key]
+
+    def invalidate(self, tables) -> None:
+        """Descarta as entradas que dependem de alguma das tabelas."""
+        tables = set(tables)
+        self._generation += 1
+        for key in [key for key, entry in self._entries.items() if entry[2] & tables]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Esvazia o cache e zera os contadores."""
+        self._entries.clear()
+        self._locks.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Retorna os contadores de acertos e falhas do cache."""
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+def invalidate(tables) -> None:
+    """Notifica todos os caches de uma escrita nas tabelas."""
+    tables = set(tables)
+    for cache in _caches:
+        cache.invalidate(tables)
+
+
+def clear_all() -> None:
+    """Esvazia todos os caches."""
+    for cache in _caches:
+        cache.clear()
@@ -0,0 +1,19 @@
+import base64
+import json
+
+
+def encode_cursor(values: list) -> str:
+    """Codifica os valores da chave de paginação em um cursor opaco."""
+    data = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int = 1) -> list:
+    """Decodifica um cursor gerado por encode_cursor com `size` valores."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Cursor inválido")
+    return values
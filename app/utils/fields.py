@@ -0,0 +1,17 @@
+"""Campos da resposta escolhidos pelo cliente (``?fields=``)."""
+from typing import Optional
+
+from fastapi import Query
+
+
+def sparse_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Campos da resposta separados por vírgula, ex.: id,nome,estado. "
+        "Coleções (safras, fazendas) só são carregadas quando pedidas.",
+    ),
+) -> Optional[list]:
+    """Lê os campos pedidos; sem o parâmetro, ou sem nenhum campo, a resposta traz todos."""
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()] or None
@@ -0,0 +1,8 @@
+import orjson
+
+
+async def ndjson_batches(batches):
+    """Serializa lotes de dicionários em blocos NDJSON (um objeto por linha)."""
+    async for batch in batches:
+        if batch:
+            yield b"".join(orjson.dumps(item) + b"\n" for item in batch)
@@ -0,0 +1,119 @@
+"""Hash e verificação de senhas com bcrypt.
+
+O bcrypt leva centenas de milissegundos por senha no custo padrão e, chamado
+no loop de eventos, bloqueia todas as requisições do processo nesse tempo. As
+versões assíncronas executam o bcrypt em um pool de threads dedicado e
+limitado (``PASSWORD["workers"]``); o bcrypt libera o GIL durante o cálculo.
+O custo (``PASSWORD["rounds"]``) vale para os novos hashes; hashes gravados
+com outro custo continuam sendo verificados normalmente.
+
+Lotes de senhas (cadastro em lote pela API, ``app/scripts/import.py``) são
+divididos entre os processos de um pool (``PASSWORD["processes"]``), para usar
+todos os núcleos da máquina, com o custo configurado para cada modo de
+importação em ``PASSWORD["import_rounds"]``.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+
+from app.config import PASSWORD
+
+_executor = None
+_process_pool = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Retorna o pool de threads do bcrypt, criado no primeiro uso."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=PASSWORD["workers"], thread_name_prefix="bcrypt"
+        )
+    return _executor
+
+
+def _processes() -> int:
+    """Retorna a quantidade de processos do pool de lotes."""
+    return PASSWORD["processes"] or os.cpu_count() or 1
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos dos lotes de senhas, criado no primeiro uso.
+
+    Os processos são iniciados com ``spawn``: um ``fork`` do processo da API
+    copiaria o loop de eventos e as conexões abertas.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=_processes(), mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def import_rounds(mode: str) -> int:
+    """Retorna o custo do bcrypt configurado para o modo de importação."""
+    return PASSWORD["import_rounds"][mode]
+
+
+def hash_password(senha: str, rounds: int = None) -> str:
+    """Gera o hash bcrypt da senha com o custo informado ou o configurado."""
+    salt = bcrypt.gensalt(rounds or PASSWORD["rounds"])
+    return bcrypt.hashpw(senha.encode("utf-8"), salt).decode("utf-8")
+
+
+def _hash_chunk(senhas: list, rounds: int) -> list:
+    """Gera os hashes de uma parte do lote, dentro de um processo do pool."""
+    return [hash_password(senha, rounds) for senha in senhas]
+
+
+def check_password(senha: str, senha_hash: str) -> bool:
+    """Verifica se a senha corresponde ao hash."""
+    return bcrypt.checkpw(senha.encode("utf-8"), senha_hash.encode("utf-8"))
+
+
+async def hash_password_async(senha: str, rounds: int = None) -> str:
+    """Gera o hash da senha no pool de threads do bcrypt."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), hash_password, senha, rounds)
+
+
+async def check_password_async(senha: str, senha_hash: str) -> bool:
+    """Verifica a senha no pool de threads do bcrypt."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), check_password, senha, senha_hash)
+
+
+async def hash_passwords_async(senhas: list, rounds: int = None) -> list:
+    """Gera os hashes de um lote de senhas, na ordem recebida, no pool de processos.
+
+    O lote é dividido em algumas partes por processo, para equilibrar a carga
+    sem enviar uma tarefa por senha. Uma senha isolada usa o pool de threads.
+    """
+    if len(senhas) <= 1:
+        return [await hash_password_async(senha, rounds) for senha in senhas]
+    rounds = rounds or PASSWORD["rounds"]
+    size = -(-len(senhas) // (_processes() * 4))
+    loop = asyncio.get_running_loop()
+    pool = _get_process_pool()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, _hash_chunk, senhas[start:start + size], rounds)
+            for start in range(0, len(senhas), size)
+        )
+    )
+    return [senha_hash for chunk in chunks for senha_hash in chunk]
+
+
+def shutdown() -> None:
+    """Encerra os pools, aguardando os cálculos em andamento."""
+    global _executor, _process_pool
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+    if _process_pool is not None:
+        _process_pool.shutdown()
+        _process_pool = None
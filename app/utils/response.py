@@ -0,0 +1,39 @@
+"""Respostas JSON da API serializadas diretamente com orjson.
+
+Os objetos do ORM são convertidos durante a própria serialização (``default``
+do orjson) pelas funções geradas em ``app/models/mappers.py``, sem o percurso
+recursivo do ``jsonable_encoder`` e sem consultas ao banco. Campos sensíveis
+(``HIDDEN_FIELDS``) nunca são serializados.
+"""
+import orjson
+from fastapi.responses import JSONResponse
+
+from app.models import mappers
+from app.models.mappers import HIDDEN_FIELDS
+
+
+def to_dict(data) -> dict:
+    """Converte um objeto do ORM (ou um dicionário) em dicionário, sem campos sensíveis."""
+    if isinstance(data, dict):
+        return {key: value for key, value in data.items() if key not in HIDDEN_FIELDS}
+    return mappers.to_dict(data)
+
+
+def _default(data):
+    """Serializa os tipos que o orjson não conhece: objetos do ORM."""
+    if hasattr(data, "_sa_instance_state"):
+        return mappers.to_dict(data)
+    raise TypeError(f"Tipo não serializável: {type(data).__name__}")
+
+
+def dumps(content) -> bytes:
+    """Serializa o conteúdo da resposta em JSON."""
+    return orjson.dumps(content, default=_default)
+
+
+class ORJSONResponse(JSONResponse):
+    """Resposta JSON que serializa objetos do ORM com orjson."""
+
+    def render(self, content) -> bytes:
+        """Serializa o conteúdo da resposta."""
+        return dumps(content)